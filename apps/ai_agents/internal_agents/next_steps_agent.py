@@ -2,15 +2,6 @@
 Next Steps Agent - Converts Department Agent action plans into actionable user steps
 Takes department's technical response plan and converts to citizen-friendly actionable steps
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import logging
@@ -0,0 +1,24 @@
+import logging
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis_client():
+    """
+    Shared Redis client (connection-pooled) for pub/sub and counters.
+    Returns None when REDIS_URL is not configured.
+    """
+    global _client
+    if _client is None and getattr(settings, 'REDIS_URL', None):
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=5,
+            health_check_interval=30,
+        )
+    return _client
@@ -1,11 +1,19 @@
 from django import template
+from django.db.models import QuerySet
 
 register = template.Library()
 
+
 @register.filter
 def filter_status(queryset, status):
+    # Querysets stay lazy and are filtered in SQL - use .count rather than |length for a COUNT
+    if isinstance(queryset, QuerySet):
+        return queryset.filter(status=status)
     return [call for call in queryset if call.status == status]
 
+
 @register.filter
 def filter_priority(queryset, priority):
-    return [call for call in queryset if call.priority == priority]
\ No newline at end of file
+    if isinstance(queryset, QuerySet):
+        return queryset.filter(priority=priority)
+    return [call for call in queryset if call.priority == priority]
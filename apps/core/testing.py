@@ -0,0 +1,37 @@
+"""
+Shared test helpers
+"""
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+class TemporaryMediaRootMixin:
+    """
+    Sends uploads made while the test class runs (e.g. the default profile picture
+    every new CustomUser gets) to a throwaway MEDIA_ROOT instead of media/
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media_root = tempfile.mkdtemp(prefix='test-media-')
+        cls._media_override = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._remove_media_root()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            super().tearDownClass()
+        finally:
+            cls._remove_media_root()
+
+    @classmethod
+    def _remove_media_root(cls):
+        cls._media_override.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
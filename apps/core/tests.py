@@ -1,3 +1,273 @@
-from django.test import TestCase
+import json
+import time
+from collections import defaultdict
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.authentication.models import CustomUser
+from apps.core import views
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import ActionType, DepartmentCategory, EntityType, Province
+from apps.depts.models import (
+    ActionLog, Appointment, CitizenRequest, CitizenRequestAssignment, City,
+    Department, DepartmentEntity, EmergencyCall, Location
+)
+from apps.depts.services import pipeline_events
+from apps.depts.services.pipeline_events import PipelineEventPublisher, events_channel
+from apps.depts.services.request_detail_service import RECENT_ACTIONS_LIMIT, RequestDetailService
+
+# select_related request + assignments + recent actions
+DETAIL_PAYLOAD_QUERIES = 3
+# ... + full action history, appointments (with entity), calls (with department)
+DETAIL_PAGE_QUERIES = 6
+
+
+class RequestDetailQueryCountTests(TemporaryMediaRootMixin, TestCase):
+    """Request detail lookups cost a fixed number of queries, however long the history"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='citizen@example.com', password='secret', first_name='Ayesha')
+        city = City.objects.create(name='Lahore', province=Province.PUNJAB)
+        location = Location.objects.create(city=city, area='Gulberg')
+        cls.department = Department.objects.create(name='Punjab Police', category=DepartmentCategory.POLICE)
+        cls.entity = DepartmentEntity.objects.create(
+            name='Gulberg Police Station', type=EntityType.POLICE_STATION,
+            department=cls.department, city=city, phone='+92-42-0000000'
+        )
+        cls.short = cls._make_request(location, history=1)
+        cls.long = cls._make_request(location, history=25)
+
+    @classmethod
+    def _make_request(cls, location, history):
+        request_obj = CitizenRequest.objects.create(
+            user=cls.user, request_text='Car stolen outside the market', category=DepartmentCategory.POLICE,
+            target_location=location, assigned_department=cls.department, assigned_entity=cls.entity
+        )
+        for index in range(history):
+            CitizenRequestAssignment.objects.create(citizen_request=request_obj, department_entity=cls.entity)
+            ActionLog.objects.create(
+                citizen_request=request_obj, action_type=ActionType.ANALYSIS, description=f'Step {index}'
+            )
+            EmergencyCall.objects.create(
+                citizen_request=request_obj, department=cls.department, phone_number='15'
+            )
+            Appointment.objects.create(
+                citizen_request=request_obj, department=cls.department, entity=cls.entity,
+                scheduled_at=timezone.now() + timedelta(hours=index)
+            )
+        return request_obj
+
+    def test_payload_query_budget(self):
+        for request_obj in (self.short, self.long):
+            with self.assertNumQueries(DETAIL_PAYLOAD_QUERIES):
+                loaded = RequestDetailService.detail_queryset(full_history=False).get(pk=request_obj.pk)
+                payload = RequestDetailService.serialize(loaded)
+            self.assertEqual(payload['request']['case_code'], request_obj.case_code)
+
+        self.assertEqual(len(payload['recent_actions']), RECENT_ACTIONS_LIMIT)
+        self.assertEqual(
+            [action.pk for action in loaded.recent_actions],
+            list(loaded.actions.order_by('-created_at', '-pk').values_list('pk', flat=True)[:RECENT_ACTIONS_LIMIT])
+        )
+
+    def test_full_history_query_budget(self):
+        with self.assertNumQueries(DETAIL_PAGE_QUERIES):
+            loaded = RequestDetailService.detail_queryset().get(pk=self.long.pk)
+            names = [call.department.name for call in loaded.ordered_calls]
+            entities = [appointment.entity.name for appointment in loaded.ordered_appointments]
+
+        self.assertEqual(len(loaded.ordered_actions), 25)
+        self.assertEqual(len(names), 25)
+        self.assertEqual(len(entities), 25)
+
+    def test_views_do_not_grow_with_history(self):
+        self.client.force_login(self.user)
+        for url_name in ('request_detail', 'request_complete'):
+            counts = []
+            for request_obj in (self.short, self.long):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse(url_name), {'case_code': request_obj.case_code})
+                self.assertEqual(response.status_code, 200)
+                counts.append(len(queries))
+            self.assertEqual(counts[0], counts[1], url_name)
+
+
+class MetricsAccessTests(TemporaryMediaRootMixin, TestCase):
+    """The Prometheus endpoint answers staff sessions and holders of the scrape token only"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.citizen = CustomUser.objects.create_user(email='viewer@example.com', password='secret', first_name='Omar')
+        cls.staff = CustomUser.objects.create_user(
+            email='ops@example.com', password='secret', first_name='Zara', is_staff=True
+        )
+
+    def scrape(self, **headers):
+        return self.client.get(reverse('metrics'), **headers)
+
+    def test_anonymous_and_non_staff_are_refused(self):
+        self.assertEqual(self.scrape().status_code, 401)
+
+        self.client.force_login(self.citizen)
+        self.assertEqual(self.scrape().status_code, 401)
+
+    def test_staff_session_is_allowed(self):
+        self.client.force_login(self.staff)
+        response = self.scrape()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    @override_settings(METRICS_BEARER_TOKEN='scrape-token')
+    def test_bearer_token(self):
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer scrape-token').status_code, 200)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer wrong-token').status_code, 401)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Basic scrape-token').status_code, 401)
+
+    def test_empty_token_setting_never_matches(self):
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+
+
+class InMemoryPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.messages = []
+        self.closed = False
+
+    def subscribe(self, channel):
+        self.redis.subscribers[channel].append(self)
+        # Messages published between this subscribe and the history read
+        self.messages.extend(self.redis.arriving.pop(channel, []))
+
+    def get_message(self, timeout=0.0):
+        if self.messages:
+            return {'type': 'message', 'data': self.messages.pop(0)}
+        time.sleep(timeout)
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class InMemoryRedis:
+    """The list and pub/sub commands the pipeline event stream uses"""
+
+    def __init__(self):
+        self.lists = defaultdict(list)
+        self.subscribers = defaultdict(list)
+        self.arriving = defaultdict(list)
+        self.pubsubs = []
+
+    def rpush(self, key, value):
+        self.lists[key].append(value)
+        return len(self.lists[key])
+
+    def expire(self, key, seconds):
+        return True
+
+    def lrange(self, key, start, end):
+        return list(self.lists[key])
+
+    def publish(self, channel, message):
+        for pubsub in self.subscribers[channel]:
+            pubsub.messages.append(message)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = InMemoryPubSub(self)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+
+def parse_sse(body):
+    """[(id, event, data)] for each event block, skipping retry and comment blocks"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+@mock.patch.object(views.EmergencyRequestStreamView, 'stream_timeout_seconds', 0.2)
+@mock.patch.object(views.EmergencyRequestStreamView, 'keepalive_seconds', 0.05)
+class EmergencyRequestStreamTests(TemporaryMediaRootMixin, TestCase):
+    """The progress stream replays history after Last-Event-ID, then follows live events without repeats"""
+
+    task_id = 'task-stream-1'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='stream@example.com', password='secret', first_name='Nadia')
+
+    def setUp(self):
+        self.redis = InMemoryRedis()
+        for module in (views, pipeline_events):
+            patcher = mock.patch.object(module, 'get_redis_client', return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['emergency_task_id'] = self.task_id
+        session.save()
+
+    def publish(self, *events):
+        publisher = PipelineEventPublisher(self.task_id)
+        for event in events:
+            publisher.publish(event, {'step': event})
+
+    def stream(self, last_event_id=None):
+        headers = {'HTTP_LAST_EVENT_ID': str(last_event_id)} if last_event_id is not None else {}
+        response = self.client.get(reverse('emergency_request_stream', args=[self.task_id]), **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_reconnect_replays_only_events_after_last_event_id(self):
+        self.publish('received', 'router_classified', 'entity_matched', 'completed')
+
+        body = self.stream(last_event_id=2)
+
+        self.assertTrue(body.startswith('retry: '))
+        self.assertEqual(parse_sse(body), [
+            (3, 'entity_matched', {'step': 'entity_matched'}),
+            (4, 'completed', {'step': 'completed'}),
+        ])
+        self.assertTrue(self.redis.pubsubs[0].closed)
+
+    def test_live_events_skip_what_history_already_sent(self):
+        self.publish('received')
+        channel = events_channel(self.task_id)
+        # Event 1 is both in history and on the channel; event 2 only arrives live
+        self.redis.arriving[channel] = [
+            json.dumps({'event': 'received', 'data': {'step': 'received'}, 'seq': 1}),
+            json.dumps({'event': 'completed', 'data': {'step': 'completed'}, 'seq': 2}),
+        ]
+
+        self.assertEqual([seq for seq, _, _ in parse_sse(self.stream())], [1, 2])
+
+    def test_idle_stream_sends_keepalives_then_ends(self):
+        self.publish('received')
+
+        body = self.stream(last_event_id=1)
+
+        self.assertEqual(parse_sse(body), [])
+        self.assertIn(': keep-alive', body)
+
+    def test_other_sessions_task_is_not_streamed(self):
+        response = self.client.get(reverse('emergency_request_stream', args=['task-someone-else']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_format_event(self):
+        event = {'seq': 7, 'event': 'entity_matched', 'data': {'entity': 'Gulberg Police Station'}}
+        self.assertEqual(
+            views.EmergencyRequestStreamView.format_event(event),
+            'id: 7\nevent: entity_matched\ndata: {"entity": "Gulberg Police Station"}\n\n'
+        )
@@ -5,17 +5,28 @@ from django.contrib.auth.forms import PasswordChangeForm
 from rest_framework.exceptions import ValidationError
 from django.contrib.auth import update_session_auth_hash
 
-from django.http import JsonResponse
+import json
+import time
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Q
 from datetime import timedelta
 from apps.depts.models import (
     CitizenRequest, ActionLog, Department, DepartmentEntity,
-    CitizenRequestAssignment, EmergencyCall, Appointment
+    CitizenRequestAssignment, City
 )
 from apps.depts.tasks import process_emergency_request_task
+from apps.depts.services.pipeline_events import read_events, events_channel, TERMINAL_EVENTS
+from apps.depts.services.dashboard_metrics_service import DashboardMetricsService
+from apps.depts.services.request_detail_service import RequestDetailService
+from apps.depts.services.pipeline_metrics import PIPELINE_METRICS
+from apps.depts.services.rollup_service import RollupService, ROLLUP_DIMENSIONS
+from apps.depts.choices import CaseStatus, DepartmentCategory, RollupMetric, UrgencyLevel
+from apps.core.redis_client import get_redis_client
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -24,85 +35,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Date ranges for calculations
-        today = timezone.now().date()
-        start_of_today = timezone.make_aware(timezone.datetime.combine(today, timezone.datetime.min.time()))
-        start_of_month = today.replace(day=1)
-        start_of_last_month = (start_of_month - timedelta(days=1)).replace(day=1)
-        end_of_last_month = start_of_month - timedelta(days=1)
-
-        # Convert to timezone-aware datetimes
-        start_of_month = timezone.make_aware(timezone.datetime.combine(start_of_month, timezone.datetime.min.time()))
-        start_of_last_month = timezone.make_aware(
-            timezone.datetime.combine(start_of_last_month, timezone.datetime.min.time()))
-        end_of_last_month = timezone.make_aware(
-            timezone.datetime.combine(end_of_last_month, timezone.datetime.max.time()))
-
-        # Total Requests calculation
-        total_requests = CitizenRequest.objects.count()
-        current_month_requests = CitizenRequest.objects.filter(
-            created_at__gte=start_of_month
-        ).count()
-        last_month_requests = CitizenRequest.objects.filter(
-            created_at__gte=start_of_last_month,
-            created_at__lte=end_of_last_month
-        ).count()
-
-        if last_month_requests > 0:
-            jobs_percentage_change = round(
-                ((current_month_requests - last_month_requests) / last_month_requests) * 100, 1
-            )
-        else:
-            jobs_percentage_change = 100.0 if current_month_requests > 0 else 0.0
-
-        # Active Cases (requests not resolved)
-        active_cases = CitizenRequest.objects.filter(
-            status__in=['SUBMITTED', 'ASSIGNED', 'IN_PROGRESS']
-        ).count()
-        print("Active Cases:", active_cases)
-
-        active_cases_last_month = CitizenRequest.objects.filter(
-            created_at__gte=start_of_last_month,
-            created_at__lte=end_of_last_month,
-            status__in=['SUBMITTED', 'ASSIGNED', 'IN_PROGRESS']
-        ).count()
-        print("active_cases_last_month", active_cases_last_month)
-        if active_cases_last_month > 0:
-            resumes_percentage_change = round(
-                ((active_cases - active_cases_last_month) / active_cases_last_month) * 100, 1
-            )
-        else:
-            resumes_percentage_change = 100.0 if active_cases > 0 else 0.0
-
-        # Resolved Today
-        resolved_today = CitizenRequest.objects.filter(
-            resolved_at__gte=start_of_today,
-            status='RESOLVED'
-        ).count()
-
-        resolved_last_month_same_day = CitizenRequest.objects.filter(
-            resolved_at__gte=start_of_last_month + timedelta(days=today.day - 1),
-            resolved_at__lt=start_of_last_month + timedelta(days=today.day),
-            status='RESOLVED'
-        ).count()
-
-        if resolved_last_month_same_day > 0:
-            applications_percentage_change = round(
-                ((resolved_today - resolved_last_month_same_day) / resolved_last_month_same_day) * 100, 1
-            )
-        else:
-            applications_percentage_change = 100.0 if resolved_today > 0 else 0.0
-
-        # Average Response Time (in minutes)
-        avg_response_time = ActionLog.objects.filter(
-            success=True,
-            completed_at__isnull=False,
-            duration_seconds__isnull=False
-        ).aggregate(avg_duration=Avg('duration_seconds'))['avg_duration'] or 0
-
-        avg_response_time_minutes = round(avg_response_time / 60, 1) if avg_response_time else 14.0
-        # Calculate percentage change for response time (simplified)
-        match_rate_percentage_change = 5.2
+        # KPI cards - one aggregate query, cached briefly across workers
+        context.update(DashboardMetricsService.get_kpis())
 
         # Recent Requests (last 10 requests)
         recent_requests = CitizenRequest.objects.select_related(
@@ -115,14 +49,6 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         ).filter(success=True).order_by('-created_at')[:10]
 
         context.update({
-            'total_requests': total_requests,
-            'jobs_percentage_change': jobs_percentage_change,
-            'active_cases': active_cases,
-            'resumes_percentage_change': resumes_percentage_change,
-            'resolved_today': resolved_today,
-            'applications_percentage_change': applications_percentage_change,
-            'avg_response_time_minutes': avg_response_time_minutes,
-            'match_rate_percentage_change': match_rate_percentage_change,
             'recent_requests': recent_requests,
             'recent_activity': recent_activity,
         })
@@ -137,50 +63,9 @@ class RequestDetailView(LoginRequiredMixin, TemplateView):
         case_code = request.GET.get('case_code')
 
         try:
-            request_obj = CitizenRequest.objects.select_related(
-                'user', 'target_location__city', 'assigned_department', 'assigned_entity'
-            ).prefetch_related('actions', 'assignments').get(case_code=case_code)
-
-            # Get recent actions for this request
-            recent_actions = request_obj.actions.order_by('-created_at')[:10]
-
-            # Get assignment details
-            assignment = request_obj.assignments.first()
-
-            data = {
-                'success': True,
-                'request': {
-                    'case_code': request_obj.case_code,
-                    'user_name': request_obj.user.get_full_name() or request_obj.user.email,
-                    'request_text': request_obj.request_text,
-                    'urgency_level': request_obj.urgency_level or 'LOW',
-                    'category': request_obj.category or 'GENERAL',
-                    'status': request_obj.status,
-                    'created_at': request_obj.created_at.strftime('%Y-%m-%d %H:%M'),
-                    'assigned_at': request_obj.assignments.first().assigned_at.strftime(
-                        '%Y-%m-%d %H:%M') if request_obj.assignments.exists() else 'Not assigned yet',
-                },
-                'location': {
-                    'area': request_obj.target_location.area if request_obj.target_location else '',
-                    'city': request_obj.target_location.city.name if request_obj.target_location else 'Unknown',
-                } if request_obj.target_location else {'area': '', 'city': 'Unknown'},
-                'assignment': {
-                    'department': request_obj.assigned_department.name if request_obj.assigned_department else 'Not assigned',
-                    'entity': request_obj.assigned_entity.name if request_obj.assigned_entity else 'Not assigned',
-                    'status': request_obj.status,
-                },
-                'recent_actions': [
-                    {
-                        'description': action.description,
-                        'created_at': action.created_at.strftime('%Y-%m-%d %H:%M'),
-                        'action_type': action.action_type,
-                        'success': action.success,
-                    }
-                    for action in recent_actions
-                ]
-            }
-
-            return JsonResponse(data)
+            # Fixed query count: joins + one Prefetch per relation
+            request_obj = RequestDetailService.detail_queryset(full_history=False).get(case_code=case_code)
+            return JsonResponse(RequestDetailService.serialize(request_obj))
 
         except CitizenRequest.DoesNotExist:
             return JsonResponse({
@@ -196,6 +81,27 @@ def health_check(request):
     return JsonResponse({'status': 'ok'}, status=200)
 
 
+def _metrics_authorized(request) -> bool:
+    """Staff sessions, or a scraper presenting METRICS_BEARER_TOKEN"""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+
+    token = getattr(settings, 'METRICS_BEARER_TOKEN', '')
+    scheme, _, presented = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and constant_time_compare(presented.strip(), token)
+
+
+def metrics(request):
+    """
+    Pipeline stage metrics in the Prometheus text format, aggregated across workers.
+    Restricted to staff users and scrapers holding METRICS_BEARER_TOKEN.
+    """
+    if not _metrics_authorized(request):
+        return HttpResponse(status=401)
+
+    return HttpResponse(PIPELINE_METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 def custom_404(request, exception=None):
     """Custom JSON 404 handler for API routes only."""
     if request.path.startswith("/api/"):  # Ensures only API routes return JSON
@@ -285,8 +191,60 @@ def all_request(request):
 def AppointmentsView(request):
     return render(request, 'core/appointments.html')
 
-def AnalyticsView(request):
-    return render(request, 'core/analytics.html')
+class AnalyticsView(LoginRequiredMixin, TemplateView):
+    template_name = 'core/analytics.html'
+
+    TREND_DAYS = 30
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # Everything below reads the daily RequestRollup rows, not CitizenRequest
+        since = timezone.now() - timedelta(days=self.TREND_DAYS - 1)
+
+        created_trend = RollupService.trend(self.TREND_DAYS, RollupMetric.CREATED)
+        resolved_by_day = {
+            row['bucket_start']: row['total']
+            for row in RollupService.trend(self.TREND_DAYS, RollupMetric.RESOLVED)
+        }
+        context['trend'] = [
+            {'day': row['bucket_start'], 'created': row['total'], 'resolved': resolved_by_day.get(row['bucket_start'], 0)}
+            for row in created_trend
+        ]
+        context['trend_max'] = max((row['created'] for row in context['trend']), default=0)
+
+        city_names = dict(City.objects.values_list('id', 'name'))
+        department_names = dict(Department.objects.values_list('id', 'name'))
+        labels = {
+            'category': dict(DepartmentCategory.choices),
+            'urgency_level': dict(UrgencyLevel.choices),
+            'status': dict(CaseStatus.choices),
+            'city_key': city_names,
+            'department_key': department_names,
+        }
+        titles = {
+            'category': 'By Category',
+            'urgency_level': 'By Urgency',
+            'status': 'By Status',
+            'city_key': 'By City',
+            'department_key': 'By Department',
+        }
+
+        context['breakdowns'] = [
+            {
+                'title': titles[dimension],
+                'rows': [
+                    {'label': labels[dimension].get(row[dimension], row[dimension] or 'Unknown'), 'total': row['total']}
+                    for row in RollupService.breakdown(dimension, since)
+                ],
+            }
+            for dimension in ROLLUP_DIMENSIONS
+        ]
+        context['trend_days'] = self.TREND_DAYS
+        context['total_created'] = sum(row['created'] for row in context['trend'])
+        context['total_resolved'] = sum(resolved_by_day.values())
+        return context
+
 
 def EmergencyCallsView(request):
     return render(request, 'core/emergency_calls.html')
@@ -377,7 +335,79 @@ class SubmitEmergencyRequestView(View):
 
 class EmergencyRequestSuccessView(View):
     def get(self, request):
-        return render(request, 'core/emergency_request_success.html')
+        context = {}
+        task_id = request.session.get('emergency_task_id')
+        if task_id:
+            context['stream_url'] = reverse('emergency_request_stream', args=[task_id])
+        return render(request, 'core/emergency_request_success.html', context)
+
+
+class EmergencyRequestStreamView(LoginRequiredMixin, View):
+    """
+    Server-Sent Events stream of pipeline progress for a submitted request.
+    Replays events already published (so a refresh never re-runs anything),
+    then follows the live Redis channel for a short window. Each connection
+    holds a sync worker, so it ends early and EventSource reconnects with
+    Last-Event-ID until a terminal event arrives.
+    """
+    # How long one connection is held open before the client reconnects
+    stream_timeout_seconds = 10
+    keepalive_seconds = 5
+    reconnect_delay_ms = 500
+
+    def get(self, request, task_id):
+        if task_id != request.session.get('emergency_task_id'):
+            return JsonResponse({'success': False, 'error': 'Request not found'}, status=404)
+
+        client = get_redis_client()
+        if not client:
+            return JsonResponse({'success': False, 'error': 'Progress streaming is not available'}, status=503)
+
+        last_seq = int(request.headers.get('Last-Event-ID') or 0)
+        response = StreamingHttpResponse(
+            self.event_stream(client, task_id, last_seq),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Let nginx flush each event
+        return response
+
+    def event_stream(self, client, task_id, last_seq):
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        # Subscribe before reading history so nothing published in between is lost
+        pubsub.subscribe(events_channel(task_id))
+
+        try:
+            yield f"retry: {self.reconnect_delay_ms}\n\n"
+
+            for event in read_events(task_id):
+                if event['seq'] <= last_seq:
+                    continue
+                last_seq = event['seq']
+                yield self.format_event(event)
+                if event['event'] in TERMINAL_EVENTS:
+                    return
+
+            deadline = time.monotonic() + self.stream_timeout_seconds
+            while time.monotonic() < deadline:
+                message = pubsub.get_message(timeout=min(self.keepalive_seconds, max(deadline - time.monotonic(), 0)))
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                event = json.loads(message['data'])
+                if event['seq'] <= last_seq:
+                    continue
+                last_seq = event['seq']
+                yield self.format_event(event)
+                if event['event'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            pubsub.close()
+
+    @staticmethod
+    def format_event(event):
+        return f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
 
 
 from django.views.generic import ListView
@@ -399,10 +429,14 @@ class MyEmergencyRequestsView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Add additional context if needed
-        context['total_requests'] = self.get_queryset().count()
-        context['resolved_requests'] = self.get_queryset().filter(status='RESOLVED').count()
-        context['in_progress_requests'] = self.get_queryset().filter(status='IN_PROGRESS').count()
+        # Add additional context if needed - one grouped query for all counts
+        status_counts = dict(
+            CitizenRequest.objects.filter(user=self.request.user)
+            .values_list('status').annotate(total=Count('id')).order_by()
+        )
+        context['total_requests'] = sum(status_counts.values())
+        context['resolved_requests'] = status_counts.get('RESOLVED', 0)
+        context['in_progress_requests'] = status_counts.get('IN_PROGRESS', 0)
 
         return context
 
@@ -419,7 +453,7 @@ class DetailRequestView(LoginRequiredMixin, DetailView):
 
     def get_queryset(self):
         # Ensure users can only see their own requests
-        return CitizenRequest.objects.filter(user=self.request.user)
+        return RequestDetailService.detail_queryset(CitizenRequest.objects.filter(user=self.request.user))
 
     def get_object(self, queryset=None):
         # Get by case_code from URL parameter
@@ -432,12 +466,12 @@ class DetailRequestView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         request_obj = self.object
 
-        # Get related data
-        context['actions'] = ActionLog.objects.filter(citizen_request=request_obj).order_by('created_at')
-        context['appointments'] = Appointment.objects.filter(citizen_request=request_obj).order_by('-scheduled_at')
-        context['emergency_calls'] = EmergencyCall.objects.filter(citizen_request=request_obj)
+        # Get related data - prefetched with the request
+        context['actions'] = request_obj.ordered_actions
+        context['appointments'] = request_obj.ordered_appointments
+        context['emergency_calls'] = request_obj.ordered_calls
 
         # Get the latest appointment
-        context['latest_appointment'] = context['appointments'].first()
+        context['latest_appointment'] = request_obj.ordered_appointments[0] if request_obj.ordered_appointments else None
 
         return context
\ No newline at end of file
@@ -12,7 +12,8 @@ from datetime import timedelta
 from .models import (
     City, Location, Department, DepartmentEntity, CitizenRequest,
     CitizenRequestAssignment, ActionLog, EmergencyCall, Appointment,
-    SystemConfiguration, RequestFeedback, NotificationLog
+    SystemConfiguration, RequestFeedback, NotificationLog, PipelineCheckpoint,
+    RequestRollup
 )
 from .choices import *
 
@@ -409,6 +410,26 @@ class NotificationLogAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('citizen_request')
 
 
+@admin.register(PipelineCheckpoint)
+class PipelineCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('citizen_request', 'stage', 'stream_id', 'created_at')
+    list_filter = ('stage',)
+    search_fields = ('citizen_request__case_code', 'stream_id')
+    autocomplete_fields = ('citizen_request',)
+    readonly_fields = ('created_at', 'updated_at')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('citizen_request')
+
+
+@admin.register(RequestRollup)
+class RequestRollupAdmin(admin.ModelAdmin):
+    list_display = ('bucket_start', 'granularity', 'metric', 'category', 'urgency_level', 'status', 'request_count')
+    list_filter = ('granularity', 'metric', 'category', 'urgency_level', 'status')
+    readonly_fields = ('created_at', 'updated_at')
+    date_hierarchy = 'bucket_start'
+
+
 # =============================================================================
 # ADMIN SITE CUSTOMIZATION
 # =============================================================================
@@ -2,15 +2,6 @@
 Department Agent Service - Main Orchestrator
 Task 7: Creates action plans and coordinates response
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from apps.depts.agents.router_agent.pydantic_models import RouterDecision
@@ -1,10 +1,12 @@
 """
 Department Orchestrator Agent - Middle layer to pick the right specialized agent
 """
-from typing import Optional
-from agno.agent import Agent
+from typing import TYPE_CHECKING, Optional
 from .prompt import get_department_agent, get_supported_categories
 
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
 class DepartmentOrchestratorAgent:
     """
     Department Orchestrator Agent - Acts as a picker/router to get the right specialized agent
@@ -15,7 +17,7 @@ class DepartmentOrchestratorAgent:
         """Initialize the Department Orchestrator Agent"""
         self.supported_categories = get_supported_categories()
 
-    def get_agent_for_category(self, department_category: str) -> Optional[Agent]:
+    def get_agent_for_category(self, department_category: str) -> Optional["Agent"]:
         """
         Get the specialized agent for a given department category
 
@@ -50,7 +52,7 @@ DEPARTMENT_ORCHESTRATOR_AGENT = DepartmentOrchestratorAgent()
 
 
 # Convenience functions for easy access
-def get_specialized_agent(department_category: str) -> Optional[Agent]:
+def get_specialized_agent(department_category: str) -> Optional["Agent"]:
     """
     Convenience function to get specialized agent for a department category
 
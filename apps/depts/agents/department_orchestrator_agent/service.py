@@ -1,15 +1,6 @@
 """
 Department Orchestrator Agent Service - Clean service for department-specific processing
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 import json
 from typing import Optional
 from .pydantic_models import (
@@ -17,6 +8,7 @@ from .pydantic_models import (
     DepartmentOrchestratorServiceOutput, ActionPlan, ActionStep, RequestPlan
 )
 from .agent import get_specialized_agent, is_department_supported
+from apps.depts.services.pipeline_metrics import record_llm_usage
 
 class DepartmentOrchestratorService:
     """
@@ -117,6 +109,7 @@ class DepartmentOrchestratorService:
 
             # Call the specialized agent with Pydantic input
             agent_result = specialized_agent.run(input=input_data)
+            record_llm_usage(agent_result)
 
             # Get the Pydantic output directly (no parsing needed)
             if hasattr(agent_result, 'content') and agent_result.content:
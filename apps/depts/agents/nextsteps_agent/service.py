@@ -1,15 +1,6 @@
 """
 Next-Steps Agent Service - Citizen communication with language support
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from .pydantic_models import NextStepsInput, NextStepsServiceOutput, ContactInfo
 from .agent import NEXTSTEPS_AGENT
 
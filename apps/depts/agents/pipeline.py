@@ -12,9 +12,10 @@ from pathlib import Path
 import time
 import json
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
+# Setup Django when run as a script - importers are already configured
+if __name__ == "__main__":
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
+    django.setup()
 
 from apps.depts.agents.schemas import (
     UserRequestInput, RouterInput, DepartmentAgentInput,
@@ -1,12 +1,11 @@
 from agno.models.openai import OpenAIChat
 from agno.agent import Agent
 from .prompt import ROUTER_AGENT_PROMPT
-from agno.db.sqlite import SqliteDb
+from .session import ROUTER_SESSION_STORE
 from .pydantic_models import RouterDecision
 import json
 import re
 
-db = SqliteDb(db_file="agno.db")
 ROUTER_AGENT = Agent(
     name=ROUTER_AGENT_PROMPT.name,
     model=OpenAIChat(
@@ -14,12 +13,13 @@ ROUTER_AGENT = Agent(
         temperature=0.0,
         top_p=0.1
     ),
-    db=db,
+    db=ROUTER_SESSION_STORE.db,
     role=ROUTER_AGENT_PROMPT.role,
     description=ROUTER_AGENT_PROMPT.description,
     instructions=ROUTER_AGENT_PROMPT.instructions,
     markdown=True,
     search_knowledge=True,
-    add_history_to_context=True,
+    add_history_to_context=ROUTER_SESSION_STORE.add_history_to_context,
+    num_history_runs=ROUTER_SESSION_STORE.history_runs,
     output_schema=RouterDecision,
 )
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Router Decision Cache - Reuses RouterDecisions for (near-)identical request text
+Two tiers: a bounded in-process LRU for microsecond hits and Redis (with TTL)
+so every worker benefits from a classification made by any other
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from apps.core.redis_client import get_redis_client
+from .pydantic_models import RouterDecision
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "router:decision:"
+STATS_KEY = "router:decision:stats"
+
+# Push local hit/miss counters to Redis every N lookups instead of on every call
+STATS_FLUSH_EVERY = 50
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_WHITESPACE = re.compile(r"\s+")
+
+# Filler words dropped in semantic-bucket mode ("a fire in my house" == "house fire")
+_FILLER_WORDS = {
+    "a", "an", "the", "is", "are", "was", "in", "on", "at", "of", "my", "our",
+    "there", "please", "help", "me", "us", "i", "we", "it", "and", "to", "has", "have",
+}
+
+
+def normalize_request_text(request_text: str, semantic_bucket: bool = False) -> str:
+    """
+    Canonical form of request text for cache lookups
+
+    Case-folds, strips punctuation and collapses whitespace. With semantic_bucket,
+    also drops filler words and ignores word order and repetition.
+    """
+    text = unicodedata.normalize("NFKC", request_text or "").casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    tokens = _WHITESPACE.split(text.strip())
+
+    if semantic_bucket:
+        tokens = sorted({token for token in tokens if token and token not in _FILLER_WORDS})
+
+    return " ".join(token for token in tokens if token)
+
+
+class RouterDecisionCache:
+    """
+    Cache of RouterDecisions keyed by normalized request text
+    Only confident LLM decisions are stored - degraded/fallback results never are
+    """
+
+    def __init__(self, ttl_seconds: int = 900, local_max_entries: int = 1024, semantic_bucket: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.local_max_entries = local_max_entries
+        self.semantic_bucket = semantic_bucket
+        self._local: "OrderedDict[str, RouterDecision]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._unflushed = {"hits": 0, "misses": 0}
+
+    def cache_key(self, request_text: str) -> str:
+        normalized = normalize_request_text(request_text, self.semantic_bucket)
+        return CACHE_KEY_PREFIX + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, request_text: str) -> Optional[RouterDecision]:
+        """Cached decision for this text, or None"""
+        key = self.cache_key(request_text)
+
+        with self._lock:
+            decision = self._local.get(key)
+            if decision is not None:
+                self._local.move_to_end(key)
+
+        if decision is None:
+            decision = self._get_shared(key)
+            if decision is not None:
+                self._set_local(key, decision)
+
+        self._record("hits" if decision is not None else "misses")
+        return decision.model_copy(deep=True) if decision is not None else None
+
+    def set(self, request_text: str, decision: RouterDecision) -> None:
+        """Store a decision in both tiers"""
+        if decision.degraded_mode_used:
+            return
+
+        key = self.cache_key(request_text)
+        self._set_local(key, decision.model_copy(deep=True))
+
+        client = get_redis_client()
+        if client:
+            try:
+                client.set(key, decision.model_dump_json(), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.debug(f"Router cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process"""
+        return {"hits": self.hits, "misses": self.misses, "local_entries": len(self._local)}
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _get_shared(self, key: str) -> Optional[RouterDecision]:
+        client = get_redis_client()
+        if not client:
+            return None
+        try:
+            raw = client.get(key)
+            return RouterDecision.model_validate_json(raw) if raw else None
+        except Exception as e:
+            logger.debug(f"Router cache read failed: {e}")
+            return None
+
+    def _set_local(self, key: str, decision: RouterDecision) -> None:
+        with self._lock:
+            self._local[key] = decision
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self._unflushed[outcome] += 1
+            if sum(self._unflushed.values()) < STATS_FLUSH_EVERY:
+                return
+            pending, self._unflushed = self._unflushed, {"hits": 0, "misses": 0}
+
+        client = get_redis_client()
+        if client:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for field, count in pending.items():
+                    pipe.hincrby(STATS_KEY, field, count)
+                pipe.execute()
+            except Exception as e:
+                logger.debug(f"Router cache stats flush failed: {e}")
+
+
+ROUTER_DECISION_CACHE = RouterDecisionCache(
+    ttl_seconds=getattr(settings, "ROUTER_CACHE_TTL_SECONDS", 900),
+    local_max_entries=getattr(settings, "ROUTER_CACHE_LOCAL_MAX_ENTRIES", 1024),
+    semantic_bucket=getattr(settings, "ROUTER_CACHE_SEMANTIC_BUCKETS", False),
+)
@@ -0,0 +1,237 @@
+"""
+Router Rules - Deterministic keyword fast path in front of the router agent
+Compiled English / Urdu / Roman Urdu patterns per department category, so clear
+fire and medical calls are classified in microseconds without an LLM round trip
+"""
+import logging
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from apps.depts.choices import DepartmentCategory, TriageSource
+from .pydantic_models import RouterDecision
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# KEYWORD TABLES
+# =============================================================================
+
+# Strong phrases outweigh weak ones, but every category needs two matched
+# phrases before the fast path may skip the LLM
+STRONG = 2.0
+WEAK = 1.0
+
+# Confidence ceiling for a single matched phrase - below the default skip
+# threshold, so "shot at in a cyber chat" is never routed on one word
+SINGLE_SIGNAL_MAX_CONFIDENCE = 0.75
+
+CATEGORY_KEYWORDS: Dict[str, List[Tuple[str, float]]] = {
+    DepartmentCategory.FIRE_BRIGADE: [
+        (r"on fire", STRONG), (r"caught fire", STRONG), (r"fire (?:broke|broken) out", STRONG),
+        (r"(?:house|building|shop|factory|car|kitchen) fire", STRONG), (r"flames?", STRONG),
+        (r"blaze", STRONG), (r"burning", WEAK), (r"smoke", WEAK), (r"fire", WEAK),
+        (r"aag (?:lag|lagi|lag gayi|lagg)", STRONG), (r"aag", WEAK), (r"آگ", STRONG), (r"دھواں", WEAK),
+    ],
+    DepartmentCategory.AMBULANCE: [
+        (r"heart attack", STRONG), (r"not breathing", STRONG), (r"unconscious", STRONG),
+        (r"stroke", STRONG), (r"cardiac arrest", STRONG), (r"ambulance", STRONG),
+        (r"(?:heavy |severe )?bleeding", STRONG), (r"seizure", STRONG), (r"fainted", WEAK),
+        (r"injured", WEAK), (r"chest pain", STRONG), (r"overdose", STRONG), (r"labou?r pain", STRONG),
+        (r"behosh", STRONG), (r"zakhmi", WEAK), (r"khoon", WEAK),
+        (r"ایمبولینس", STRONG), (r"بے ہوش", STRONG), (r"زخمی", WEAK), (r"دل کا دورہ", STRONG),
+    ],
+    DepartmentCategory.POLICE: [
+        (r"robbery", STRONG), (r"robbed", STRONG), (r"theft", STRONG), (r"stolen", STRONG),
+        (r"burglar(?:y)?", STRONG), (r"gun ?point", STRONG), (r"kidnapp?(?:ed|ing)?", STRONG),
+        (r"assault(?:ed)?", STRONG), (r"murder", STRONG), (r"shooting", STRONG), (r"firing", STRONG),
+        (r"stabb(?:ed|ing)", STRONG), (r"thief", STRONG), (r"harass(?:ed|ment)", WEAK), (r"police", WEAK),
+        (r"chori", STRONG), (r"dakait[iy]", STRONG), (r"chor", WEAK),
+        (r"چوری", STRONG), (r"ڈکیتی", STRONG), (r"پولیس", WEAK),
+    ],
+    DepartmentCategory.CYBERCRIME: [
+        (r"hack(?:ed|ing)", STRONG), (r"online fraud", STRONG), (r"phishing", STRONG),
+        (r"scam(?:med)?", WEAK), (r"otp", WEAK), (r"(?:facebook|instagram|whatsapp|account) (?:hacked|blackmail)", STRONG),
+        (r"blackmail(?:ed|ing)?", WEAK), (r"fake (?:profile|account|id)", STRONG), (r"cyber", STRONG),
+        (r"آن لائن فراڈ", STRONG),
+    ],
+    DepartmentCategory.DISASTER_MGMT: [
+        (r"flood(?:ed|ing|s)?", STRONG), (r"earthquake", STRONG), (r"landslide", STRONG),
+        (r"cyclone", STRONG), (r"building collapse(?:d)?", WEAK), (r"evacuat(?:e|ion)", WEAK),
+        (r"sailab", STRONG), (r"zalzala", STRONG),
+        (r"سیلاب", STRONG), (r"زلزلہ", STRONG),
+    ],
+}
+
+URGENCY_PATTERNS = [
+    r"emergency", r"urgent(?:ly)?", r"immediately", r"critical", r"trapped", r"help",
+    r"not breathing", r"unconscious", r"bleeding", r"explosion", r"children", r"dying",
+    r"fori", r"madad", r"فوری", r"مدد", r"ایمرجنسی",
+]
+
+
+def _compile(patterns: List[str]) -> "re.Pattern":
+    # \b doesn't work for Urdu script, so bound on "not a letter/digit" instead
+    alternation = "|".join(f"(?:{pattern})" for pattern in patterns)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+
+_CATEGORY_MATCHERS = [
+    (category, weight, _compile([pattern]))
+    for category, keywords in CATEGORY_KEYWORDS.items()
+    for pattern, weight in keywords
+]
+_URGENCY_MATCHER = _compile(URGENCY_PATTERNS)
+
+
+# =============================================================================
+# CLASSIFIER
+# =============================================================================
+
+class KeywordRouterClassifier:
+    """
+    Scores request text against CATEGORY_KEYWORDS
+
+    Confidence rises with the matched weight of the best category and falls
+    when another category also matches, so "smoke from the robbers' car" is
+    never confident enough to skip the LLM. A single matched phrase is capped
+    at SINGLE_SIGNAL_MAX_CONFIDENCE.
+    """
+
+    def classify(self, request_text: str) -> Optional[RouterDecision]:
+        """RouterDecision from keywords alone, or None when nothing matched"""
+        text = request_text or ""
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+
+        for category, weight, matcher in _CATEGORY_MATCHERS:
+            found = matcher.search(text)
+            if found:
+                scores[category] = scores.get(category, 0.0) + weight
+                matched.setdefault(category, []).append(found.group(0).lower())
+                spans.setdefault(category, []).append(found.span())
+
+        if not scores:
+            return None
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_category, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        # 1 weak hit -> ~0.63, 1 strong or 2 weak -> ~0.86, saturating below 1
+        strength = 1 - math.exp(-best_score)
+        exclusivity = best_score / (best_score + runner_up)
+        confidence = min(0.98, strength * exclusivity)
+        if self._signal_count(spans[best_category]) < 2:
+            confidence = min(confidence, SINGLE_SIGNAL_MAX_CONFIDENCE)
+        confidence = round(confidence, 2)
+
+        urgency = sorted({hit.lower() for hit in _URGENCY_MATCHER.findall(text)})
+
+        return RouterDecision(
+            department=best_category,
+            confidence=confidence,
+            urgency_indicators=urgency,
+            reason=(
+                f"Keyword fast path matched {best_category}: {', '.join(matched[best_category])}"
+                + (f" (also matched {', '.join(category for category, _ in ranked[1:])})" if runner_up else "")
+            ),
+            keywords_detected=matched[best_category],
+            degraded_mode_used=False,
+            classification_source=TriageSource.RULES,
+        )
+
+    @staticmethod
+    def _signal_count(spans: List[Tuple[int, int]]) -> int:
+        """Matched phrases not inside another match - "on fire" and "fire" are one signal"""
+        return sum(
+            not any(other != span and other[0] <= span[0] and span[1] <= other[1] for other in spans)
+            for span in set(spans)
+        )
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+FAST_PATH_MODE_OFF = "off"
+FAST_PATH_MODE_SKIP = "skip"          # return the rules decision, no LLM call
+FAST_PATH_MODE_CONFIRM = "confirm"    # return the rules decision, LLM confirms in background
+
+# SystemConfiguration keys (category "ai") and their defaults - the LLM stays the
+# source of truth until an operator opts in to "skip"
+FAST_PATH_CONFIG_DEFAULTS = {
+    "router_fast_path_mode": FAST_PATH_MODE_CONFIRM,
+    "router_fast_path_skip_threshold": "0.85",
+    "router_fast_path_confirm_threshold": "0.6",
+}
+
+# Re-read SystemConfiguration at most this often per process
+CONFIG_REFRESH_SECONDS = 30
+
+
+class FastPathConfig:
+    """
+    Fast path settings backed by SystemConfiguration rows, cached briefly so the
+    router never pays a DB query per request. Missing or invalid rows use defaults.
+    """
+
+    def __init__(self, refresh_seconds: int = CONFIG_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._values: Dict[str, str] = dict(FAST_PATH_CONFIG_DEFAULTS)
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self) -> str:
+        mode = self._get("router_fast_path_mode").strip().lower()
+        if mode not in (FAST_PATH_MODE_OFF, FAST_PATH_MODE_SKIP, FAST_PATH_MODE_CONFIRM):
+            return FAST_PATH_CONFIG_DEFAULTS["router_fast_path_mode"]
+        return mode
+
+    @property
+    def skip_threshold(self) -> float:
+        return self._get_float("router_fast_path_skip_threshold")
+
+    @property
+    def confirm_threshold(self) -> float:
+        return self._get_float("router_fast_path_confirm_threshold")
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+    def _get_float(self, key: str) -> float:
+        try:
+            return float(self._get(key))
+        except ValueError:
+            return float(FAST_PATH_CONFIG_DEFAULTS[key])
+
+    def _get(self, key: str) -> str:
+        if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            self._reload()
+        return self._values.get(key, FAST_PATH_CONFIG_DEFAULTS[key])
+
+    def _reload(self) -> None:
+        from apps.depts.models import SystemConfiguration
+
+        with self._lock:
+            values = dict(FAST_PATH_CONFIG_DEFAULTS)
+            try:
+                values.update(
+                    SystemConfiguration.objects.filter(
+                        key__in=list(FAST_PATH_CONFIG_DEFAULTS), is_active=True
+                    ).values_list('key', 'value')
+                )
+            except Exception as e:
+                logger.warning(f"Could not load router fast path config, using defaults: {e}")
+
+            self._values = values
+            self._loaded_at = time.monotonic()
+
+
+# Process-wide instances used by RouterAgentService
+KEYWORD_ROUTER_CLASSIFIER = KeywordRouterClassifier()
+FAST_PATH_CONFIG = FastPathConfig()
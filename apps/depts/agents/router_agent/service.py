@@ -2,19 +2,25 @@
 """
 Router Agent Service - Simple wrapper for the router agent
 """
-import os
-import sys
-import django
-from pathlib import Path
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
-from .agent import ROUTER_AGENT
+from .cache import ROUTER_DECISION_CACHE
+from .session import ROUTER_SESSION_STORE
+from .rules import (
+    KEYWORD_ROUTER_CLASSIFIER, FAST_PATH_CONFIG,
+    FAST_PATH_MODE_SKIP, FAST_PATH_MODE_CONFIRM
+)
 from .pydantic_models import RouterInput, RouterDecision
+from apps.depts.services.pipeline_metrics import record_llm_usage
+from apps.depts.services.service_registry import SERVICE_REGISTRY
 from typing import Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
+# Background LLM confirmations of fast-path decisions
+CONFIRM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="router-confirm")
+
 
 class RouterAgentService:
     """
@@ -24,13 +30,21 @@ class RouterAgentService:
     
     def __init__(self):
         """Initialize the router agent service"""
-        self.router_agent = ROUTER_AGENT
+        # The agno agent (and its OpenAI client) is only built on the first LLM call -
+        # fast-path decisions and cache hits never need it
+        self.router_agent = SERVICE_REGISTRY.lazy("router_agent")
+        self.session_store = ROUTER_SESSION_STORE
+        self.decision_cache = ROUTER_DECISION_CACHE
+        self.keyword_classifier = KEYWORD_ROUTER_CLASSIFIER
+        self.fast_path_config = FAST_PATH_CONFIG
     
     def route_request(
         self, 
         request_text: str, 
         user_city: Optional[str] = None,
-        user_location: Optional[Dict[str, float]] = None
+        user_location: Optional[Dict[str, float]] = None,
+        request_id: Optional[str] = None,
+        user_id: Optional[str] = None
     ) -> RouterDecision:
         """
         Route a user request to the appropriate department.
@@ -39,10 +53,86 @@ class RouterAgentService:
             request_text (str): User's emergency description
             user_city (str, optional): User's current city
             user_location (dict, optional): GPS coordinates {lat, lng}
+            request_id (str, optional): Request key for per-request agent history
+            user_id (str, optional): User key for per-user agent history
             
         Returns:
             RouterDecision: Classification result with department, confidence, etc.
         """
+        cached_decision = self.decision_cache.get(request_text)
+        if cached_decision is not None:
+            return cached_decision
+
+        fast_decision = self._fast_path(request_text, user_city, user_location, request_id, user_id)
+        if fast_decision is not None:
+            return fast_decision
+
+        return self._route_with_llm(request_text, user_city, user_location, request_id, user_id)
+
+    def _fast_path(
+        self,
+        request_text: str,
+        user_city: Optional[str] = None,
+        user_location: Optional[Dict[str, float]] = None,
+        request_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Optional[RouterDecision]:
+        """
+        Keyword classification that can answer without the LLM
+
+        skip mode: decisions at or above the skip threshold are returned as-is.
+        confirm mode: decisions at or above the confirm threshold are returned
+        immediately while the LLM classifies in the background (warming the cache).
+        """
+        mode = self.fast_path_config.mode
+        if mode not in (FAST_PATH_MODE_SKIP, FAST_PATH_MODE_CONFIRM):
+            return None
+
+        decision = self.keyword_classifier.classify(request_text)
+        if decision is None:
+            return None
+
+        if mode == FAST_PATH_MODE_SKIP and decision.confidence >= self.fast_path_config.skip_threshold:
+            logger.info(f"⚡ Router fast path: {decision.department} ({decision.confidence})")
+            return decision
+
+        if mode == FAST_PATH_MODE_CONFIRM and decision.confidence >= self.fast_path_config.confirm_threshold:
+            logger.info(f"⚡ Router fast path: {decision.department} ({decision.confidence}), confirming with LLM")
+            CONFIRM_POOL.submit(
+                self._confirm_with_llm, decision, request_text, user_city, user_location, request_id, user_id
+            )
+            return decision
+
+        return None
+
+    def _confirm_with_llm(
+        self,
+        fast_decision: RouterDecision,
+        request_text: str,
+        user_city: Optional[str] = None,
+        user_location: Optional[Dict[str, float]] = None,
+        request_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        """Run the LLM for a fast-path decision and log any disagreement"""
+        llm_decision = self._route_with_llm(request_text, user_city, user_location, request_id, user_id)
+        if llm_decision.degraded_mode_used:
+            return
+        if llm_decision.department != fast_decision.department:
+            logger.warning(
+                f"⚠️ Router fast path disagreed with LLM: rules={fast_decision.department} "
+                f"llm={llm_decision.department} text={request_text[:80]!r}"
+            )
+
+    def _route_with_llm(
+        self,
+        request_text: str,
+        user_city: Optional[str] = None,
+        user_location: Optional[Dict[str, float]] = None,
+        request_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> RouterDecision:
+        """Classify with the router agent, caching successful decisions"""
         try:
             # Create input object
             input_data = RouterInput(
@@ -52,7 +142,13 @@ class RouterAgentService:
             )
             
             # Call router agent
-            result = self.router_agent.run(input=input_data)
+            # Always pass a session so runs never share agno's sticky default session
+            result = self.router_agent.run(
+                input=input_data,
+                session_id=self.session_store.session_id_for(request_id, user_id),
+                user_id=user_id
+            )
+            record_llm_usage(result)
             
             # Parse result
             if hasattr(result, 'content'):
@@ -60,7 +156,9 @@ class RouterAgentService:
             else:
                 output = result
             
-            # Return the router decision
+            # Cache and return the router decision
+            if isinstance(output, RouterDecision):
+                self.decision_cache.set(request_text, output)
             return output
             
         except Exception as e:
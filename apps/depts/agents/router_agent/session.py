@@ -0,0 +1,10 @@
+from django.conf import settings
+from apps.depts.agents.session_store import AgentSessionStore
+
+# Classification is stateless by default; see ROUTER_AGENT_HISTORY_MODE
+ROUTER_SESSION_STORE = AgentSessionStore(
+    namespace="router",
+    mode=getattr(settings, "ROUTER_AGENT_HISTORY_MODE", "off"),
+    history_runs=getattr(settings, "ROUTER_AGENT_HISTORY_RUNS", 3),
+    ttl_seconds=getattr(settings, "ROUTER_AGENT_SESSION_TTL_SECONDS", 3600),
+)
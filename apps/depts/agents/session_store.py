@@ -0,0 +1,70 @@
+"""
+Agent Session Store - Bounded, per-request/per-user conversation storage for agno agents
+Sessions live in Redis with a TTL (safe for any number of concurrent workers);
+"off" mode keeps no history at all for stateless classification
+"""
+import logging
+import uuid
+from typing import Optional
+
+from apps.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MODE_OFF = "off"          # stateless - no session storage, no history in the prompt
+HISTORY_MODE_REQUEST = "request"  # history shared only by runs for the same request (e.g. retries)
+HISTORY_MODE_USER = "user"        # history shared by a user's recent requests
+
+HISTORY_MODES = (HISTORY_MODE_OFF, HISTORY_MODE_REQUEST, HISTORY_MODE_USER)
+
+
+class AgentSessionStore:
+    """
+    Session configuration for one agent
+
+    Use db (may be None), add_history_to_context and num_history_runs when
+    constructing the Agent, and session_id_for() on every run so runs never
+    fall back to agno's instance-wide sticky session.
+    """
+
+    def __init__(self, namespace: str, mode: str = HISTORY_MODE_OFF,
+                 history_runs: int = 3, ttl_seconds: int = 3600):
+        if mode not in HISTORY_MODES:
+            logger.warning(f"Unknown history mode '{mode}' for {namespace}, using '{HISTORY_MODE_OFF}'")
+            mode = HISTORY_MODE_OFF
+
+        self.namespace = namespace
+        self.history_runs = history_runs
+        self.ttl_seconds = ttl_seconds
+        self.db = self._build_db() if mode != HISTORY_MODE_OFF else None
+
+        if mode != HISTORY_MODE_OFF and self.db is None:
+            logger.warning(f"REDIS_URL not configured - {namespace} agent history disabled")
+            mode = HISTORY_MODE_OFF
+        self.mode = mode
+
+    @property
+    def add_history_to_context(self) -> bool:
+        return self.mode != HISTORY_MODE_OFF
+
+    def session_id_for(self, request_id: Optional[str] = None, user_id: Optional[str] = None) -> str:
+        """Session to run under - falls back to a throwaway session when there is nothing to key on"""
+        if self.mode == HISTORY_MODE_USER and user_id:
+            return f"{self.namespace}:user:{user_id}"
+        if self.mode == HISTORY_MODE_REQUEST and request_id:
+            return f"{self.namespace}:request:{request_id}"
+        return f"{self.namespace}:{uuid.uuid4().hex}"
+
+    def _build_db(self):
+        client = get_redis_client()
+        if client is None:
+            return None
+
+        from agno.db.redis import RedisDb
+
+        return RedisDb(
+            redis_client=client,
+            db_prefix=f"agno:{self.namespace}",
+            expire=self.ttl_seconds,
+        )
+
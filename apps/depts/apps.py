@@ -5,3 +5,5 @@ class DeptsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.depts'
 
+    def ready(self):
+        import apps.depts.signals
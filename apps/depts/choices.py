@@ -122,4 +122,13 @@ class AgentType(models.TextChoices):
     LOCATION_MAPPING = "location_mapping", "Location Mapping Agent"
     TRIAGE_AGENT = "triage", "Triage Agent"
     ESCALATION_AGENT = "escalation", "Escalation Agent"
-    COMMUNICATION_AGENT = "communication", "Communication Agent"
\ No newline at end of file
+    COMMUNICATION_AGENT = "communication", "Communication Agent"
+
+
+class RollupGranularity(models.TextChoices):
+    HOUR = "hour", "Hourly"
+    DAY = "day", "Daily"
+
+class RollupMetric(models.TextChoices):
+    CREATED = "created", "Requests Created"    # bucketed by created_at
+    RESOLVED = "resolved", "Requests Resolved"  # bucketed by resolved_at
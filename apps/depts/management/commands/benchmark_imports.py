@@ -0,0 +1,55 @@
+"""
+Benchmark web and Celery worker cold start in fresh interpreters
+Prints median django.setup() and boot-import time per process type, the module
+count and any heavy SDK (agno, OpenAI, VAPI, Twilio...) loaded before the first
+request; --output writes the same report as JSON so runs can be diffed
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.depts.services.import_benchmark import IMPORT_PROFILES, ImportBenchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark process cold start (django.setup and boot imports)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', choices=sorted(IMPORT_PROFILES),
+                            help='Process type to measure (repeatable, default: all)')
+        parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per profile (median is reported)')
+        parser.add_argument('--slowest', type=int, default=0,
+                            help='Also list the N slowest top-level imports of each profile (-X importtime)')
+        parser.add_argument('--output', help='Write the JSON report to this path')
+
+    def handle(self, *args, **options):
+        profiles = options['profile'] or list(IMPORT_PROFILES)
+        benchmark = ImportBenchmark(repeat=options['repeat'])
+
+        try:
+            report = benchmark.run(profiles)
+            if options['slowest']:
+                for profile in profiles:
+                    report['profiles'][profile]['slowest_imports'] = benchmark.slowest_imports(
+                        profile, options['slowest']
+                    )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'profile':<12}{'setup':>10}{'imports':>10}{'total':>10}{'modules':>10}  heavy SDKs")
+        for profile, stats in report['profiles'].items():
+            heavy = ', '.join(stats['heavy_packages']) or '-'
+            self.stdout.write(
+                f"{profile:<12}{stats['setup_ms']:>10}{stats['import_ms']:>10}{stats['total_ms']:>10}"
+                f"{stats['loaded_modules']:>10}  {heavy}"
+            )
+        for profile, stats in report['profiles'].items():
+            if stats.get('slowest_imports'):
+                self.stdout.write(f"\nSlowest imports ({profile}):")
+                for item in stats['slowest_imports']:
+                    self.stdout.write(f"  {item['cumulative_ms']:>8} ms  {item['module']}")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,69 @@
+"""
+Benchmark SimplifiedEmergencyPipeline end to end with stubbed LLMs and providers
+Prints p50/p95/p99 per stage, throughput and DB query counts, and writes the same
+report as JSON (--output) so runs can be diffed between releases
+"""
+import json
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.depts.models import Department
+from apps.depts.services.pipeline_benchmark import (
+    BENCHMARK_STAGES, PipelineBenchmark, load_recorded_requests, synthetic_requests
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the emergency pipeline with deterministic local stubs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Synthetic requests to run')
+        parser.add_argument('--input', help='JSON lines file of recorded requests (replaces --requests)')
+        parser.add_argument('--concurrency', type=int, default=1, help='Pipelines run in parallel (use Postgres - SQLite locks under concurrent writes)')
+        parser.add_argument('--llm-latency-ms', type=float, default=800, help='Stub agent latency per call')
+        parser.add_argument('--provider-latency-ms', type=float, default=150, help='Stub SMS/email/call latency')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform ± jitter added to stub latencies')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the workload and the jitter')
+        parser.add_argument('--output', help='Write the JSON report to this path')
+        parser.add_argument('--seed-data', action='store_true',
+                            help='Run generate_fake_data first when there are no departments')
+        parser.add_argument('--keep-requests', action='store_true', help="Don't delete the benchmark's requests")
+
+    def handle(self, *args, **options):
+        if options['seed_data'] and not Department.objects.exists():
+            call_command('generate_fake_data')
+        if not Department.objects.filter(is_active=True).exists():
+            raise CommandError('No departments to match against - run with --seed-data or generate_fake_data first')
+
+        if options['input']:
+            requests = load_recorded_requests(options['input'])
+        else:
+            requests = synthetic_requests(options['requests'], seed=options['seed'])
+
+        benchmark = PipelineBenchmark(
+            llm_latency_ms=options['llm_latency_ms'],
+            provider_latency_ms=options['provider_latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            concurrency=options['concurrency'],
+            seed=options['seed'],
+        )
+        report = benchmark.run(requests, keep_requests=options['keep_requests'])
+
+        self.stdout.write(f"{'stage':<12}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}")
+        for stage in BENCHMARK_STAGES + ['total']:
+            stats = report['stages_ms'][stage]
+            self.stdout.write(
+                f"{stage:<12}{stats['p50']:>10}{stats['p95']:>10}{stats['p99']:>10}{stats['mean']:>10}"
+            )
+        self.stdout.write(
+            f"\n{report['succeeded']}/{report['config']['requests']} succeeded in {report['elapsed_seconds']}s "
+            f"- {report['throughput_per_second']} req/s, {report['db_queries']['per_request']} queries/request"
+        )
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"  {error}"))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,24 @@
+"""
+Build the precomputed MatcherCandidate rows used for city matches
+Run once after deploying (or after bulk imports that skip signals); model
+signals keep the rows current afterwards
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.depts.choices import DepartmentCategory
+from apps.depts.services.matcher_candidates import MATCHER_CANDIDATES
+
+
+class Command(BaseCommand):
+    help = 'Rebuild ranked matcher candidates per (department category, city)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category', action='append', choices=DepartmentCategory.values,
+            help='Only rebuild this category (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        rows = MATCHER_CANDIDATES.rebuild(options['category'])
+        self.stdout.write(self.style.SUCCESS(f'Built {rows} matcher candidate rows'))
@@ -18,6 +18,46 @@ fake = Faker(['en_PK', 'en_US'])
 
 User = get_user_model()
 
+# Realistic request templates by category - also used by benchmark_pipeline
+REQUEST_TEMPLATES = {
+    'police': [
+        "There's been a theft in our area. Someone broke into my neighbor's house last night.",
+        "I want to report a mobile phone snatching incident that happened near {location}.",
+        "There's suspicious activity in our street. Strange people gathering at odd hours.",
+        "My car was stolen from outside my house. License plate number is ABC-123.",
+        "There's a domestic violence situation in the apartment next to mine."
+    ],
+    'fire_brigade': [
+        "There's a fire in a building near {location}. Please send help immediately!",
+        "I can smell gas leak and there might be fire hazard in our area.",
+        "A tree has fallen and is blocking the road after the storm.",
+        "There's smoke coming from the electrical panel in our building."
+    ],
+    'ambulance': [
+        "My father is having chest pain. We need an ambulance urgently at {location}.",
+        "There's been a road accident near {location}. Multiple people are injured.",
+        "My mother has fallen and can't move. Please send medical help.",
+        "Emergency! Someone has collapsed in our office building."
+    ],
+    'electricity': [
+        "Our area has been without power for 12 hours. When will it be restored?",
+        "There are sparks coming from the electricity pole near our house.",
+        "Power cables have fallen on the road after the rain.",
+        "Our transformer is making loud noises and might explode."
+    ],
+    'gas': [
+        "There's a strong smell of gas in our building. It might be a leak.",
+        "The gas pressure is very low in our area for the past week.",
+        "Gas pipeline seems to be damaged after the construction work."
+    ],
+    'sewerage': [
+        "The sewerage system is overflowing in our street. It's been 3 days.",
+        "There's no water supply in our area for 2 days.",
+        "The manhole cover is broken and it's dangerous for pedestrians.",
+        "Water quality is very poor. We suspect contamination."
+    ]
+}
+
 
 class Command(BaseCommand):
     help = 'Generate realistic fake data for the emergency response system'
@@ -514,45 +554,8 @@ class Command(BaseCommand):
         """Create realistic citizen requests"""
         requests = []
 
-        # Realistic request templates by category
-        request_templates = {
-            'police': [
-                "There's been a theft in our area. Someone broke into my neighbor's house last night.",
-                "I want to report a mobile phone snatching incident that happened near {location}.",
-                "There's suspicious activity in our street. Strange people gathering at odd hours.",
-                "My car was stolen from outside my house. License plate number is ABC-123.",
-                "There's a domestic violence situation in the apartment next to mine."
-            ],
-            'fire_brigade': [
-                "There's a fire in a building near {location}. Please send help immediately!",
-                "I can smell gas leak and there might be fire hazard in our area.",
-                "A tree has fallen and is blocking the road after the storm.",
-                "There's smoke coming from the electrical panel in our building."
-            ],
-            'ambulance': [
-                "My father is having chest pain. We need an ambulance urgently at {location}.",
-                "There's been a road accident near {location}. Multiple people are injured.",
-                "My mother has fallen and can't move. Please send medical help.",
-                "Emergency! Someone has collapsed in our office building."
-            ],
-            'electricity': [
-                "Our area has been without power for 12 hours. When will it be restored?",
-                "There are sparks coming from the electricity pole near our house.",
-                "Power cables have fallen on the road after the rain.",
-                "Our transformer is making loud noises and might explode."
-            ],
-            'gas': [
-                "There's a strong smell of gas in our building. It might be a leak.",
-                "The gas pressure is very low in our area for the past week.",
-                "Gas pipeline seems to be damaged after the construction work."
-            ],
-            'sewerage': [
-                "The sewerage system is overflowing in our street. It's been 3 days.",
-                "There's no water supply in our area for 2 days.",
-                "The manhole cover is broken and it's dangerous for pedestrians.",
-                "Water quality is very poor. We suspect contamination."
-            ]
-        }
+
+        request_templates = REQUEST_TEMPLATES
 
         for i in range(count):
             user = random.choice(users)
@@ -0,0 +1,30 @@
+"""
+Rebuild RequestRollup analytics rows from CitizenRequest
+Migration 0009 backfills existing requests on deploy; run this after bulk
+imports. The hourly beat task keeps the recent window reconciled afterwards
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.depts.services.rollup_service import RollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild request analytics rollups (all time by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help='Only rebuild the last N hours')
+        parser.add_argument('--days', type=int, help='Only rebuild the last N days')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['hours']:
+            since = timezone.now() - timedelta(hours=options['hours'])
+        elif options['days']:
+            since = timezone.now() - timedelta(days=options['days'])
+
+        rows = RollupService.reconcile(since)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} rollup rows since {since or "the beginning"}'))
@@ -0,0 +1,22 @@
+"""
+Rebuild the citizen request full-text search index
+Run once after migrating (or after bulk imports / raw SQL edits); signals keep
+the index current for requests saved through the ORM
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.depts.services.request_search import REQUEST_SEARCH
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the citizen request search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Requests indexed per batch')
+
+    def handle(self, *args, **options):
+        indexed = REQUEST_SEARCH.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} requests ({REQUEST_SEARCH.backend.__class__.__name__})'
+        ))
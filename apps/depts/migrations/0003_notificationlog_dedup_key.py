@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-16 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0002_citizenrequest_output_json_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationlog',
+            name='dedup_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-16 20:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0003_notificationlog_dedup_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineCheckpoint',
+            fields=[
+                ('id', models.CharField(editable=False, max_length=50, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('stream_id', models.CharField(db_index=True, max_length=100)),
+                ('stage', models.CharField(max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('citizen_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='depts.citizenrequest')),
+            ],
+            options={
+                'unique_together': {('citizen_request', 'stage')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-16 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0004_pipelinecheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestRollup',
+            fields=[
+                ('id', models.CharField(editable=False, max_length=50, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=5)),
+                ('metric', models.CharField(choices=[('created', 'Requests Created'), ('resolved', 'Requests Resolved')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('category', models.CharField(blank=True, max_length=32)),
+                ('urgency_level', models.CharField(blank=True, max_length=12)),
+                ('status', models.CharField(blank=True, max_length=16)),
+                ('city_key', models.CharField(blank=True, max_length=50)),
+                ('department_key', models.CharField(blank=True, max_length=50)),
+                ('request_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'metric', 'bucket_start'], name='depts_reque_granula_030ee8_idx')],
+                'unique_together': {('granularity', 'metric', 'bucket_start', 'category', 'urgency_level', 'status', 'city_key', 'department_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-16 20:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0005_requestrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatcherCandidate',
+            fields=[
+                ('id', models.CharField(editable=False, max_length=50, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.CharField(choices=[('police', 'Police'), ('fire_brigade', 'Fire Brigade'), ('ambulance', 'Ambulance/Medical Emergency'), ('health', 'Health Department'), ('cybercrime', 'Cybercrime'), ('disaster_mgmt', 'Disaster Management'), ('other', 'Other/Unsupported Department')], max_length=32)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('same_city', models.BooleanField(default=True)),
+                ('entity_name', models.CharField(max_length=200)),
+                ('phone', models.CharField(blank=True, max_length=40)),
+                ('entity_city_name', models.CharField(max_length=120)),
+                ('address', models.TextField(blank=True)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matcher_candidates', to='depts.city')),
+                ('entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matcher_candidates', to='depts.departmententity')),
+            ],
+            options={
+                'unique_together': {('category', 'city', 'rank')},
+            },
+        ),
+    ]
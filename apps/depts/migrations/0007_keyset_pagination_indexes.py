@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-16 20:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0006_matchercandidate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citizenrequest',
+            index=models.Index(fields=['created_at', 'id'], name='depts_citiz_created_5fb6b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencycall',
+            index=models.Index(fields=['initiated_at', 'id'], name='depts_emerg_initiat_19f9c4_idx'),
+        ),
+    ]
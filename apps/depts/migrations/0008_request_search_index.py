@@ -0,0 +1,40 @@
+# Full-text search index for citizen requests - see apps/depts/services/request_search.py
+# Existing rows are indexed with: python manage.py rebuild_request_search_index
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Not a model field: only the search service reads or writes it
+        schema_editor.execute("ALTER TABLE depts_citizenrequest ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS depts_citizenrequest_search_gin "
+            "ON depts_citizenrequest USING GIN (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS depts_citizenrequest_fts USING fts5("
+            "request_id UNINDEXED, case_code, reporter, request_text, ai_response, category)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS depts_citizenrequest_search_gin")
+        schema_editor.execute("ALTER TABLE depts_citizenrequest DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS depts_citizenrequest_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,56 @@
+# Fill RequestRollup from existing citizen requests so the dashboard doesn't read
+# zeros after deploying rollups - same grouping as RollupService.reconcile()
+
+import uuid
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+
+def backfill_request_rollups(apps, schema_editor):
+    CitizenRequest = apps.get_model('depts', 'CitizenRequest')
+    RequestRollup = apps.get_model('depts', 'RequestRollup')
+
+    RequestRollup.objects.all().delete()
+    rows = []
+    for granularity, trunc in (('hour', TruncHour), ('day', TruncDay)):
+        for metric, time_field in (('created', 'created_at'), ('resolved', 'resolved_at')):
+            grouped = CitizenRequest.objects.filter(**{f'{time_field}__isnull': False}).annotate(
+                bucket=trunc(time_field)
+            ).values(
+                'bucket', 'category', 'urgency_level', 'status',
+                'target_location__city_id', 'assigned_department_id'
+            ).annotate(total=Count('id')).order_by()
+
+            rows.extend(
+                RequestRollup(
+                    id=f"ROLL-{uuid.uuid4()}",
+                    granularity=granularity,
+                    metric=metric,
+                    bucket_start=group['bucket'],
+                    category=group['category'] or "",
+                    urgency_level=group['urgency_level'] or "",
+                    status=group['status'] or "",
+                    city_key=group['target_location__city_id'] or "",
+                    department_key=group['assigned_department_id'] or "",
+                    request_count=group['total']
+                )
+                for group in grouped
+            )
+    RequestRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear_request_rollups(apps, schema_editor):
+    apps.get_model('depts', 'RequestRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0008_request_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_request_rollups, clear_request_rollups),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-16 23:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('depts', '0009_backfill_request_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='matchercandidate',
+            name='address',
+        ),
+        migrations.RemoveField(
+            model_name='matchercandidate',
+            name='entity_city_name',
+        ),
+        migrations.RemoveField(
+            model_name='matchercandidate',
+            name='entity_name',
+        ),
+        migrations.RemoveField(
+            model_name='matchercandidate',
+            name='phone',
+        ),
+    ]
@@ -160,6 +160,7 @@ class CitizenRequest(BaseModel):
             models.Index(fields=["category"]),
             models.Index(fields=["is_emergency", "created_at"]),
             models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["created_at", "id"]),  # keyset pagination
         ]
         ordering = ['-created_at']
     
@@ -226,6 +227,21 @@ class ActionLog(BaseModel):
     def __str__(self):
         return f"{self.citizen_request.case_code} - {self.get_action_type_display()}"
 
+class PipelineCheckpoint(BaseModel):
+    """Output of one completed pipeline stage, so a retried task resumes instead of restarting"""
+    PREFIX = "CKPT"
+    
+    citizen_request = models.ForeignKey(CitizenRequest, on_delete=models.CASCADE, related_name="checkpoints")
+    stream_id = models.CharField(max_length=100, db_index=True)  # Celery task ID, stable across retries
+    stage = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    
+    class Meta:
+        unique_together = ("citizen_request", "stage")
+    
+    def __str__(self):
+        return f"{self.citizen_request.case_code} - {self.stage}"
+
 class EmergencyCall(BaseModel):
     """Track emergency calls made via VAPI"""
     PREFIX = "CALL"
@@ -252,6 +268,9 @@ class EmergencyCall(BaseModel):
     # Metadata
     metadata = models.JSONField(default=dict, blank=True)  # VAPI response data
     
+    class Meta:
+        indexes = [models.Index(fields=["initiated_at", "id"])]  # keyset pagination
+    
     def __str__(self):
         return f"Call - {self.citizen_request.case_code} to {self.department.name}"
 
@@ -346,10 +365,72 @@ class NotificationLog(BaseModel):
     # External IDs
     external_id = models.CharField(max_length=100, blank=True)  # SMS ID, email ID, etc.
     
+    # Idempotency - hash of (case, channel, recipient, content), see DispatchLedger
+    dedup_key = models.CharField(max_length=64, blank=True, db_index=True)
+    
     # Timing
     sent_at = models.DateTimeField(auto_now_add=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
     read_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
-        return f"{self.get_notification_type_display()} to {self.recipient}"
\ No newline at end of file
+        return f"{self.get_notification_type_display()} to {self.recipient}"
+
+# =============================================================================
+# ANALYTICS ROLLUPS
+# =============================================================================
+
+class RequestRollup(BaseModel):
+    """
+    Pre-aggregated CitizenRequest counts per time bucket and dimension combination
+    Kept current by depts signals and reconciled by a periodic task (see rollup_service)
+    """
+    PREFIX = "ROLL"
+    
+    granularity = models.CharField(max_length=5, choices=RollupGranularity.choices)
+    metric = models.CharField(max_length=10, choices=RollupMetric.choices)
+    bucket_start = models.DateTimeField()
+    
+    # Dimensions ("" when unknown)
+    category = models.CharField(max_length=32, blank=True)
+    urgency_level = models.CharField(max_length=12, blank=True)
+    status = models.CharField(max_length=16, blank=True)
+    city_key = models.CharField(max_length=50, blank=True)  # City.id
+    department_key = models.CharField(max_length=50, blank=True)  # Department.id
+    
+    request_count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = (
+            "granularity", "metric", "bucket_start",
+            "category", "urgency_level", "status", "city_key", "department_key"
+        )
+        indexes = [models.Index(fields=["granularity", "metric", "bucket_start"])]
+    
+    def __str__(self):
+        return f"{self.granularity} {self.metric} {self.bucket_start:%Y-%m-%d %H:%M}: {self.request_count}"
+
+
+# =============================================================================
+# MATCHER CANDIDATES
+# =============================================================================
+
+class MatcherCandidate(BaseModel):
+    """
+    Ranked entity candidates per (department category, city), so the matcher
+    answers a city match without ranking entities itself (see matcher_candidates).
+    Entity details come from the department directory, not these rows
+    """
+    PREFIX = "MCAND"
+    
+    category = models.CharField(max_length=32, choices=DepartmentCategory.choices)
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="matcher_candidates")
+    rank = models.PositiveSmallIntegerField()  # 0 = best match
+    entity = models.ForeignKey(DepartmentEntity, on_delete=models.CASCADE, related_name="matcher_candidates")
+    same_city = models.BooleanField(default=True)  # False for other-city fallbacks
+    
+    class Meta:
+        unique_together = ("category", "city", "rank")
+    
+    def __str__(self):
+        return f"{self.category} / {self.city_id} #{self.rank}: {self.entity_id}"
@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination for the depts list views
+Pages are selected with WHERE (timestamp, id) < cursor on a composite index, so
+page 1,000 costs the same as page 1 - unlike OFFSET, which scans every skipped row
+"""
+import base64
+from typing import Any, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(timestamp, pk: str) -> str:
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, str]]:
+    """(timestamp, pk) from a cursor, or None when missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        timestamp, pk = raw.split("|", 1)
+        parsed = parse_datetime(timestamp)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return (parsed, pk) if parsed else None
+
+
+class KeysetPage:
+    """One page of rows, newest first, plus the cursors to its neighbours"""
+
+    def __init__(self, object_list: List[Any], has_next: bool, has_previous: bool, field: str):
+        self.object_list = object_list
+        self.has_next = has_next and bool(object_list)
+        self.has_previous = has_previous and bool(object_list)
+        self.next_cursor = encode_cursor(getattr(object_list[-1], field), object_list[-1].pk) if self.has_next else None
+        self.previous_cursor = encode_cursor(getattr(object_list[0], field), object_list[0].pk) if self.has_previous else None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_paginate(queryset: QuerySet, field: str, page_size: int,
+                    after: Optional[str] = None, before: Optional[str] = None) -> KeysetPage:
+    """
+    Newest-first page of queryset ordered by (field, pk)
+
+    Args:
+        after: cursor of the last row of the previous page - returns older rows
+        before: cursor of the first row of the next page - returns newer rows
+    """
+    after_key, before_key = decode_cursor(after), decode_cursor(before)
+
+    if before_key:
+        timestamp, pk = before_key
+        rows = list(
+            queryset.filter(Q(**{f"{field}__gt": timestamp}) | Q(**{field: timestamp, "pk__gt": pk}))
+            .order_by(field, "pk")[:page_size + 1]
+        )
+        # Nothing newer than the cursor - show the first page instead
+        if rows:
+            has_previous = len(rows) > page_size
+            rows = list(reversed(rows[:page_size]))
+            return KeysetPage(rows, has_next=True, has_previous=has_previous, field=field)
+
+    if after_key:
+        timestamp, pk = after_key
+        queryset = queryset.filter(Q(**{f"{field}__lt": timestamp}) | Q(**{field: timestamp, "pk__lt": pk}))
+
+    rows = list(queryset.order_by(f"-{field}", "-pk")[:page_size + 1])
+    has_next = len(rows) > page_size
+    return KeysetPage(rows[:page_size], has_next=has_next, has_previous=bool(after_key), field=field)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing paginate_by with keyset pagination
+
+    Reads ?after= / ?before= cursors and puts the page in page_obj, so templates
+    link to page_obj.next_cursor / page_obj.previous_cursor.
+    """
+    keyset_field = "created_at"
+    page_size = 25
+
+    def get_page(self) -> KeysetPage:
+        return keyset_paginate(
+            self.object_list,
+            self.keyset_field,
+            self.page_size,
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+
+    def get_context_data(self, **kwargs):
+        page = self.get_page()
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context.update({
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+        })
+        return context
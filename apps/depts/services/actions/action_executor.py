@@ -2,23 +2,14 @@
 Action Executor - Master orchestrator for all trigger actions
 Simple, efficient execution of TriggerOrchestrator actions
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Union, Optional
 import logging
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
 
-from .email_action_service import EmailActionService
-from .sms_action_service import SMSActionService
-from .voice_action_service import VoiceActionService
+from .action_loop import ACTION_LOOP
+from .dispatch_ledger import DISPATCH_LEDGER
+from apps.depts.services.service_registry import SERVICE_REGISTRY
 # Calendar and Maps services removed to simplify system
 
 from apps.depts.services.trigger_orchestrator_service import (
@@ -28,43 +19,93 @@ from apps.depts.services.trigger_orchestrator_service import (
 
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# PRIORITY DISPATCH
+# =============================================================================
+
+# Lower rank is dispatched first
+PRIORITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+# Defaults when an action doesn't carry its own latency_budget_seconds / timeout_seconds
+LATENCY_BUDGET_SECONDS = {"critical": 5, "high": 15, "medium": 60, "low": 120}
+TIMEOUT_SECONDS = {"critical": 30, "high": 45, "medium": 90, "low": 120}
+
+
 class ActionExecutor:
     """
     Master executor for all trigger actions
     Routes actions to appropriate services and handles execution
+
+    Every send runs as a coroutine on ACTION_LOOP. Channels with an awaitable
+    send (SMS, voice) go over the loop's pooled httpx.AsyncClient; the rest
+    (SMTP email) run on its worker threads.
     """
 
     def __init__(self):
-        self.email_service = EmailActionService()
-        self.sms_service = SMSActionService()
-        self.voice_service = VoiceActionService()
+        # Channel services (and their SDK clients) are built when a channel is first used
+        self.email_service = SERVICE_REGISTRY.lazy("email_action_service")
+        self.sms_service = SERVICE_REGISTRY.lazy("sms_action_service")
+        self.voice_service = SERVICE_REGISTRY.lazy("voice_action_service")
         # Calendar and Maps services removed to focus on core emergency actions
 
-    def execute_single_action(self, action: TriggerAction) -> Dict[str, Any]:
+    def execute_single_action(self, action: TriggerAction, case_code: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute a single trigger action
 
         Args:
             action: TriggerAction object from TriggerOrchestrator
+            case_code: Case the action belongs to - when given, an identical
+                email/SMS/call already sent for the case is skipped
 
         Returns:
             Dict with execution result
         """
+        return ACTION_LOOP.run(self.execute_single_action_async(action, case_code))
+
+    async def execute_single_action_async(self, action: TriggerAction,
+                                          case_code: Optional[str] = None) -> Dict[str, Any]:
+        """execute_single_action as a coroutine - must run on ACTION_LOOP"""
+        identity = self._dispatch_identity(action)
+        if identity is None:
+            return await self._route_action(action, case_code)
+
+        recipient, subject, content = identity
+        return await DISPATCH_LEDGER.dispatch_async(
+            case_code, action.action_type.value, recipient, content,
+            send=lambda: self._route_action(action, case_code),
+            subject=subject,
+            rank=self._priority_rank(action)
+        )
+
+    @staticmethod
+    def _dispatch_identity(action: TriggerAction):
+        """(recipient, subject, content) used to deduplicate a send, or None if not deduplicated"""
+        if action.action_type == TriggerActionType.EMAIL:
+            return action.recipient_email, action.subject, action.body
+        if action.action_type == TriggerActionType.SMS:
+            return action.recipient_phone, "", action.message
+        if action.action_type == TriggerActionType.VOICE_CALL:
+            # One call per number per case, whatever the script wording
+            return action.recipient_phone, action.title, ""
+        return None
+
+    async def _route_action(self, action: TriggerAction, case_code: Optional[str] = None) -> Dict[str, Any]:
+        """Send an action through its channel service"""
         try:
             # Route to appropriate service based on action type
             if action.action_type == TriggerActionType.EMAIL:
-                return self.email_service.execute_email_action(action)
+                return await self._channel_send(self.email_service, "execute_email_action", action)
 
             elif action.action_type == TriggerActionType.SMS:
-                return self.sms_service.execute_sms_action(action)
+                return await self._channel_send(self.sms_service, "execute_sms_action", action)
 
             elif action.action_type == TriggerActionType.VOICE_CALL:
-                return self.voice_service.execute_voice_action(action)
+                return await self._channel_send(self.voice_service, "execute_voice_action", action)
 
             # Calendar and Maps actions removed to focus on core emergency services
 
             elif action.action_type == TriggerActionType.EMERGENCY_BROADCAST:
-                return self._execute_broadcast_action(action)
+                return await self._execute_broadcast_action(action, case_code)
 
             elif action.action_type == TriggerActionType.FOLLOWUP_SCHEDULE:
                 return self._execute_followup_action(action)
@@ -80,17 +121,26 @@ class ActionExecutor:
             logger.error(f"Action execution failed: {str(e)}")
             return {
                 "success": False,
-                "action_type": getattr(action, 'action_type', {}).get('value', 'unknown'),
+                "action_type": getattr(getattr(action, 'action_type', None), 'value', 'unknown'),
                 "error": str(e)
             }
 
-    def execute_multiple_actions(self, actions: List[TriggerAction], parallel: bool = True) -> Dict[str, Any]:
+    async def _channel_send(self, service, method: str, action: TriggerAction) -> Dict[str, Any]:
+        """Await the service's <method>_async, or run the blocking <method> on a worker thread"""
+        send_async = getattr(service, f"{method}_async", None)
+        if send_async is not None:
+            return await send_async(action)
+        return await ACTION_LOOP.run_blocking(getattr(service, method), action, rank=self._priority_rank(action))
+
+    def execute_multiple_actions(self, actions: List[TriggerAction], parallel: bool = True,
+                                 case_code: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute multiple trigger actions
 
         Args:
             actions: List of TriggerAction objects
             parallel: Whether to execute actions in parallel
+            case_code: Case the actions belong to, for duplicate suppression
 
         Returns:
             Dict with combined execution results
@@ -105,18 +155,18 @@ class ActionExecutor:
             }
 
         if parallel and len(actions) > 1:
-            return self._execute_actions_parallel(actions)
+            return self._execute_actions_parallel(actions, case_code)
         else:
-            return self._execute_actions_sequential(actions)
+            return self._execute_actions_sequential(actions, case_code)
 
-    def _execute_actions_sequential(self, actions: List[TriggerAction]) -> Dict[str, Any]:
+    def _execute_actions_sequential(self, actions: List[TriggerAction], case_code: Optional[str] = None) -> Dict[str, Any]:
         """Execute actions one by one"""
         results = []
         successful = 0
         failed = 0
 
         for action in actions:
-            result = self.execute_single_action(action)
+            result = self.execute_single_action(action, case_code)
             results.append(result)
 
             if result.get("success", False):
@@ -133,38 +183,35 @@ class ActionExecutor:
             "results": results
         }
 
-    def _execute_actions_parallel(self, actions: List[TriggerAction]) -> Dict[str, Any]:
-        """Execute actions in parallel for better performance"""
+    def _execute_actions_parallel(self, actions: List[TriggerAction], case_code: Optional[str] = None) -> Dict[str, Any]:
+        """Execute actions concurrently, highest priority dispatched first"""
+        return ACTION_LOOP.run(self.execute_actions_async(actions, case_code))
+
+    async def execute_actions_async(self, actions: List[TriggerAction], case_code: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start every action at once on ACTION_LOOP, admitted to send slots in priority order
+
+        There is no barrier between priority groups: a medium action starts as
+        soon as a slot is free, while critical actions always jump the queue.
+        Each action is cancelled at its timeout - an SMS or call still in flight
+        is aborted with it - and flagged when it exceeds its latency budget.
+        """
         results = []
         successful = 0
         failed = 0
 
-        # Group actions by priority for execution order
-        immediate_actions = [a for a in actions if a.priority.value == "critical"]
-        urgent_actions = [a for a in actions if a.priority.value == "high"]
-        normal_actions = [a for a in actions if a.priority.value in ["medium", "low"]]
-
-        # Execute immediate actions first
-        for action_group in [immediate_actions, urgent_actions, normal_actions]:
-            if not action_group:
-                continue
-
-            with ThreadPoolExecutor(max_workers=min(len(action_group), 5)) as executor:
-                # Submit all actions in the group
-                future_to_action = {
-                    executor.submit(self.execute_single_action, action): action
-                    for action in action_group
-                }
+        ordered = sorted(actions, key=self._priority_rank)
+        tasks = [asyncio.ensure_future(self._run_action(action, case_code)) for action in ordered]
 
-                # Collect results as they complete
-                for future in as_completed(future_to_action):
-                    result = future.result()
-                    results.append(result)
+        # Collect results as they complete
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            results.append(result)
 
-                    if result.get("success", False):
-                        successful += 1
-                    else:
-                        failed += 1
+            if result.get("success", False):
+                successful += 1
+            else:
+                failed += 1
 
         return {
             "success": True,
@@ -175,12 +222,59 @@ class ActionExecutor:
             "results": results
         }
 
-    def _execute_broadcast_action(self, broadcast_action: EmergencyBroadcastAction) -> Dict[str, Any]:
+    async def _run_action(self, action: TriggerAction, case_code: Optional[str] = None) -> Dict[str, Any]:
+        priority = self._priority_value(action)
+        budget = action.latency_budget_seconds or LATENCY_BUDGET_SECONDS.get(priority, 60)
+        timeout = action.timeout_seconds or TIMEOUT_SECONDS.get(priority, 90)
+
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._send_in_slot(action, case_code), timeout)
+        except asyncio.TimeoutError:
+            # The send was cancelled; an SMTP send already on a worker thread
+            # can't be interrupted and finishes within the mail socket timeout
+            logger.error(f"⏰ {action.action_type.value} action '{action.title}' timed out after {timeout}s")
+            result = {
+                "success": False,
+                "status": "timeout",
+                "action_type": action.action_type.value,
+                "error": f"Timed out after {timeout}s"
+            }
+
+        latency = time.monotonic() - start
+        if latency > budget:
+            logger.warning(
+                f"🐢 {action.action_type.value} action '{action.title}' took {latency:.2f}s "
+                f"(budget {budget}s, priority {priority})"
+            )
+
+        return {
+            **result,
+            "priority": priority,
+            "latency_ms": int(latency * 1000),
+            "within_budget": latency <= budget
+        }
+
+    async def _send_in_slot(self, action: TriggerAction, case_code: Optional[str] = None) -> Dict[str, Any]:
+        # Slots are shared by every request in the process, so critical actions
+        # from one case go ahead of medium/low actions still waiting from others
+        async with ACTION_LOOP.slot(self._priority_rank(action)):
+            return await self.execute_single_action_async(action, case_code)
+
+    @staticmethod
+    def _priority_value(action: TriggerAction) -> str:
+        return getattr(action.priority, "value", action.priority)
+
+    def _priority_rank(self, action: TriggerAction) -> int:
+        return PRIORITY_RANK.get(self._priority_value(action), len(PRIORITY_RANK))
+
+    async def _execute_broadcast_action(self, broadcast_action: EmergencyBroadcastAction,
+                                        case_code: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute emergency broadcast to multiple channels
         """
         try:
-            results = []
+            sends = []  # (channel, contact, action), sent concurrently below
             channels = broadcast_action.channels
             message = broadcast_action.broadcast_message
             contacts = broadcast_action.target_contacts
@@ -199,8 +293,7 @@ class ActionExecutor:
                             message=message,
                             sender_name="Emergency Services"
                         )
-                        sms_result = self.sms_service.execute_sms_action(sms_action)
-                        results.append({"channel": "sms", "contact": contact, **sms_result})
+                        sends.append(("sms", contact, sms_action))
 
             if "email" in channels and contacts:
                 for contact in contacts:
@@ -215,8 +308,15 @@ class ActionExecutor:
                             subject="Emergency Broadcast Alert",
                             body=message
                         )
-                        email_result = self.email_service.execute_email_action(email_action)
-                        results.append({"channel": "email", "contact": contact, **email_result})
+                        sends.append(("email", contact, email_action))
+
+            outcomes = await asyncio.gather(*(
+                self.execute_single_action_async(action, case_code) for _, _, action in sends
+            ))
+            results = [
+                {"channel": channel, "contact": contact, **outcome}
+                for (channel, contact, _), outcome in zip(sends, outcomes)
+            ]
 
             successful = len([r for r in results if r.get("success", False)])
             failed = len(results) - successful
@@ -296,8 +396,8 @@ class ActionExecutor:
                 "error": str(e)
             }
 
-# Global instance for easy access
-ACTION_EXECUTOR = ActionExecutor()
+# Global instance for easy access - built on first use
+ACTION_EXECUTOR = SERVICE_REGISTRY.lazy("action_executor")
 
 # Convenience functions
 def execute_trigger_actions(trigger_output) -> Dict[str, Any]:
@@ -0,0 +1,221 @@
+"""
+Action Loop - The event loop every provider send runs on
+One long-lived loop thread per process owns the pooled httpx.AsyncClient, so SMS
+and voice sends are plain awaitables that asyncio.wait_for can cancel mid-request.
+Blocking work (SMTP, ORM lookups) runs on PriorityWorkerPool threads that keep
+their DB connection between actions and close it once when they retire.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Provider APIs answer well within the read timeout; connect fast or fail the action
+ACTION_HTTP_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+ACTION_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=300)
+
+
+class PriorityWorkerPool:
+    """
+    Worker threads for blocking calls, fed from a single priority queue
+
+    Shared by every request in the process, so a critical action submitted by
+    one request is picked up before medium/low work still queued by others.
+    A worker keeps its DB connection across calls and closes it when it exits
+    after idle_seconds without work.
+    """
+
+    def __init__(self, max_workers: int = 16, idle_seconds: float = 60.0, thread_name_prefix: str = "action-worker"):
+        self.max_workers = max_workers
+        self.idle_seconds = idle_seconds
+        self.thread_name_prefix = thread_name_prefix
+        self._queue = []
+        self._counter = itertools.count()  # FIFO within a priority
+        self._condition = threading.Condition()
+        self._workers = 0
+        self._idle = 0
+        self._names = itertools.count()
+
+    def submit(self, rank: int, func, *args) -> Future:
+        future = Future()
+        # Run in the submitter's context so pipeline metrics reach the right stage
+        context = contextvars.copy_context()
+        with self._condition:
+            heapq.heappush(self._queue, (rank, next(self._counter), future, context.run, (func,) + args))
+            # More queued calls than idle workers to take them
+            if len(self._queue) > self._idle and self._workers < self.max_workers:
+                self._start_worker()
+            self._condition.notify()
+        return future
+
+    def _start_worker(self) -> None:
+        self._workers += 1
+        threading.Thread(
+            target=self._worker,
+            name=f"{self.thread_name_prefix}-{next(self._names)}",
+            daemon=True
+        ).start()
+
+    def _next_item(self):
+        """Next queued call, or None once this worker has been idle too long"""
+        with self._condition:
+            while not self._queue:
+                self._idle += 1
+                try:
+                    notified = self._condition.wait(self.idle_seconds)
+                finally:
+                    self._idle -= 1
+                if not notified and not self._queue:
+                    self._workers -= 1
+                    return None
+            return heapq.heappop(self._queue)
+
+    def _worker(self) -> None:
+        try:
+            while True:
+                item = self._next_item()
+                if item is None:
+                    return
+                _, _, future, func, args = item
+
+                # Timed out while still queued - never started
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    future.set_result(func(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            # One connection per worker for its whole life
+            connection.close()
+
+
+class PrioritySlots:
+    """
+    At most `limit` sends in flight on the loop; waiters are admitted lowest rank first
+
+    Only touched from the loop thread.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+
+    async def acquire(self, rank: int) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._counter), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Granted the slot just as the wait was cancelled - pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)  # the slot moves straight to the waiter
+                return
+        self._active -= 1
+
+
+class ActionLoop:
+    """
+    Process-wide event loop thread for action sends
+
+    run() is the sync entry point: it schedules a coroutine on the loop in the
+    caller's context and blocks until it finishes. Rebuilt in a forked child
+    (Celery prefork) so processes never share the loop or its sockets.
+    """
+
+    def __init__(self, max_concurrent_sends: int = 32, max_workers: int = 16):
+        self.max_concurrent_sends = max_concurrent_sends
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[PrioritySlots] = None
+        self.workers: Optional[PriorityWorkerPool] = None
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        loop = self._ensure_loop()
+        context = contextvars.copy_context()
+        done: Future = Future()
+
+        def start() -> None:
+            task = loop.create_task(coro, context=context)
+            task.add_done_callback(lambda finished: _copy_outcome(finished, done))
+
+        loop.call_soon_threadsafe(start)
+        return done.result()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled keep-alive client - only usable from coroutines running on this loop"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=ACTION_HTTP_TIMEOUT, limits=ACTION_HTTP_LIMITS)
+        return self._http
+
+    async def run_blocking(self, func: Callable[..., Any], *args, rank: int = 0) -> Any:
+        """Run a blocking call on the worker pool; cancelling drops it if it hasn't started"""
+        return await asyncio.wrap_future(self.workers.submit(rank, func, *args))
+
+    @asynccontextmanager
+    async def slot(self, rank: int) -> AsyncIterator[None]:
+        """Hold one of the loop's send slots, admitted by priority rank"""
+        await self._slots.acquire(rank)
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        pid = os.getpid()
+        if self._loop is None or self._pid != pid:
+            with self._lock:
+                if self._loop is None or self._pid != pid:
+                    self._start(pid)
+        return self._loop
+
+    def _start(self, pid: int) -> None:
+        loop = asyncio.new_event_loop()
+        self._http = None
+        self._slots = PrioritySlots(self.max_concurrent_sends)
+        self.workers = PriorityWorkerPool(max_workers=self.max_workers)
+        threading.Thread(target=loop.run_forever, name="action-loop", daemon=True).start()
+        self._loop = loop
+        self._pid = pid
+
+
+def _copy_outcome(task: asyncio.Task, future: Future) -> None:
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+# Global instance - the loop thread starts on first use
+ACTION_LOOP = ActionLoop()
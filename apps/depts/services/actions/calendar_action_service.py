@@ -2,15 +2,6 @@
 Calendar Action Service - Google Calendar integration wrapper
 Plug & play with TriggerOrchestrator CalendarBookingAction
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from apps.integrations.google_calendar.service import GoogleCalendarService
 from datetime import datetime, timedelta
 from django.utils import timezone
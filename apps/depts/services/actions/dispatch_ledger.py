@@ -0,0 +1,192 @@
+"""
+Dispatch Ledger - Sends each notification at most once per case
+Keyed by (case_code, channel, recipient, content hash): Redis SET NX gives a fast,
+atomic claim across workers and retries; NotificationLog is the durable record
+"""
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from apps.core.redis_client import get_redis_client
+from apps.depts.services.audit_writer import AUDIT_WRITER
+from apps.depts.services.pipeline_metrics import record_provider_call
+from .action_loop import ACTION_LOOP
+
+logger = logging.getLogger(__name__)
+
+LEDGER_KEY_PREFIX = "dispatch:ledger:"
+
+# A claim that never completes (worker crash) frees itself after this long
+PENDING_TTL_SECONDS = 600
+# Completed sends are remembered in Redis for this long; NotificationLog covers the rest
+SENT_TTL_SECONDS = 24 * 3600
+
+STATUS_DUPLICATE = "duplicate_skipped"
+
+
+def dispatch_key(case_code: str, channel: str, recipient: str, content: str = "") -> str:
+    """Stable identity of one notification"""
+    raw = "\x1f".join([case_code, channel, (recipient or "").strip().lower(), content or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DispatchLedger:
+    """
+    Wraps provider sends so duplicates across retries and overlapping stages are skipped
+
+    A send is skipped when another worker holds the claim or NotificationLog already
+    has a successful send for the same key. Failed sends release the claim so a
+    retry can try again.
+    """
+
+    def dispatch(self, case_code: Optional[str], channel: str, recipient: str, content: str,
+                 send: Callable[[], Dict[str, Any]], subject: str = "") -> Dict[str, Any]:
+        """Run send() unless this notification already went out for the case"""
+        if not case_code or not recipient:
+            return self._send(channel, send)
+
+        key = dispatch_key(case_code, channel, recipient, content)
+
+        if not self._reserve(key):
+            return self._duplicate(case_code, channel, recipient)
+
+        try:
+            result = self._send(channel, send)
+        except Exception:
+            self._release(key)
+            raise
+
+        self._settle(case_code, channel, recipient, subject, content, key, result)
+        return result
+
+    async def dispatch_async(self, case_code: Optional[str], channel: str, recipient: str, content: str,
+                             send: Callable[[], Awaitable[Dict[str, Any]]], subject: str = "",
+                             rank: int = 0) -> Dict[str, Any]:
+        """dispatch() for an awaitable send; the ledger's Redis and DB steps run on ACTION_LOOP's workers"""
+        if not case_code or not recipient:
+            return await self._send_async(channel, send)
+
+        key = dispatch_key(case_code, channel, recipient, content)
+
+        if not await ACTION_LOOP.run_blocking(self._reserve, key, rank=rank):
+            return self._duplicate(case_code, channel, recipient)
+
+        try:
+            result = await self._send_async(channel, send)
+        except BaseException:
+            # Failed or cancelled (timed out) mid-send - let a retry try again
+            self._release(key)
+            raise
+
+        await ACTION_LOOP.run_blocking(
+            self._settle, case_code, channel, recipient, subject, content, key, result, rank=rank
+        )
+        return result
+
+    def _reserve(self, key: str) -> bool:
+        """Claim the send - False when another worker holds it or it already went out"""
+        if not self._claim(key):
+            return False
+
+        if self._already_sent(key):
+            self._mark_sent(key)
+            return False
+
+        return True
+
+    def _settle(self, case_code, channel, recipient, subject, content, key, result) -> None:
+        """Keep the claim after a successful send, release it after a failed one, and log the send"""
+        succeeded = bool(result.get("success", False))
+        if succeeded:
+            self._mark_sent(key)
+        else:
+            self._release(key)
+
+        self._log(case_code, channel, recipient, subject, content, key, result, succeeded)
+
+    @staticmethod
+    def _send(channel: str, send: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        # Provider latency and outcome feed the pipeline metrics
+        with record_provider_call(channel) as outcome:
+            result = send()
+            outcome["success"] = bool(result.get("success", False))
+        return result
+
+    @staticmethod
+    async def _send_async(channel: str, send: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        with record_provider_call(channel) as outcome:
+            result = await send()
+            outcome["success"] = bool(result.get("success", False))
+        return result
+
+    @staticmethod
+    def _duplicate(case_code: str, channel: str, recipient: str) -> Dict[str, Any]:
+        logger.info(f"🔁 Skipping duplicate {channel} to {recipient} for {case_code}")
+        return {
+            "success": True,
+            "status": STATUS_DUPLICATE,
+            "action_type": channel,
+            "recipient": recipient
+        }
+
+    def _claim(self, key: str) -> bool:
+        client = get_redis_client()
+        if not client:
+            return True
+        try:
+            return bool(client.set(LEDGER_KEY_PREFIX + key, "pending", nx=True, ex=PENDING_TTL_SECONDS))
+        except Exception as e:
+            logger.debug(f"Dispatch ledger claim failed, falling back to NotificationLog: {e}")
+            return True
+
+    def _mark_sent(self, key: str) -> None:
+        client = get_redis_client()
+        if client:
+            try:
+                client.set(LEDGER_KEY_PREFIX + key, "sent", ex=SENT_TTL_SECONDS)
+            except Exception as e:
+                logger.debug(f"Dispatch ledger update failed: {e}")
+
+    def _release(self, key: str) -> None:
+        client = get_redis_client()
+        if client:
+            try:
+                client.delete(LEDGER_KEY_PREFIX + key)
+            except Exception as e:
+                logger.debug(f"Dispatch ledger release failed: {e}")
+
+    def _already_sent(self, key: str) -> bool:
+        from apps.depts.models import NotificationLog
+
+        # Sent moments ago and still waiting in the audit buffer
+        if AUDIT_WRITER.pending(NotificationLog, dedup_key=key, sent_successfully=True):
+            return True
+
+        # Durable check - covers Redis being absent, flushed or the key having expired
+        return NotificationLog.objects.filter(dedup_key=key, sent_successfully=True).exists()
+
+    def _log(self, case_code, channel, recipient, subject, content, key, result, succeeded) -> None:
+        from apps.depts.models import CitizenRequest, NotificationLog
+
+        citizen_request_id = CitizenRequest.objects.filter(case_code=case_code).values_list('id', flat=True).first()
+        if not citizen_request_id:
+            return
+
+        try:
+            AUDIT_WRITER.add(NotificationLog(
+                citizen_request_id=citizen_request_id,
+                notification_type=channel,
+                recipient=recipient[:200],
+                subject=(subject or "")[:200],
+                message=content,
+                sent_successfully=succeeded,
+                error_message="" if succeeded else str(result.get("error", "")),
+                external_id=str(result.get("message_id") or result.get("call_id") or "")[:100],
+                dedup_key=key
+            ))
+        except Exception as e:
+            logger.warning(f"Failed to record {channel} notification for {case_code}: {e}")
+
+
+# Global instance shared by the action executor and the pipeline
+DISPATCH_LEDGER = DispatchLedger()
@@ -2,14 +2,6 @@
 Email Action Service - Simple Django email integration
 Plug & play with TriggerOrchestrator EmailAction
 """
-import os
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from django.core.mail import send_mail, send_mass_mail, get_connection
 from django.core.mail.backends.base import BaseEmailBackend
 from django.conf import settings
@@ -17,9 +9,39 @@ from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from typing import Dict, List, Any
 import logging
+import smtplib
+import threading
 
 logger = logging.getLogger(__name__)
 
+# One reusable mail connection per worker thread - SMTP sessions aren't thread-safe
+_thread_local = threading.local()
+
+
+def _pooled_connection():
+    mail_connection = getattr(_thread_local, "connection", None)
+    if mail_connection is None:
+        mail_connection = get_connection()
+        _thread_local.connection = mail_connection
+    return mail_connection
+
+
+def _send_mail(fail_silently: bool = False, **kwargs) -> int:
+    """send_mail over this thread's long-lived connection, reconnecting once if the server dropped it"""
+    mail_connection = _pooled_connection()
+    try:
+        try:
+            mail_connection.open()  # no-op while already open
+            return send_mail(connection=mail_connection, **kwargs)
+        except smtplib.SMTPServerDisconnected:
+            mail_connection.close()
+            mail_connection.open()
+            return send_mail(connection=mail_connection, **kwargs)
+    except Exception:
+        if fail_silently:
+            return 0
+        raise
+
 class EmailActionService:
     """
     Simple email service using Django's built-in email functionality
@@ -99,7 +121,7 @@ Generated by Emergency Response System
             """
 
             # Send email
-            result = send_mail(
+            result = _send_mail(
                 subject=subject,
                 message=plain_message,
                 from_email=settings.DEFAULT_FROM_EMAIL,
@@ -110,7 +132,7 @@ Generated by Emergency Response System
 
             # Handle CC if provided
             if email_action.department_cc:
-                send_mail(
+                _send_mail(
                     subject=f"CC: {subject}",
                     message=f"CC Copy:\n\n{plain_message}",
                     from_email=settings.DEFAULT_FROM_EMAIL,
@@ -177,7 +199,7 @@ Priority: {email_action.priority.value}
 Duration: {email_action.estimated_duration}
             """
 
-            result = send_mail(
+            result = _send_mail(
                 subject=email_action.subject,
                 message=plain_message,
                 from_email=settings.DEFAULT_FROM_EMAIL,
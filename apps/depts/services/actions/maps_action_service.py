@@ -2,15 +2,6 @@
 Maps Action Service - Google Maps integration wrapper
 Plug & play with TriggerOrchestrator NearbySearchAction & MapsDirectionsAction
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from apps.integrations.google_maps.service import GoogleMapsService
 from typing import Dict, List, Any
 import logging
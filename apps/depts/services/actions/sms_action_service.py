@@ -2,17 +2,9 @@
 SMS Action Service - Twilio integration wrapper
 Plug & play with TriggerOrchestrator SMSAction
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from apps.integrations.twilio_sms.service import TwilioSMSService
 from apps.integrations.twilio_sms.mock_service import MOCK_SMS_SERVICE
+from .action_loop import ACTION_LOOP
 from typing import Dict, List, Any
 import logging
 import os
@@ -50,64 +42,88 @@ class SMSActionService:
             Dict with execution result
         """
         try:
-            # Determine alert type based on priority
-            alert_type_mapping = {
-                "critical": "emergency",
-                "high": "warning",
-                "medium": "info",
-                "low": "info"
-            }
-            alert_type = alert_type_mapping.get(sms_action.priority.value, "info")
-
-            # Format message with priority indicator
-            if sms_action.priority.value == "critical":
-                formatted_message = f"🚨 CRITICAL: {sms_action.message}"
-            elif sms_action.priority.value == "high":
-                formatted_message = f"⚠️ URGENT: {sms_action.message}"
-            else:
-                formatted_message = f"📢 {sms_action.message}"
-
-            # Add sender name if provided
-            if hasattr(sms_action, 'sender_name') and sms_action.sender_name:
-                formatted_message += f"\n- {sms_action.sender_name}"
-
-            # Use Twilio service to send
             result = self.twilio_service.send_alert_sms(
                 to_number=sms_action.recipient_phone,
-                alert_type=alert_type,
+                alert_type=self._alert_type(sms_action),
                 message=sms_action.message
             )
+            return self._action_result(sms_action, result)
 
-            if result["success"]:
-                return {
-                    "success": True,
-                    "status": "sent",
-                    "action_type": sms_action.action_type.value,
-                    "recipient": sms_action.recipient_phone,
-                    "message_id": result.get("data", {}).get("sid", "unknown"),
-                    "estimated_delivery": sms_action.estimated_duration,
-                    "message_preview": formatted_message[:50] + "...",
-                    "service_type": "mock" if self.use_mock else "twilio"
-                }
-            else:
-                return {
-                    "success": False,
-                    "status": "failed",
-                    "action_type": sms_action.action_type.value,
-                    "recipient": sms_action.recipient_phone,
-                    "error": result.get("error", "Unknown SMS error")
-                }
+        except Exception as e:
+            return self._action_failed(sms_action, e)
+
+    async def execute_sms_action_async(self, sms_action) -> Dict[str, Any]:
+        """
+        execute_sms_action as an awaitable on ACTION_LOOP's pooled client
+        Cancelling it (e.g. on timeout) aborts the request to Twilio.
+        """
+        try:
+            result = await self.twilio_service.send_alert_sms_async(
+                ACTION_LOOP.http,
+                to_number=sms_action.recipient_phone,
+                alert_type=self._alert_type(sms_action),
+                message=sms_action.message
+            )
+            return self._action_result(sms_action, result)
 
         except Exception as e:
-            logger.error(f"Failed to send SMS: {str(e)}")
+            return self._action_failed(sms_action, e)
+
+    @staticmethod
+    def _alert_type(sms_action) -> str:
+        # Determine alert type based on priority
+        alert_type_mapping = {
+            "critical": "emergency",
+            "high": "warning",
+            "medium": "info",
+            "low": "info"
+        }
+        return alert_type_mapping.get(sms_action.priority.value, "info")
+
+    def _action_result(self, sms_action, result: Dict[str, Any]) -> Dict[str, Any]:
+        # Format message with priority indicator
+        if sms_action.priority.value == "critical":
+            formatted_message = f"🚨 CRITICAL: {sms_action.message}"
+        elif sms_action.priority.value == "high":
+            formatted_message = f"⚠️ URGENT: {sms_action.message}"
+        else:
+            formatted_message = f"📢 {sms_action.message}"
+
+        # Add sender name if provided
+        if hasattr(sms_action, 'sender_name') and sms_action.sender_name:
+            formatted_message += f"\n- {sms_action.sender_name}"
+
+        if result["success"]:
+            return {
+                "success": True,
+                "status": "sent",
+                "action_type": sms_action.action_type.value,
+                "recipient": sms_action.recipient_phone,
+                "message_id": result.get("data", {}).get("sid", "unknown"),
+                "estimated_delivery": sms_action.estimated_duration,
+                "message_preview": formatted_message[:50] + "...",
+                "service_type": "mock" if self.use_mock else "twilio"
+            }
+        else:
             return {
                 "success": False,
                 "status": "failed",
                 "action_type": sms_action.action_type.value,
                 "recipient": sms_action.recipient_phone,
-                "error": str(e)
+                "error": result.get("error", "Unknown SMS error")
             }
 
+    @staticmethod
+    def _action_failed(sms_action, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Failed to send SMS: {str(error)}")
+        return {
+            "success": False,
+            "status": "failed",
+            "action_type": sms_action.action_type.value,
+            "recipient": sms_action.recipient_phone,
+            "error": str(error)
+        }
+
     def send_emergency_sms(self, sms_action) -> Dict[str, Any]:
         """
         Send high-priority emergency SMS with special formatting
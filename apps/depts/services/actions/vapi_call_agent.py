@@ -1,19 +1,304 @@
+"""
+VAPI Call Agent - The voice-dispatch client for emergency calls
+Used by the pipeline's trigger stage, VoiceActionService and make_emergency_call_task
+through SERVICE_REGISTRY ("vapi_call_agent"). The VAPI SDK and our raw REST calls
+share one pooled, keep-alive HTTP client per process, so consecutive calls reuse
+the TLS connection instead of handshaking again.
+"""
+import hashlib
+import importlib
+import json
+import logging
 import os
-import requests
-from vapi import Vapi
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from django.conf import settings
+from vapi import AsyncVapi, Vapi
+from vapi.core.api_error import ApiError
 from dotenv import load_dotenv
-import os
+
+from apps.core.redis_client import get_redis_client
+from .action_loop import ACTION_LOOP
+
+logger = logging.getLogger(__name__)
 
 # Load variables from .env file
 load_dotenv()
 
+# Connect fast or fail over to SMS; VAPI itself answers well within the read timeout
+VAPI_HTTP_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+VAPI_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=300)
+
+_http_client: Optional[httpx.Client] = None
+_http_client_pid: Optional[int] = None
+_http_client_lock = threading.Lock()
+
+TEMPLATE_KEY_PREFIX = "vapi:template:"
+
+
+def vapi_http_client() -> httpx.Client:
+    """
+    Process-wide pooled HTTP client for VAPI
+    Rebuilt in a forked child (Celery prefork) so processes never share sockets.
+    """
+    global _http_client, _http_client_pid
+    pid = os.getpid()
+    if _http_client is None or _http_client_pid != pid:
+        with _http_client_lock:
+            if _http_client is None or _http_client_pid != pid:
+                _http_client = httpx.Client(timeout=VAPI_HTTP_TIMEOUT, limits=VAPI_HTTP_LIMITS)
+                _http_client_pid = pid
+    return _http_client
+
+
+# =============================================================================
+# TEMPLATES
+# =============================================================================
+# Both are static: everything call-specific reaches the assistant through
+# assistantOverrides.variableValues ({{caseCode}}, {{location}}, ...) and a
+# firstMessage override, so one assistant serves every emergency call.
+
+EMERGENCY_STRUCTURED_OUTPUT = {
+    "name": "Emergency Response Info",
+    "type": "ai",
+    "description": "Extract critical emergency response information and dispatch confirmation",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "emergencyType": {
+                "type": "string",
+                "description": "Type of emergency (medical, police, fire, etc.)"
+            },
+            "location": {
+                "type": "string",
+                "description": "Exact location of the emergency"
+            },
+            "personInDanger": {
+                "type": "string",
+                "description": "Name of the person who needs help"
+            },
+            "serviceRequested": {
+                "type": "string",
+                "description": "Specific emergency service requested"
+            },
+            "dispatchConfirmed": {
+                "type": "boolean",
+                "description": "Whether emergency services confirmed dispatch"
+            },
+            "estimatedArrivalTime": {
+                "type": "string",
+                "description": "Estimated time of arrival provided by operator"
+            },
+            "operatorInstructions": {
+                "type": "string",
+                "description": "Any instructions provided by the emergency operator"
+            },
+            "additionalInfoProvided": {
+                "type": "string",
+                "description": "Additional information shared with operator"
+            }
+        },
+        "required": ["emergencyType", "location", "personInDanger", "serviceRequested"]
+    }
+}
+
+EMERGENCY_ASSISTANT_PROMPT = """
+You are an AI emergency response coordinator for the Citizen Assistance Platform.
+You can speak in English, Choose the language based on the caller's preference or location.
+This is a CRITICAL emergency situation that requires immediate professional response.
+
+EMERGENCY DETAILS:
+- Case Reference: {{caseCode}}
+- Emergency Type: {{emergencyType}} EMERGENCY
+- Person in Danger: {{reportedBy}}
+- Location: {{location}}
+- Urgency Level: {{urgencyLevel}}
+- Additional Details: {{additionalNotes}}
+
+YOUR PRIMARY MISSION:
+You are calling emergency services on behalf of {{reportedBy}} who is in immediate danger.
+You must clearly communicate that this person needs urgent help and request immediate dispatch of appropriate emergency services.
+
+SPECIFIC ACTION REQUIRED BASED ON EMERGENCY TYPE:
+
+MEDICAL EMERGENCY:
+- Clearly state: "I'm calling to request immediate medical assistance for {{reportedBy}} who is experiencing a medical emergency"
+- Describe the medical situation: "{{additionalNotes}}"
+- Urgently request: "Please dispatch an ambulance and medical team immediately to {{location}}"
+- Provide critical medical details from the context
+
+POLICE EMERGENCY:
+- Clearly state: "I'm calling to request immediate police assistance for {{reportedBy}} who is in danger"
+- Describe the security situation: "{{additionalNotes}}"
+- Urgently request: "Please dispatch police units immediately to {{location}}"
+- Mention any threats, weapons, or ongoing dangers
+
+FIRE EMERGENCY:
+- Clearly state: "I'm calling to report a fire emergency affecting {{reportedBy}}"
+- Describe the fire situation: "{{additionalNotes}}"
+- Urgently request: "Please dispatch fire services immediately to {{location}}"
+- Mention trapped individuals, fire size, hazards
+
+GENERAL EMERGENCY:
+- Clearly state: "I'm calling to request emergency assistance for {{reportedBy}} in distress"
+- Describe the situation: "{{additionalNotes}}"
+- Urgently request: "Please dispatch appropriate emergency services to {{location}}"
+
+CRITICAL COMMUNICATION PROTOCOL:
+1. FIRST: Identify yourself as an AI emergency coordinator from Citizen Assistance Platform
+2. SECOND: Immediately state that you're calling because a specific person is in danger
+3. THIRD: Clearly request the appropriate emergency service dispatch
+4. FOURTH: Provide exact location and critical details
+5. FIFTH: Answer any follow-up questions from the emergency operator
+
+ESSENTIAL INFORMATION TO PROVIDE:
+- "This is an automated emergency call on behalf of {{reportedBy}}"
+- "The person is at: {{location}}"
+- "Emergency type: {{emergencyType}} - {{additionalNotes}}"
+- "Urgency level: {{urgencyLevel}} - Immediate dispatch needed"
+
+RESPONSE GUIDELINES:
+- Speak with urgency but remain calm and professional
+- Immediately establish that this is a real emergency, not a test
+- Repeat critical information if necessary (location, person in danger)
+- Stay on the line until emergency services confirm they're dispatching help
+- Provide any additional details the operator requests
+- If transferred to another department, clearly restate the emergency situation
+
+Remember: You are the voice for someone in danger. Your clear, urgent communication can save lives.
+"""
+
+
+def emergency_assistant_template(structured_output_id: str) -> Dict[str, Any]:
+    """Keyword arguments for assistants.create - the schema ID is part of the template"""
+    return {
+        "name": "Emergency Response Agent",
+        "first_message": "Emergency! I'm calling to request immediate assistance for {{reportedBy}} at {{location}}.",
+        "model": {
+            "provider": "openai",
+            "model": "gpt-4o",
+            "temperature": 0.3,
+            "messages": [{"role": "system", "content": EMERGENCY_ASSISTANT_PROMPT}]
+        },
+        "voice": {
+            "provider": "11labs",
+            "voiceId": "aPfeouerZvEVukwmLSP0",
+            "speed": 1.0,
+            "stability": 0.7
+        },
+        "artifact_plan": {
+            "structuredOutputIds": [structured_output_id]
+        },
+        "max_duration_seconds": 600,
+        "background_sound": "off"
+    }
+
+
+def template_hash(template: Dict[str, Any], account: str) -> str:
+    """Content hash of a template within one VAPI account (API key and base URL)"""
+    payload = json.dumps({"account": account, "template": template}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class VapiTemplateCache:
+    """
+    Assistant / structured-output IDs by template hash
+    Held in process and in Redis (no TTL - a changed template gets a new hash),
+    so only the first worker to see a template creates it on VAPI
+    """
+
+    def __init__(self):
+        self._local: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, digest: str) -> Optional[str]:
+        key = f"{TEMPLATE_KEY_PREFIX}{kind}:{digest}"
+        with self._lock:
+            resource_id = self._local.get(key)
+        if resource_id:
+            return resource_id
+
+        client = get_redis_client()
+        if client:
+            try:
+                resource_id = client.get(key)
+            except Exception as e:
+                logger.warning(f"VAPI template cache read failed: {e}")
+        if resource_id:
+            with self._lock:
+                self._local[key] = resource_id
+        return resource_id
+
+    def set(self, kind: str, digest: str, resource_id: str) -> None:
+        key = f"{TEMPLATE_KEY_PREFIX}{kind}:{digest}"
+        with self._lock:
+            self._local[key] = resource_id
+        client = get_redis_client()
+        if client:
+            try:
+                client.set(key, resource_id)
+            except Exception as e:
+                logger.warning(f"VAPI template cache write failed: {e}")
+
+    def delete(self, kind: str, digest: str) -> None:
+        key = f"{TEMPLATE_KEY_PREFIX}{kind}:{digest}"
+        with self._lock:
+            self._local.pop(key, None)
+        client = get_redis_client()
+        if client:
+            try:
+                client.delete(key)
+            except Exception as e:
+                logger.warning(f"VAPI template cache delete failed: {e}")
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+
+# Process-wide instance used by every EmergencyCallAgent
+VAPI_TEMPLATE_CACHE = VapiTemplateCache()
+
+
 class EmergencyCallAgent:
-    def __init__(self, api_key: str = None, phone_number_id: str = None):
+    def __init__(self, api_key: str = None, phone_number_id: str = None, base_url: str = None):
         self.api_key = api_key or os.getenv("VAPI_API_KEY")
         self.phone_number_id = phone_number_id or os.getenv("VAPI_PHONE_NUMBER_ID")
-        self.vapi = Vapi(token=self.api_key)
+        self.base_url = (base_url or getattr(settings, "VAPI_BASE_URL", "https://api.vapi.ai")).rstrip("/")
+        self._vapi: Optional[Vapi] = None
+        self._vapi_client: Optional[httpx.Client] = None
+        self._async_vapi: Optional[AsyncVapi] = None
+        self._async_vapi_client: Optional[httpx.AsyncClient] = None
         self.assistant_id = None
         self.structured_output_id = None
+        self.template_cache = VAPI_TEMPLATE_CACHE
+        # Serializes template creation so concurrent first calls create one assistant
+        self._template_lock = threading.Lock()
+        self._account = f"{self.base_url}|{hashlib.sha256((self.api_key or '').encode('utf-8')).hexdigest()[:16]}"
+
+    @property
+    def http(self) -> httpx.Client:
+        return vapi_http_client()
+
+    @property
+    def vapi(self) -> Vapi:
+        """SDK client on the shared pool - rebound when the pool is rebuilt after a fork"""
+        http = self.http
+        if self._vapi is None or self._vapi_client is not http:
+            self._vapi = Vapi(token=self.api_key, base_url=self.base_url, httpx_client=http)
+            self._vapi_client = http
+        return self._vapi
+
+    @property
+    def async_vapi(self) -> AsyncVapi:
+        """Async SDK client on ACTION_LOOP's pooled client - only usable on that loop"""
+        http = ACTION_LOOP.http
+        if self._async_vapi is None or self._async_vapi_client is not http:
+            self._async_vapi = AsyncVapi(token=self.api_key, base_url=self.base_url, httpx_client=http)
+            self._async_vapi_client = http
+        return self._async_vapi
 
     def make_emergency_call(self, phone_number: str, call_reason: str, additional_context: dict = None):
         """
@@ -25,210 +310,172 @@ class EmergencyCallAgent:
             additional_context (dict): Additional context like case details, location, etc.
         """
         try:
-            # Create structured output for emergency information
-            self._create_emergency_structured_output()
+            overrides = self._call_overrides(call_reason, additional_context or {})
+
+            # Cached assistant - no schema/assistant round trips before dialing
+            assistant_id = self.ensure_assistant()
+            try:
+                call = self._create_call(phone_number, assistant_id, overrides)
+            except ApiError as e:
+                if not self._is_missing_assistant(e):
+                    raise
+                # The cached assistant was deleted on VAPI - rebuild it once and redial
+                logger.warning(f"Cached assistant {assistant_id} rejected ({e.status_code}), recreating it")
+                assistant_id = self.ensure_assistant(refresh=True)
+                call = self._create_call(phone_number, assistant_id, overrides)
+
+            return self._call_started(call, phone_number)
+
+        except Exception as e:
+            return self._call_failed(e)
 
-            # Create or get emergency assistant
-            print(f"Creating emergency assistant for {additional_context}")
-            assistant_id = self._create_emergency_assistant(call_reason, additional_context or {})
+    async def make_emergency_call_async(self, phone_number: str, call_reason: str, additional_context: dict = None):
+        """
+        make_emergency_call as an awaitable on ACTION_LOOP
+        Cancelling it (e.g. on timeout) aborts the dial request. Assistant lookups,
+        cached after the first call, run on the loop's worker pool.
+        """
+        try:
+            overrides = self._call_overrides(call_reason, additional_context or {})
 
-            # Make the call
-            call = self.vapi.calls.create(
-                phone_number_id=self.phone_number_id,
-                customer={"number": phone_number},
-                assistant_id=assistant_id
-            )
+            assistant_id = await ACTION_LOOP.run_blocking(self.ensure_assistant)
+            try:
+                call = await self._create_call_async(phone_number, assistant_id, overrides)
+            except ApiError as e:
+                if not self._is_missing_assistant(e):
+                    raise
+                logger.warning(f"Cached assistant {assistant_id} rejected ({e.status_code}), recreating it")
+                assistant_id = await ACTION_LOOP.run_blocking(self.ensure_assistant, True)
+                call = await self._create_call_async(phone_number, assistant_id, overrides)
 
-            print(f"Emergency call initiated: {call.id} to {phone_number}")
-            return {
-                "success": True,
-                "call_id": call.id,
-                "message": f"Emergency call initiated to {phone_number}"
-            }
+            return self._call_started(call, phone_number)
 
         except Exception as e:
-            print(f"Error making emergency call: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            return self._call_failed(e)
+
+    def _call_overrides(self, call_reason: str, context: dict) -> Dict[str, Any]:
+        return {
+            "firstMessage": self._get_emergency_greeting(call_reason, context),
+            "variableValues": self._call_variables(call_reason, context),
+        }
+
+    @staticmethod
+    def _call_started(call, phone_number: str) -> Dict[str, Any]:
+        logger.info(f"Emergency call initiated: {call.id} to {phone_number}")
+        return {
+            "success": True,
+            "call_id": call.id,
+            "message": f"Emergency call initiated to {phone_number}"
+        }
+
+    @staticmethod
+    def _call_failed(error: Exception) -> Dict[str, Any]:
+        logger.error(f"Error making emergency call: {str(error)}")
+        return {
+            "success": False,
+            "error": str(error)
+        }
+
+    def warm_up(self) -> bool:
+        """Resolve (and if needed create) the schema and assistant ahead of the first call"""
+        if not self.api_key:
+            return False
+        try:
+            # The SDK loads its call models (over a second) on the first calls.create
+            importlib.import_module("vapi.types.call")
+
+            self.ensure_assistant()
+            return True
+        except Exception as e:
+            logger.warning(f"VAPI warm-up failed: {str(e)}")
+            return False
+
+    def ensure_structured_output(self, refresh: bool = False) -> str:
+        """Structured output ID for the current schema template, created on first use"""
+        digest = template_hash(EMERGENCY_STRUCTURED_OUTPUT, self._account)
+        cached = None if refresh else self.template_cache.get("structured_output", digest)
+        if cached:
+            self.structured_output_id = cached
+            return cached
+
+        with self._template_lock:
+            cached = None if refresh else self.template_cache.get("structured_output", digest)
+            if not cached:
+                cached = self._create_emergency_structured_output()
+                self.template_cache.set("structured_output", digest, cached)
+            self.structured_output_id = cached
+            return cached
+
+    def ensure_assistant(self, refresh: bool = False) -> str:
+        """Assistant ID for the current assistant template, created on first use"""
+        structured_output_id = self.ensure_structured_output()
+        template = emergency_assistant_template(structured_output_id)
+        digest = template_hash(template, self._account)
+        cached = None if refresh else self.template_cache.get("assistant", digest)
+        if cached:
+            self.assistant_id = cached
+            return cached
+
+        with self._template_lock:
+            cached = None if refresh else self.template_cache.get("assistant", digest)
+            if not cached:
+                cached = self._create_emergency_assistant(template)
+                self.template_cache.set("assistant", digest, cached)
+            self.assistant_id = cached
+            return cached
+
+    def _create_call(self, phone_number: str, assistant_id: str, overrides: Dict[str, Any]):
+        return self.vapi.calls.create(
+            phone_number_id=self.phone_number_id,
+            customer={"number": phone_number},
+            assistant_id=assistant_id,
+            assistant_overrides=overrides
+        )
+
+    async def _create_call_async(self, phone_number: str, assistant_id: str, overrides: Dict[str, Any]):
+        return await self.async_vapi.calls.create(
+            phone_number_id=self.phone_number_id,
+            customer={"number": phone_number},
+            assistant_id=assistant_id,
+            assistant_overrides=overrides
+        )
+
+    @staticmethod
+    def _is_missing_assistant(error: ApiError) -> bool:
+        # VAPI answers 404, or 400 naming the assistant, for an unknown assistantId
+        return error.status_code == 404 or (error.status_code == 400 and "assistant" in str(error.body).lower())
+
+    @staticmethod
+    def _call_variables(call_reason: str, context: dict) -> Dict[str, str]:
+        """Values for the {{...}} placeholders in the assistant template"""
+        return {
+            "caseCode": str(context.get('case_code') or 'Not provided'),
+            "emergencyType": (call_reason or 'general').upper(),
+            "reportedBy": str(context.get('reported_by') or 'a citizen'),
+            "location": str(context.get('location') or 'Location not specified'),
+            "urgencyLevel": str(context.get('urgency_level') or 'HIGH'),
+            "additionalNotes": str(context.get('additional_notes') or 'No additional details'),
+        }
 
     def _create_emergency_structured_output(self):
         """Create structured output schema for emergency response information."""
-        url = "https://api.vapi.ai/structured-output"
+        url = f"{self.base_url}/structured-output"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
 
-        payload = {
-            "name": "Emergency Response Info",
-            "type": "ai",
-            "description": "Extract critical emergency response information and dispatch confirmation",
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "emergencyType": {
-                        "type": "string",
-                        "description": "Type of emergency (medical, police, fire, etc.)"
-                    },
-                    "location": {
-                        "type": "string",
-                        "description": "Exact location of the emergency"
-                    },
-                    "personInDanger": {
-                        "type": "string",
-                        "description": "Name of the person who needs help"
-                    },
-                    "serviceRequested": {
-                        "type": "string",
-                        "description": "Specific emergency service requested"
-                    },
-                    "dispatchConfirmed": {
-                        "type": "boolean",
-                        "description": "Whether emergency services confirmed dispatch"
-                    },
-                    "estimatedArrivalTime": {
-                        "type": "string",
-                        "description": "Estimated time of arrival provided by operator"
-                    },
-                    "operatorInstructions": {
-                        "type": "string",
-                        "description": "Any instructions provided by the emergency operator"
-                    },
-                    "additionalInfoProvided": {
-                        "type": "string",
-                        "description": "Additional information shared with operator"
-                    }
-                },
-                "required": ["emergencyType", "location", "personInDanger", "serviceRequested"]
-            }
-        }
-
-        resp = requests.post(url, headers=headers, json=payload)
+        resp = self.http.post(url, headers=headers, json=EMERGENCY_STRUCTURED_OUTPUT)
         resp.raise_for_status()
         data = resp.json()
-        self.structured_output_id = data["id"]
-        print(f"Created emergency structured output: {self.structured_output_id}")
-        return self.structured_output_id
-
-    def _create_emergency_assistant(self, call_reason: str, context: dict):
-        """Create an emergency response assistant tailored to the specific situation."""
-
-        # Build context-specific prompt
-        context_info = self._build_context_prompt(context)
-
-        assistant = self.vapi.assistants.create(
-            name=f"Emergency Response Agent",
-            first_message=self._get_emergency_greeting(call_reason, context),
-            model={
-                "provider": "openai",
-                "model": "gpt-4o",
-                "temperature": 0.3,
-                "messages": [{
-                    "role": f"system",
-                    "content": f"""
-                    You are an AI emergency response coordinator for the Citizen Assistance Platform.
-                    You can speak in English, Choose the language based on the caller's preference or location.
-                    This is a CRITICAL emergency situation that requires immediate professional response.
-
-                    EMERGENCY DETAILS:
-                    - Case Reference: {context.get('case_code', 'Not provided')}
-                    - Emergency Type: {call_reason.upper()} EMERGENCY
-                    - Person in Danger: {context.get('reported_by', 'Citizen')}
-                    - Location: {context.get('location', 'Location not specified')}
-                    - Urgency Level: {context.get('urgency_level', 'HIGH')}
-                    - Additional Details: {context.get('additional_notes', 'No additional details')}
-
-                    YOUR PRIMARY MISSION:
-                    You are calling emergency services on behalf of {context.get('reported_by', 'a citizen')} who is in immediate danger. 
-                    You must clearly communicate that this person needs urgent help and request immediate dispatch of appropriate emergency services.
-
-                    SPECIFIC ACTION REQUIRED BASED ON EMERGENCY TYPE:
-
-                    MEDICAL EMERGENCY:
-                    - Clearly state: "I'm calling to request immediate medical assistance for {context.get('reported_by', 'a citizen')} who is experiencing a medical emergency"
-                    - Describe the medical situation: "{context.get('additional_notes', 'Medical emergency in progress')}"
-                    - Urgently request: "Please dispatch an ambulance and medical team immediately to {context.get('location', 'the specified location')}"
-                    - Provide critical medical details from the context
-
-                    POLICE EMERGENCY:
-                    - Clearly state: "I'm calling to request immediate police assistance for {context.get('reported_by', 'a citizen')} who is in danger"
-                    - Describe the security situation: "{context.get('additional_notes', 'Security emergency in progress')}"
-                    - Urgently request: "Please dispatch police units immediately to {context.get('location', 'the specified location')}"
-                    - Mention any threats, weapons, or ongoing dangers
-
-                    FIRE EMERGENCY:
-                    - Clearly state: "I'm calling to report a fire emergency affecting {context.get('reported_by', 'citizens')}"
-                    - Describe the fire situation: "{context.get('additional_notes', 'Fire emergency in progress')}"
-                    - Urgently request: "Please dispatch fire services immediately to {context.get('location', 'the specified location')}"
-                    - Mention trapped individuals, fire size, hazards
-
-                    GENERAL EMERGENCY:
-                    - Clearly state: "I'm calling to request emergency assistance for {context.get('reported_by', 'a citizen')} in distress"
-                    - Describe the situation: "{context.get('additional_notes', 'Emergency situation in progress')}"
-                    - Urgently request: "Please dispatch appropriate emergency services to {context.get('location', 'the specified location')}"
-
-                    CRITICAL COMMUNICATION PROTOCOL:
-                    1. FIRST: Identify yourself as an AI emergency coordinator from Citizen Assistance Platform
-                    2. SECOND: Immediately state that you're calling because a specific person is in danger
-                    3. THIRD: Clearly request the appropriate emergency service dispatch
-                    4. FOURTH: Provide exact location and critical details
-                    5. FIFTH: Answer any follow-up questions from the emergency operator
-
-                    ESSENTIAL INFORMATION TO PROVIDE:
-                    - "This is an automated emergency call on behalf of {context.get('reported_by', 'a citizen')}"
-                    - "The person is at: {context.get('location', 'Unknown location - please check GPS')}"
-                    - "Emergency type: {call_reason.upper()} - {context.get('additional_notes', 'Immediate response required')}"
-                    - "Urgency level: {context.get('urgency_level', 'HIGH')} - Immediate dispatch needed"
-
-                    RESPONSE GUIDELINES:
-                    - Speak with urgency but remain calm and professional
-                    - Immediately establish that this is a real emergency, not a test
-                    - Repeat critical information if necessary (location, person in danger)
-                    - Stay on the line until emergency services confirm they're dispatching help
-                    - Provide any additional details the operator requests
-                    - If transferred to another department, clearly restate the emergency situation
-
-                    Remember: You are the voice for someone in danger. Your clear, urgent communication can save lives.
-                    """
-                }]
-            },
-            voice={
-                "provider": "11labs",
-                "voiceId": "aPfeouerZvEVukwmLSP0",
-                "speed": 1.0,
-                "stability": 0.7
-            },
-            artifact_plan={
-                "structuredOutputIds": [self.structured_output_id]
-            },
-            max_duration_seconds=600,
-            background_sound="off"
-        )
+        logger.info(f"Created emergency structured output: {data['id']}")
+        return data["id"]
 
-        self.assistant_id = assistant.id
-        print(f"Emergency assistant created: {self.assistant_id}")
-        return self.assistant_id
-
-    def _build_context_prompt(self, context: dict) -> str:
-        """Build context-specific prompt based on provided emergency context."""
-        context_parts = []
-
-        if context.get('case_code'):
-            context_parts.append(f"- Case Reference: {context['case_code']}")
-        if context.get('emergency_type'):
-            context_parts.append(f"- Emergency Type: {context['emergency_type']}")
-        if context.get('location'):
-            context_parts.append(f"- Reported Location: {context['location']}")
-        if context.get('reported_by'):
-            context_parts.append(f"- Reported By: {context['reported_by']}")
-        if context.get('additional_notes'):
-            context_parts.append(f"- Additional Notes: {context['additional_notes']}")
-        if context.get('urgency_level'):
-            context_parts.append(f"- Urgency Level: {context['urgency_level']}")
-
-        return "\n".join(context_parts) if context_parts else "- No additional context provided"
+    def _create_emergency_assistant(self, template: Dict[str, Any]):
+        """Create the shared emergency response assistant from its template."""
+        assistant = self.vapi.assistants.create(**template)
+        logger.info(f"Emergency assistant created: {assistant.id}")
+        return assistant.id
 
     def _get_emergency_greeting(self, call_reason: str, context: dict) -> str:
         """Get appropriate emergency greeting that immediately states the emergency."""
@@ -267,10 +514,10 @@ class EmergencyCallAgent:
         try:
             # This would typically involve querying VAPI's API for call artifacts
             # The exact implementation depends on VAPI's specific endpoints
-            url = f"https://api.vapi.ai/call/{call_id}/artifacts"
+            url = f"{self.base_url}/call/{call_id}/artifacts"
             headers = {"Authorization": f"Bearer {self.api_key}"}
 
-            resp = requests.get(url, headers=headers)
+            resp = self.http.get(url, headers=headers)
             if resp.status_code == 200:
                 return resp.json()
             else:
@@ -281,6 +528,11 @@ class EmergencyCallAgent:
 
 # Usage Example:
 if __name__ == "__main__":
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+    django.setup()
+
     # Initialize the emergency call agent
     agent = EmergencyCallAgent()
 
@@ -2,21 +2,11 @@
 Voice Action Service - VAPI integration with EmergencyCallAgent
 Plug & play with TriggerOrchestrator VoiceCallAction
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
-import requests
 import json
 from typing import Dict, List, Any
 from django.conf import settings
 import logging
-from .vapi_call_agent import EmergencyCallAgent
+from apps.depts.services.service_registry import SERVICE_REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +17,8 @@ class VoiceActionService:
     """
 
     def __init__(self):
-        # Use your functional EmergencyCallAgent
-        self.emergency_agent = EmergencyCallAgent()
+        # Use your functional EmergencyCallAgent - one VAPI client per process
+        self.emergency_agent = SERVICE_REGISTRY.lazy("vapi_call_agent")
 
     def execute_voice_action(self, voice_action) -> Dict[str, Any]:
         """
@@ -41,17 +31,7 @@ class VoiceActionService:
             Dict with execution result
         """
         try:
-            # Extract call reason from the script or title
-            call_reason = self._determine_call_reason(voice_action.call_script)
-
-            # Build context from the voice action
-            additional_context = {
-                "case_code": f"VA-{hash(voice_action.title) % 10000:04d}",
-                "emergency_type": call_reason,
-                "location": "Emergency location",  # Could be extracted from script
-                "urgency_level": voice_action.priority.value.upper(),
-                "additional_notes": voice_action.call_script
-            }
+            call_reason, additional_context = self._call_request(voice_action)
 
             # Make the emergency call using your functional agent
             result = self.emergency_agent.make_emergency_call(
@@ -59,37 +39,73 @@ class VoiceActionService:
                 call_reason=call_reason,
                 additional_context=additional_context
             )
+            return self._action_result(voice_action, result)
 
-            if result["success"]:
-                return {
-                    "success": True,
-                    "status": "initiated",
-                    "action_type": voice_action.action_type.value,
-                    "recipient": voice_action.recipient_phone,
-                    "call_id": result.get("call_id"),
-                    "estimated_duration": f"{voice_action.max_duration_minutes} minutes",
-                    "script_preview": voice_action.call_script[:100] + "...",
-                    "service": "EmergencyCallAgent"
-                }
-            else:
-                return {
-                    "success": False,
-                    "status": "failed",
-                    "action_type": voice_action.action_type.value,
-                    "recipient": voice_action.recipient_phone,
-                    "error": result.get("error", "Unknown error")
-                }
+        except Exception as e:
+            return self._action_failed(voice_action, e)
+
+    async def execute_voice_action_async(self, voice_action) -> Dict[str, Any]:
+        """execute_voice_action as an awaitable - cancelling it aborts the dial request"""
+        try:
+            call_reason, additional_context = self._call_request(voice_action)
+            result = await self.emergency_agent.make_emergency_call_async(
+                phone_number=voice_action.recipient_phone,
+                call_reason=call_reason,
+                additional_context=additional_context
+            )
+            return self._action_result(voice_action, result)
 
         except Exception as e:
-            logger.error(f"Voice call failed: {str(e)}")
+            return self._action_failed(voice_action, e)
+
+    def _call_request(self, voice_action):
+        """(call_reason, additional_context) for the EmergencyCallAgent"""
+        # Extract call reason from the script or title
+        call_reason = self._determine_call_reason(voice_action.call_script)
+
+        # Build context from the voice action
+        additional_context = {
+            "case_code": f"VA-{hash(voice_action.title) % 10000:04d}",
+            "emergency_type": call_reason,
+            "location": "Emergency location",  # Could be extracted from script
+            "urgency_level": voice_action.priority.value.upper(),
+            "additional_notes": voice_action.call_script
+        }
+        return call_reason, additional_context
+
+    @staticmethod
+    def _action_result(voice_action, result: Dict[str, Any]) -> Dict[str, Any]:
+        if result["success"]:
+            return {
+                "success": True,
+                "status": "initiated",
+                "action_type": voice_action.action_type.value,
+                "recipient": voice_action.recipient_phone,
+                "call_id": result.get("call_id"),
+                "estimated_duration": f"{voice_action.max_duration_minutes} minutes",
+                "script_preview": voice_action.call_script[:100] + "...",
+                "service": "EmergencyCallAgent"
+            }
+        else:
             return {
                 "success": False,
                 "status": "failed",
                 "action_type": voice_action.action_type.value,
                 "recipient": voice_action.recipient_phone,
-                "error": str(e)
+                "error": result.get("error", "Unknown error")
             }
 
+    @staticmethod
+    def _action_failed(voice_action, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Voice call failed: {str(error)}")
+        return {
+            "success": False,
+            "status": "failed",
+            "action_type": voice_action.action_type.value,
+            "recipient": voice_action.recipient_phone,
+            "error": str(error)
+        }
+
     def _determine_call_reason(self, call_script: str) -> str:
         """Determine emergency type from call script"""
         script_lower = call_script.lower()
@@ -144,63 +160,17 @@ class VoiceActionService:
 
     def create_emergency_assistant(self) -> Dict[str, Any]:
         """
-        Create specialized emergency assistant in VAPI
-        This should be run once during setup
+        Create (or reuse) the emergency assistant in VAPI
+        Same cached template assistant the EmergencyCallAgent dials with
         """
-        if not self.vapi_api_key:
+        if not self.emergency_agent.api_key:
             return {"success": False, "error": "VAPI API key not configured"}
 
-        assistant_config = {
-            "name": "Emergency Response Assistant",
-            "model": {
-                "provider": "openai",
-                "model": "gpt-4",
-                "temperature": 0.1
-            },
-            "voice": {
-                "provider": "eleven-labs",
-                "voiceId": "emergency_voice_id"
-            },
-            "firstMessage": "This is an emergency response call. Please confirm your location and describe the situation.",
-            "systemMessage": """
-You are an emergency response AI assistant. Your role is to:
-1. Confirm the recipient is available and safe
-2. Relay the emergency information clearly
-3. Provide immediate safety instructions if needed
-4. Confirm receipt of the emergency alert
-5. Keep the call brief but thorough
-6. Maintain a calm, professional tone
-
-Do not provide medical advice beyond basic safety measures.
-Always instruct to call local emergency services if immediate help is needed.
-""",
-            "recordingEnabled": True,
-            "maxDurationSeconds": 300  # 5 minutes max
-        }
-
         try:
-            response = requests.post(
-                f"{self.vapi_base_url}/assistant",
-                headers={
-                    "Authorization": f"Bearer {self.vapi_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=assistant_config
-            )
-
-            if response.status_code == 200:
-                assistant_data = response.json()
-                return {
-                    "success": True,
-                    "assistant_id": assistant_data.get("id"),
-                    "name": assistant_data.get("name")
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Failed to create assistant: {response.text}"
-                }
-
+            return {
+                "success": True,
+                "assistant_id": self.emergency_agent.ensure_assistant()
+            }
         except Exception as e:
             return {
                 "success": False,
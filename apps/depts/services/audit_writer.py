@@ -0,0 +1,138 @@
+"""
+Audit Writer - Buffered ActionLog / NotificationLog inserts
+Log rows are collected in memory per worker and written with one bulk_create per
+model when the pipeline finishes (or fails), on a short timer, or when the buffer
+fills - instead of one synchronous INSERT per pipeline step
+"""
+import atexit
+import logging
+import threading
+from typing import Dict, List, Optional, Type
+
+from django.db import connection, models, transaction
+
+logger = logging.getLogger(__name__)
+
+# Buffered rows are written at most this long after being added
+AUDIT_FLUSH_INTERVAL_SECONDS = 2.0
+# Flush immediately once this many rows are waiting
+AUDIT_MAX_BUFFERED_ROWS = 500
+
+
+class AuditWriter:
+    """
+    Thread-safe buffer of unsaved audit model instances
+
+    add() never touches the database; flush() writes everything buffered so far.
+    Rows keep the ids assigned in add(), so callers can reference them right away.
+    """
+
+    def __init__(self, flush_interval_seconds: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+                 max_buffered_rows: int = AUDIT_MAX_BUFFERED_ROWS):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered_rows = max_buffered_rows
+        self._rows: Dict[Type[models.Model], List[models.Model]] = {}
+        self._count = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, row: models.Model) -> models.Model:
+        """Queue a row for the next flush"""
+        # bulk_create skips save(), so ids are assigned here
+        if not row.id:
+            row.id = row.generate_custom_id()
+
+        with self._lock:
+            self._rows.setdefault(type(row), []).append(row)
+            self._count += 1
+            full = self._count >= self.max_buffered_rows
+            if not full and self._timer is None and self.flush_interval_seconds:
+                self._timer = threading.Timer(self.flush_interval_seconds, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+        return row
+
+    def pending(self, model: Type[models.Model], **fields) -> List[models.Model]:
+        """Buffered, not yet written rows of a model whose attributes match fields"""
+        with self._lock:
+            rows = list(self._rows.get(model, []))
+        return [
+            row for row in rows
+            if all(getattr(row, name) == value for name, value in fields.items())
+        ]
+
+    def flush(self, citizen_request_id: Optional[str] = None) -> int:
+        """
+        Write everything buffered - one bulk_create per model
+
+        Args:
+            citizen_request_id: only write this request's rows, leaving rows other
+                pipelines buffered for their own flush (or the timer)
+
+        Returns:
+            Number of rows written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if citizen_request_id is None:
+                    batches, self._rows, self._count = self._rows, {}, 0
+                else:
+                    batches = self._take(citizen_request_id)
+                if not self._count and self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            written = 0
+            for model, rows in batches.items():
+                written += self._write(model, rows)
+            return written
+
+    def _take(self, citizen_request_id: str) -> Dict[Type[models.Model], List[models.Model]]:
+        """Remove and return one request's buffered rows - caller holds _lock"""
+        taken = {}
+        for model, rows in self._rows.items():
+            mine, others = [], []
+            for row in rows:
+                (mine if getattr(row, 'citizen_request_id', None) == citizen_request_id else others).append(row)
+            if mine:
+                taken[model] = mine
+                self._rows[model] = others
+                self._count -= len(mine)
+        return taken
+
+    def _write(self, model: Type[models.Model], rows: List[models.Model]) -> int:
+        try:
+            # Savepoint when called inside a transaction, so a bad row can't poison it
+            with transaction.atomic():
+                model.objects.bulk_create(rows)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Bulk {model.__name__} write failed, saving rows one by one: {e}")
+
+        written = 0
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    row.save(force_insert=True)
+                written += 1
+            except Exception as e:
+                logger.error(f"Dropping {model.__name__} {row.id}: {e}")
+        return written
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Timed audit flush failed: {e}")
+        finally:
+            # Timer threads are not request threads - nothing else closes their connection
+            connection.close()
+
+
+# Process-wide writer used by the pipelines, database service and dispatch ledger
+AUDIT_WRITER = AuditWriter()
+atexit.register(AUDIT_WRITER.flush)
@@ -2,30 +2,23 @@
 Database Service - Handles all database operations for emergency pipeline
 Keeps the main pipeline service focused on orchestration
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import timedelta
+from django.db import transaction
 from django.utils import timezone
 from django.utils.crypto import get_random_string
 
 from apps.depts.models import (
     CitizenRequest, ActionLog, CitizenRequestAssignment,
-    Department, DepartmentEntity, City, Location
+    City, Location, PipelineCheckpoint
 )
 from apps.depts.choices import (
     CaseStatus, UrgencyLevel, ActionType, AgentType,
-    DepartmentCategory, TriageSource, Province,
-    UrgencyLevel
+    DepartmentCategory, TriageSource, Province
 )
 from apps.authentication.models import CustomUser
+from apps.depts.services.audit_writer import AUDIT_WRITER
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
 
 class EmergencyDatabaseService:
     """Handles all database operations for emergency pipeline"""
@@ -65,8 +58,8 @@ class EmergencyDatabaseService:
             triage_source=TriageSource.LLM
         )
 
-        # Log initial action
-        ActionLog.objects.create(
+        # Log initial action (written with the pipeline's other audit rows)
+        AUDIT_WRITER.add(ActionLog(
             citizen_request=citizen_request,
             agent_type=AgentType.REQUEST_ANALYSIS,
             action_type=ActionType.ANALYSIS,
@@ -79,7 +72,7 @@ class EmergencyDatabaseService:
                 'user_city': request_data.get('user_city'),
                 'has_coordinates': bool(request_data.get('user_coordinates'))
             }
-        )
+        ))
 
         return citizen_request
 
@@ -112,9 +105,10 @@ class EmergencyDatabaseService:
         router_result,
         matcher_result,
         dept_result,
-        execution_result: Dict[str, Any]
+        execution_result: Dict[str, Any],
+        stage_metrics: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> None:
-        """Update CitizenRequest with final pipeline results"""
+        """Update CitizenRequest with final pipeline results (and sampled stage metrics)"""
         
         # Map urgency level - dept_result.criticality comes as string, need to map to enum
         urgency_mapping = {
@@ -124,25 +118,26 @@ class EmergencyDatabaseService:
             'low': UrgencyLevel.LOW
         }
 
-        # Get assigned department and entity
-        assigned_dept = EmergencyDatabaseService._get_department(router_result)
-        assigned_entity = EmergencyDatabaseService._get_entity(matcher_result)
+        # Matcher already resolved both - no lookups by name or category here
+        assigned_department_id = EmergencyDatabaseService._get_department_id(router_result, matcher_result)
+        assigned_entity_id = EmergencyDatabaseService._get_entity_id(matcher_result)
 
         # Update the record
         citizen_request.category = getattr(router_result, 'department', None)
         citizen_request.urgency_level = urgency_mapping.get(dept_result.criticality, UrgencyLevel.MEDIUM)
         citizen_request.confidence_score = getattr(router_result, 'confidence', 0.8)
+        citizen_request.triage_source = getattr(router_result, 'classification_source', None) or TriageSource.LLM
         citizen_request.ai_response = getattr(dept_result, 'rationale', '')
-        citizen_request.assigned_department = assigned_dept
-        citizen_request.assigned_entity = assigned_entity
+        citizen_request.assigned_department_id = assigned_department_id
+        citizen_request.assigned_entity_id = assigned_entity_id
         citizen_request.status = CaseStatus.ASSIGNED if execution_result.get("successful_actions", 0) > 0 else CaseStatus.IN_PROGRESS
         citizen_request.is_emergency = (dept_result.criticality in [UrgencyLevel.CRITICAL, UrgencyLevel.HIGH])
         citizen_request.expected_response_time = timezone.now() + timedelta(minutes=30)
+        if stage_metrics:
+            citizen_request.output_json = {**(citizen_request.output_json or {}), 'pipeline_metrics': stage_metrics}
 
-        citizen_request.save()
-
-        # Create assignment record with detailed notes from request_plan
-        if assigned_entity:
+        assignments = []
+        if assigned_entity_id:
             # Create comprehensive assignment notes from request_plan
             assignment_notes = f"""INCIDENT SUMMARY: {dept_result.request_plan.incident_summary}
 
@@ -154,15 +149,15 @@ REQUIRED RESPONSE: {dept_result.request_plan.required_response}
 
 DEPARTMENT RATIONALE: {dept_result.rationale}"""
 
-            CitizenRequestAssignment.objects.create(
+            assignments.append(CitizenRequestAssignment(
                 citizen_request=citizen_request,
-                department_entity=assigned_entity,
+                department_entity_id=assigned_entity_id,
                 priority_override=dept_result.criticality,
                 assignment_notes=assignment_notes
-            )
+            ))
 
         # Log completion
-        ActionLog.objects.create(
+        completion_log = ActionLog(
             citizen_request=citizen_request,
             agent_type=AgentType.REQUEST_ANALYSIS,
             action_type=ActionType.DEPARTMENT_ASSIGNMENT,
@@ -177,29 +172,74 @@ DEPARTMENT RATIONALE: {dept_result.rationale}"""
             }
         )
 
+        # bulk_create skips save(), so ids are assigned here
+        for row in assignments:
+            row.id = row.generate_custom_id()
+
+        def write_audit_rows():
+            AUDIT_WRITER.add(completion_log)
+            AUDIT_WRITER.flush(citizen_request_id=citizen_request.id)
+
+        # Request and assignments land together; this request's buffered logs follow
+        # once committed - a rollback never logs completion or takes other runs' rows
+        with transaction.atomic():
+            citizen_request.save()
+            CitizenRequestAssignment.objects.bulk_create(assignments)
+            transaction.on_commit(write_audit_rows)
+
     @staticmethod
-    def _get_department(router_result):
-        """Get department from router result"""
-        return Department.objects.filter(
-            category=getattr(router_result, 'department', None),
-            is_active=True
-        ).first()
+    def _get_department_id(router_result, matcher_result) -> Optional[str]:
+        """Department the matcher used, else the active one for the routed category"""
+        department_id = getattr(matcher_result, 'department_id', None)
+        if department_id:
+            return department_id
+
+        department = DEPARTMENT_DIRECTORY.department_for_category(getattr(router_result, 'department', None))
+        return department.id if department else None
 
     @staticmethod
-    def _get_entity(matcher_result):
-        """Get entity from matcher result"""
+    def _get_entity_id(matcher_result) -> Optional[str]:
+        """Primary key of the matched entity, if it is still active"""
         if not matcher_result.matched_entity:
             return None
-            
-        return DepartmentEntity.objects.filter(
-            name=matcher_result.matched_entity.name,
-            is_active=True
-        ).first()
+
+        # Checkpointed matcher output may predate an entity being removed
+        entity = DEPARTMENT_DIRECTORY.entity(matcher_result.matched_entity.id)
+        return entity.id if entity else None
+
+    @staticmethod
+    def load_checkpoints(stream_id: Optional[str]) -> Tuple[Optional[CitizenRequest], Dict[str, Any]]:
+        """CitizenRequest and {stage: payload} saved by an earlier attempt of this stream"""
+        if not stream_id:
+            return None, {}
+
+        checkpoints = list(
+            PipelineCheckpoint.objects.filter(stream_id=stream_id).select_related('citizen_request')
+        )
+        if not checkpoints:
+            return None, {}
+
+        return checkpoints[0].citizen_request, {checkpoint.stage: checkpoint.payload for checkpoint in checkpoints}
+
+    @staticmethod
+    def save_checkpoint(citizen_request: CitizenRequest, stream_id: str, stage: str, payload: Any) -> None:
+        """Record a completed stage's output"""
+        PipelineCheckpoint.objects.update_or_create(
+            citizen_request=citizen_request,
+            stage=stage,
+            defaults={'stream_id': stream_id, 'payload': payload}
+        )
+
+    @staticmethod
+    def clear_checkpoints(stream_id: Optional[str]) -> None:
+        """Drop checkpoints once the pipeline has finished"""
+        if stream_id:
+            PipelineCheckpoint.objects.filter(stream_id=stream_id).delete()
 
     @staticmethod
     def log_error(citizen_request: CitizenRequest, step_name: str, error_message: str, agent_type: str = None, action_type: str = None):
-        """Log error to ActionLog"""
-        ActionLog.objects.create(
+        """Log error to ActionLog (buffered - flushed when the pipeline ends)"""
+        AUDIT_WRITER.add(ActionLog(
             citizen_request=citizen_request,
             agent_type=agent_type or AgentType.REQUEST_ANALYSIS,
             action_type=action_type or ActionType.ANALYSIS,
@@ -207,4 +247,4 @@ DEPARTMENT RATIONALE: {dept_result.rationale}"""
             success=False,
             error_message=error_message,
             details={'error': error_message}
-        )
+        ))
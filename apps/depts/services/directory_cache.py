@@ -0,0 +1,236 @@
+"""
+Directory Cache - Per-process snapshot of departments, entities and cities
+Compact __slots__ records with per-category / per-city indexes, so the matcher and
+the persistence layer resolve reference data without a database round trip.
+A global version number in Redis (bumped by depts signals on any edit) tells
+every worker when to reload.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from apps.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "directory:version"
+
+# How often a worker asks Redis whether the directory changed
+VERSION_CHECK_SECONDS = 5
+# Without Redis, reload at least this often so other processes converge
+DIRECTORY_MAX_AGE_SECONDS = 300
+
+
+# =============================================================================
+# RECORDS
+# =============================================================================
+
+class DepartmentRecord:
+    __slots__ = ('id', 'name', 'category', 'main_phone', 'main_email', 'emergency_number')
+
+    def __init__(self, id, name, category, main_phone, main_email, emergency_number):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.main_phone = main_phone
+        self.main_email = main_email
+        self.emergency_number = emergency_number
+
+
+class EntityRecord:
+    __slots__ = ('id', 'name', 'type', 'department_id', 'city_id', 'city_name', 'phone', 'address')
+
+    def __init__(self, id, name, type, department_id, city_id, city_name, phone, address):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.department_id = department_id
+        self.city_id = city_id
+        self.city_name = city_name
+        self.phone = phone
+        self.address = address
+
+
+class CityRecord:
+    __slots__ = ('id', 'name')
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class DirectorySnapshot:
+    """One immutable load of the directory - swapped as a whole on reload"""
+
+    def __init__(self, departments: List[DepartmentRecord], entities: List[EntityRecord],
+                 cities: List[CityRecord], candidates: List[Tuple[str, str, str, bool]]):
+        self.departments: Dict[str, DepartmentRecord] = {department.id: department for department in departments}
+        self.entities: Dict[str, EntityRecord] = {entity.id: entity for entity in entities}
+        self.cities: List[CityRecord] = cities
+
+        # Same choice as Department.objects.filter(category=..., is_active=True).first()
+        self.department_by_category: Dict[str, DepartmentRecord] = {}
+        for department in departments:
+            self.department_by_category.setdefault(department.category, department)
+
+        self.entities_by_department: Dict[str, List[EntityRecord]] = {}
+        self.entity_by_name: Dict[str, EntityRecord] = {}
+        for entity in entities:
+            self.entities_by_department.setdefault(entity.department_id, []).append(entity)
+            self.entity_by_name.setdefault(entity.name, entity)
+
+        # (category, city_id) -> ranked [(entity, same_city)] from MatcherCandidate
+        self.candidates: Dict[Tuple[str, str], List[Tuple[EntityRecord, bool]]] = {}
+        for category, city_id, entity_id, same_city in candidates:
+            entity = self.entities.get(entity_id)
+            if entity:
+                self.candidates.setdefault((category, city_id), []).append((entity, same_city))
+
+
+# =============================================================================
+# DIRECTORY
+# =============================================================================
+
+class DepartmentDirectory:
+    """
+    Lazily loaded, version-checked directory of active departments and entities
+
+    All lookups return records (or None); callers assign foreign keys by id.
+    """
+
+    def __init__(self, version_check_seconds: int = VERSION_CHECK_SECONDS,
+                 max_age_seconds: int = DIRECTORY_MAX_AGE_SECONDS):
+        self.version_check_seconds = version_check_seconds
+        self.max_age_seconds = max_age_seconds
+        self._snapshot: Optional[DirectorySnapshot] = None
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def department_for_category(self, category: Optional[str]) -> Optional[DepartmentRecord]:
+        return self._get_snapshot().department_by_category.get(category)
+
+    def department(self, department_id: Optional[str]) -> Optional[DepartmentRecord]:
+        return self._get_snapshot().departments.get(department_id)
+
+    def entity(self, entity_id: Optional[str]) -> Optional[EntityRecord]:
+        return self._get_snapshot().entities.get(entity_id)
+
+    def entity_by_name(self, name: Optional[str]) -> Optional[EntityRecord]:
+        return self._get_snapshot().entity_by_name.get(name)
+
+    def entities_for_department(self, department_id: str) -> List[EntityRecord]:
+        """Active entities of a department in primary key order"""
+        return self._get_snapshot().entities_by_department.get(department_id, [])
+
+    def candidates(self, category: str, city_id: str) -> List[Tuple[EntityRecord, bool]]:
+        """Ranked (entity, same_city) candidates precomputed for a city"""
+        return self._get_snapshot().candidates.get((category, city_id), [])
+
+    def city_by_name(self, city_name: str) -> Optional[CityRecord]:
+        """Exact case-insensitive match first, then partial - like MatcherService.find_city_by_name"""
+        wanted = (city_name or "").strip().lower()
+        if not wanted:
+            return None
+        cities = self._get_snapshot().cities
+        for city in cities:
+            if city.name.lower() == wanted:
+                return city
+        for city in cities:
+            if wanted in city.name.lower():
+                return city
+        return None
+
+    # -------------------------------------------------------------------------
+    # Invalidation
+    # -------------------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Drop this process's snapshot"""
+        self._loaded_at = 0.0
+
+    def bump_version(self) -> None:
+        """Invalidate here and tell every other worker to reload"""
+        self.invalidate()
+        client = get_redis_client()
+        if client:
+            try:
+                client.incr(VERSION_KEY)
+            except Exception as e:
+                logger.debug(f"Directory version bump failed: {e}")
+
+    def _current_version(self) -> Optional[str]:
+        client = get_redis_client()
+        if not client:
+            return None
+        try:
+            return client.get(VERSION_KEY) or "0"
+        except Exception as e:
+            logger.debug(f"Directory version check failed: {e}")
+            return None
+
+    def _is_stale(self) -> bool:
+        if self._snapshot is None or not self._loaded_at:
+            return True
+
+        now = time.monotonic()
+        if self._version is None:
+            # No Redis to coordinate with - fall back to age
+            return now - self._loaded_at >= self.max_age_seconds
+
+        if now - self._checked_at < self.version_check_seconds:
+            return False
+        self._checked_at = now
+        return self._current_version() not in (None, self._version)
+
+    def _get_snapshot(self) -> DirectorySnapshot:
+        loaded_at = self._loaded_at
+        if not self._is_stale():
+            return self._snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while this one waited
+            if self._loaded_at == loaded_at:
+                self._reload()
+            return self._snapshot
+
+    def _reload(self) -> None:
+        from apps.depts.models import City, Department, DepartmentEntity, MatcherCandidate
+
+        # Read the version first so an edit racing with the load triggers another reload
+        version = self._current_version()
+
+        departments = [
+            DepartmentRecord(*row) for row in Department.objects.filter(is_active=True).order_by('pk').values_list(
+                'id', 'name', 'category', 'main_phone', 'main_email', 'emergency_number'
+            )
+        ]
+        entities = [
+            EntityRecord(entity_id, name, entity_type, department_id, city_id, city_name, phone, address or '')
+            for entity_id, name, entity_type, department_id, city_id, city_name, phone, address
+            in DepartmentEntity.objects.filter(is_active=True, department__is_active=True).order_by('pk').values_list(
+                'id', 'name', 'type', 'department_id', 'city_id', 'city__name', 'phone', 'location__formatted_address'
+            )
+        ]
+        cities = [CityRecord(*row) for row in City.objects.order_by('pk').values_list('id', 'name')]
+        candidates = list(
+            MatcherCandidate.objects.order_by('category', 'city_id', 'rank').values_list(
+                'category', 'city_id', 'entity_id', 'same_city'
+            )
+        )
+
+        self._snapshot = DirectorySnapshot(departments, entities, cities, candidates)
+        self._version = version
+        self._loaded_at = self._checked_at = time.monotonic()
+
+        logger.info(f"📇 Loaded department directory: {len(departments)} departments, {len(entities)} entities")
+
+
+# Process-wide instance used by MatcherService, EmergencyDatabaseService and the depts signals
+DEPARTMENT_DIRECTORY = DepartmentDirectory()
@@ -11,25 +11,21 @@ FLOW:
 
 Simple, efficient, demo-ready pipeline
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List, Any
 import logging
 import time
 from datetime import datetime, timedelta
+from django.db import transaction
 from django.utils import timezone
 
 # Import all our services
 from apps.depts.agents.router_agent.service import RouterAgentService
 from apps.depts.services.matcher_service import MatcherService
+from apps.depts.services.database_service import EmergencyDatabaseService
+from apps.depts.services.audit_writer import AUDIT_WRITER
+from apps.depts.services.pipeline_metrics import PIPELINE_METRICS, StageRecorder
+from apps.depts.services.service_registry import SERVICE_REGISTRY
 from apps.depts.agents.department_orchestrator_agent.service import DepartmentOrchestratorService
 from apps.depts.services.trigger_orchestrator_service import TriggerOrchestratorService, TriggerOrchestratorInput
 from apps.depts.services.actions.action_executor import ActionExecutor
@@ -38,7 +34,7 @@ from apps.ai_agents.internal_agents.next_steps_agent import NextStepsAgentServic
 # Import database models
 from apps.depts.models import (
     CitizenRequest, ActionLog, NotificationLog, EmergencyCall,
-    Department, DepartmentEntity, City, Location, CitizenRequestAssignment
+    City, Location, CitizenRequestAssignment
 )
 from apps.depts.choices import (
     CaseStatus, UrgencyLevel, ActionType, AgentType,
@@ -48,6 +44,15 @@ from apps.authentication.models import CustomUser
 
 logger = logging.getLogger(__name__)
 
+# PipelineStep.step_name -> metrics stage name shared with SimplifiedEmergencyPipeline
+STEP_METRIC_STAGES = {
+    "Router Agent": "router",
+    "Matcher Service": "matcher",
+    "Department Orchestrator": "department",
+    "Trigger Orchestrator": "trigger",
+    "Action Executor": "actions",
+}
+
 # =============================================================================
 # PIPELINE MODELS
 # =============================================================================
@@ -247,6 +252,22 @@ class EmergencyPipelineService:
         except Exception as e:
             return self._create_error_response(request_id, citizen_request, pipeline_steps, str(e))
 
+        finally:
+            # Audit rows buffered by this run are written even when it failed -
+            # other runs' rows stay buffered for their own flush
+            if 'citizen_request_db' in locals():
+                AUDIT_WRITER.flush(citizen_request_id=citizen_request_db.id)
+            self._observe_steps(pipeline_steps)
+
+    @staticmethod
+    def _observe_steps(pipeline_steps: List[PipelineStep]) -> None:
+        """Report step durations to the pipeline metrics - wall time and outcome only"""
+        for step in pipeline_steps:
+            recorder = StageRecorder(STEP_METRIC_STAGES.get(step.step_name, step.step_name))
+            recorder.wall_ms = step.duration_ms
+            recorder.success = step.success
+            PIPELINE_METRICS.observe_stage(recorder)
+
     def _execute_router_step(self, citizen_request: CitizenRequest):
         """Execute Router Agent step"""
         step_start = time.time()
@@ -533,8 +554,8 @@ class EmergencyPipelineService:
             triage_source=TriageSource.LLM
         )
 
-        # Log initial action
-        ActionLog.objects.create(
+        # Log initial action (written with the pipeline's other audit rows)
+        AUDIT_WRITER.add(ActionLog(
             citizen_request=citizen_request_db,
             agent_type=AgentType.REQUEST_ANALYSIS,
             action_type=ActionType.ANALYSIS,
@@ -547,14 +568,14 @@ class EmergencyPipelineService:
                 'user_city': citizen_request.user_city,
                 'has_coordinates': bool(citizen_request.user_coordinates)
             }
-        )
+        ))
 
         return citizen_request_db
 
     def _log_pipeline_step(self, citizen_request_db, step_name: str, agent_type: str, action_type: str,
                           success: bool, details: dict, error_message: str = None):
-        """Log pipeline step to ActionLog"""
-        ActionLog.objects.create(
+        """Log pipeline step to ActionLog (buffered - flushed when the pipeline ends)"""
+        AUDIT_WRITER.add(ActionLog(
             citizen_request=citizen_request_db,
             agent_type=agent_type,
             action_type=action_type,
@@ -563,7 +584,7 @@ class EmergencyPipelineService:
             error_message=error_message or "",  # Provide empty string instead of None
             details=details,
             completed_at=timezone.now()
-        )
+        ))
 
     def _finalize_citizen_request_record(self, citizen_request_db, router_result, matcher_result,
                                        dept_result, trigger_result, execution_result):
@@ -578,65 +599,53 @@ class EmergencyPipelineService:
                 'low': UrgencyLevel.LOW
             }
 
-            # Get assigned department and entity
-            assigned_dept = None
-            assigned_entity = None
-
-            if hasattr(router_result, 'department'):
-                try:
-                    assigned_dept = Department.objects.filter(
-                        category=router_result.department,
-                        is_active=True
-                    ).first()
-                except:
-                    pass
-
-            if matcher_result.matched_entity:
-                try:
-                    assigned_entity = DepartmentEntity.objects.filter(
-                        name=matcher_result.matched_entity.name,
-                        is_active=True
-                    ).first()
-                except:
-                    pass
+            # Matcher already resolved both - no lookups by name or category here
+            assigned_department_id = EmergencyDatabaseService._get_department_id(router_result, matcher_result)
+            assigned_entity_id = EmergencyDatabaseService._get_entity_id(matcher_result)
 
             # Update the record
             citizen_request_db.category = router_result.department if hasattr(router_result, 'department') else None
             citizen_request_db.urgency_level = urgency_mapping.get(dept_result.criticality, UrgencyLevel.MEDIUM)
             citizen_request_db.confidence_score = getattr(router_result, 'confidence', 0.8)
+            citizen_request_db.triage_source = getattr(router_result, 'classification_source', None) or TriageSource.LLM
             citizen_request_db.ai_response = dept_result.rationale
-            citizen_request_db.assigned_department = assigned_dept
-            citizen_request_db.assigned_entity = assigned_entity
+            citizen_request_db.assigned_department_id = assigned_department_id
+            citizen_request_db.assigned_entity_id = assigned_entity_id
             citizen_request_db.status = CaseStatus.ASSIGNED if execution_result.get("successful_actions", 0) > 0 else CaseStatus.IN_PROGRESS
             citizen_request_db.is_emergency = (dept_result.criticality in ['critical', 'high'])
             citizen_request_db.expected_response_time = timezone.now() + timedelta(minutes=30)  # Default 30 min response
 
-            citizen_request_db.save()
+            # Request, assignment and log land together or not at all
+            with transaction.atomic():
+                citizen_request_db.save()
+
+                # Create assignment record
+                if assigned_entity_id:
+                    CitizenRequestAssignment.objects.create(
+                        citizen_request=citizen_request_db,
+                        department_entity_id=assigned_entity_id,
+                        priority_override=dept_result.criticality
+                    )
 
-            # Create assignment record
-            if assigned_entity:
-                CitizenRequestAssignment.objects.create(
-                    citizen_request=citizen_request_db,
-                    department_entity=assigned_entity,
-                    priority_override=dept_result.criticality
+                # Log completion
+                self._log_pipeline_step(
+                    citizen_request_db,
+                    "Pipeline Completion",
+                    AgentType.REQUEST_ANALYSIS,
+                    ActionType.DEPARTMENT_ASSIGNMENT,
+                    True,
+                    {
+                        'description': 'Emergency pipeline processing completed successfully',
+                        'total_actions': execution_result.get("total_actions", 0),
+                        'successful_actions': execution_result.get("successful_actions", 0),
+                        'criticality': dept_result.criticality,
+                        'assigned_department': router_result.department if hasattr(router_result, 'department') else None,
+                        'assigned_entity': matcher_result.matched_entity.name if matcher_result.matched_entity else None
+                    }
                 )
 
-            # Log completion
-            self._log_pipeline_step(
-                citizen_request_db,
-                "Pipeline Completion",
-                AgentType.REQUEST_ANALYSIS,
-                ActionType.DEPARTMENT_ASSIGNMENT,
-                True,
-                {
-                    'description': 'Emergency pipeline processing completed successfully',
-                    'total_actions': execution_result.get("total_actions", 0),
-                    'successful_actions': execution_result.get("successful_actions", 0),
-                    'criticality': dept_result.criticality,
-                    'assigned_department': router_result.department if hasattr(router_result, 'department') else None,
-                    'assigned_entity': matcher_result.matched_entity.name if matcher_result.matched_entity else None
-                }
-            )
+                # This request's buffered logs, once the update commits
+                transaction.on_commit(lambda: AUDIT_WRITER.flush(citizen_request_id=citizen_request_db.id))
 
         except Exception as e:
             logger.error(f"Failed to finalize database record: {e}")
@@ -733,5 +742,5 @@ def process_citizen_emergency(
     pipeline = EmergencyPipelineService()
     return pipeline.process_emergency_request(citizen_request)
 
-# Global instance for easy access
-EMERGENCY_PIPELINE = EmergencyPipelineService()
\ No newline at end of file
+# Global instance for easy access - built on first use
+EMERGENCY_PIPELINE = SERVICE_REGISTRY.lazy("emergency_pipeline")
\ No newline at end of file
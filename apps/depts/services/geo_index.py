@@ -0,0 +1,280 @@
+"""
+Geo Index - In-memory nearest-entity and nearest-city lookups for the matcher
+One k-d tree per department, one coordinate array for all cities, both rebuilt
+lazily when the underlying rows change
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371
+
+# Rebuild a tree even without a change signal once it is this old, so
+# processes that never saw the signal (other workers) converge on fresh data
+INDEX_MAX_AGE_SECONDS = 300
+
+
+def _to_unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    """Project lat/lng onto the unit sphere so euclidean order matches great-circle order"""
+    lat_rad = math.radians(lat)
+    lng_rad = math.radians(lng)
+    cos_lat = math.cos(lat_rad)
+    return (cos_lat * math.cos(lng_rad), cos_lat * math.sin(lng_rad), math.sin(lat_rad))
+
+
+def _chord_to_km(chord: float) -> float:
+    """Convert a chord length on the unit sphere to a great-circle distance in km"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+# =============================================================================
+# K-D TREE
+# =============================================================================
+
+class KDTree:
+    """
+    Static 3-d tree over unit vectors
+    Nodes are stored as (point, entity_id, axis, left, right) tuples
+    """
+
+    def __init__(self, points: List[Tuple[Tuple[float, float, float], str]]):
+        self.size = len(points)
+        self.root = self._build(list(points), 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+
+        axis = depth % 3
+        points.sort(key=lambda item: item[0][axis])
+        median = len(points) // 2
+        point, entity_id = points[median]
+
+        return (
+            point,
+            entity_id,
+            axis,
+            self._build(points[:median], depth + 1),
+            self._build(points[median + 1:], depth + 1),
+        )
+
+    def nearest(self, target: Tuple[float, float, float], k: int) -> List[Tuple[float, str]]:
+        """Return up to k (squared_chord, entity_id) pairs sorted by distance"""
+        if k <= 0 or self.root is None:
+            return []
+
+        # Max-heap of the best k candidates, stored as negated distances
+        best: List[Tuple[float, str]] = []
+        stack = [self.root]
+
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+
+            point, entity_id, axis, left, right = node
+            dist_sq = (
+                (point[0] - target[0]) ** 2 +
+                (point[1] - target[1]) ** 2 +
+                (point[2] - target[2]) ** 2
+            )
+
+            if len(best) < k:
+                heapq.heappush(best, (-dist_sq, entity_id))
+            elif dist_sq < -best[0][0]:
+                heapq.heapreplace(best, (-dist_sq, entity_id))
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+
+            # Only cross the splitting plane if it can still hold a closer point
+            if len(best) < k or diff * diff < -best[0][0]:
+                stack.append(far)
+            stack.append(near)
+
+        return sorted((-neg_dist, entity_id) for neg_dist, entity_id in best)
+
+
+# =============================================================================
+# ENTITY GEO INDEX
+# =============================================================================
+
+class EntityGeoIndex:
+    """
+    Per-department nearest-entity index over DepartmentEntity.location lat/lng
+    Keyed by department so the k nearest are always the department's own
+    entities. Trees are built on first use and marked stale by model signals
+    once the change has committed.
+    """
+
+    def __init__(self, max_age_seconds: int = INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._trees: Dict[str, KDTree] = {}
+        self._built_at: Dict[str, float] = {}
+        self._entity_department: Dict[str, str] = {}
+        self._location_department: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def nearest(self, department_id: str, lat: float, lng: float, k: int = 4) -> List[Tuple[str, float]]:
+        """
+        Find the k closest active entities of a department
+
+        Returns:
+            List of (entity_id, distance_km) sorted by distance
+        """
+        tree = self._get_tree(department_id)
+        matches = tree.nearest(_to_unit_vector(lat, lng), k)
+        return [(entity_id, _chord_to_km(math.sqrt(dist_sq))) for dist_sq, entity_id in matches]
+
+    def invalidate(self, department_id: Optional[str] = None) -> None:
+        """Mark one department (or every department) as stale"""
+        with self._lock:
+            if department_id is None:
+                self._trees.clear()
+                self._built_at.clear()
+            else:
+                self._trees.pop(department_id, None)
+                self._built_at.pop(department_id, None)
+
+    def invalidate_entity(self, entity_id: str, department_id: Optional[str] = None) -> None:
+        """Mark the department that holds (or now should hold) an entity as stale"""
+        known_department = self._entity_department.get(entity_id)
+        for stale in {known_department, department_id} - {None}:
+            self.invalidate(stale)
+
+    def invalidate_location(self, location_id: str) -> None:
+        """Mark the department of the entity placed at a location as stale"""
+        department_id = self._location_department.get(location_id)
+        if department_id is not None:
+            self.invalidate(department_id)
+
+    def _get_tree(self, department_id: str) -> KDTree:
+        tree = self._trees.get(department_id)
+        built_at = self._built_at.get(department_id, 0)
+        if tree is not None and time.monotonic() - built_at < self.max_age_seconds:
+            return tree
+
+        with self._lock:
+            tree = self._trees.get(department_id)
+            built_at = self._built_at.get(department_id, 0)
+            if tree is None or time.monotonic() - built_at >= self.max_age_seconds:
+                tree = self._build(department_id)
+                self._trees[department_id] = tree
+                self._built_at[department_id] = time.monotonic()
+            return tree
+
+    def _build(self, department_id: str) -> KDTree:
+        from apps.depts.models import DepartmentEntity
+
+        rows = DepartmentEntity.objects.filter(
+            department_id=department_id,
+            department__is_active=True,
+            is_active=True,
+            location__lat__isnull=False,
+            location__lng__isnull=False
+        ).values_list('id', 'location_id', 'location__lat', 'location__lng')
+
+        points = []
+        for entity_id, location_id, lat, lng in rows:
+            points.append((_to_unit_vector(float(lat), float(lng)), entity_id))
+            self._entity_department[entity_id] = department_id
+            self._location_department[location_id] = department_id
+
+        logger.info(f"Built geo index for department {department_id}: {len(points)} entities")
+        return KDTree(points)
+
+
+# =============================================================================
+# CITY COORDINATE INDEX
+# =============================================================================
+
+class CityCoordinateIndex:
+    """
+    Vectorized nearest-city lookup over City.latitude/longitude
+    Coordinates live in NumPy arrays (radians) cached for the whole process
+    """
+
+    # Upper bound on points x cities evaluated at once by nearest_many
+    MAX_BATCH_CELLS = 1_000_000
+
+    def __init__(self, max_age_seconds: int = INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._cities: Optional[list] = None
+        self._lat_rad: Optional[np.ndarray] = None
+        self._lng_rad: Optional[np.ndarray] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def nearest(self, lat: float, lng: float, max_distance_km: float = 100):
+        """Closest City within max_distance_km of a point, or None"""
+        return self.nearest_many([(lat, lng)], max_distance_km)[0]
+
+    def nearest_many(self, coordinates: Sequence[Tuple[float, float]], max_distance_km: float = 100) -> list:
+        """
+        Resolve many (lat, lng) pairs in one call
+
+        Returns:
+            List of City (or None when nothing is within range), in input order
+        """
+        cities, city_lat, city_lng = self._get_arrays()
+        if not len(coordinates):
+            return []
+        if not cities:
+            return [None] * len(coordinates)
+
+        points = np.radians(np.asarray(coordinates, dtype=float).reshape(-1, 2))
+        chunk_size = max(1, self.MAX_BATCH_CELLS // len(cities))
+        resolved = []
+
+        for start in range(0, len(points), chunk_size):
+            point_lat = points[start:start + chunk_size, 0][:, None]
+            point_lng = points[start:start + chunk_size, 1][:, None]
+
+            # Haversine "a" term for every point/city pair; argmin of a is argmin of distance
+            a = (np.sin((city_lat - point_lat) / 2) ** 2 +
+                 np.cos(point_lat) * np.cos(city_lat) * np.sin((city_lng - point_lng) / 2) ** 2)
+            closest = np.argmin(a, axis=1)
+            best_a = np.clip(a[np.arange(len(closest)), closest], 0.0, 1.0)
+            distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(best_a))
+
+            for city_index, distance in zip(closest, distances):
+                resolved.append(cities[city_index] if distance <= max_distance_km else None)
+
+        return resolved
+
+    def invalidate(self) -> None:
+        """Drop the cached arrays; the next lookup reloads cities"""
+        with self._lock:
+            self._cities = None
+
+    def _get_arrays(self):
+        with self._lock:
+            if self._cities is None or time.monotonic() - self._built_at >= self.max_age_seconds:
+                self._build()
+            return self._cities, self._lat_rad, self._lng_rad
+
+    def _build(self) -> None:
+        from apps.depts.models import City
+
+        cities = list(City.objects.filter(latitude__isnull=False, longitude__isnull=False))
+        coords = np.array(
+            [(float(city.latitude), float(city.longitude)) for city in cities], dtype=float
+        ).reshape(-1, 2)
+
+        self._cities = cities
+        self._lat_rad = np.radians(coords[:, 0])[None, :]
+        self._lng_rad = np.radians(coords[:, 1])[None, :]
+        self._built_at = time.monotonic()
+        logger.info(f"Built city coordinate index: {len(cities)} cities")
+
+
+# Process-wide instances used by MatcherService and the depts signals
+ENTITY_GEO_INDEX = EntityGeoIndex()
+CITY_COORDINATE_INDEX = CityCoordinateIndex()
@@ -0,0 +1,106 @@
+"""
+Import Benchmark - Cold-start cost of web and Celery processes
+Every sample runs in a fresh interpreter, the way a gunicorn or Celery worker
+boots: django.setup(), then the modules that process type loads before serving
+its first request. Reports wall time, module count and which heavy SDKs got
+imported, so an eager import creeping back in shows up as a regression.
+Run it through: python manage.py benchmark_imports
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+# What each process type imports on boot, after django.setup()
+IMPORT_PROFILES = {
+    "web": ["config.wsgi", "config.urls"],
+    "worker": ["config.celery", "apps.depts.tasks", "apps.hiring.tasks", "apps.jobs.tasks"],
+    "pipeline": ["apps.depts.services.simplified_emergency_pipeline"],
+}
+
+# SDKs that should only load when a request actually needs them
+HEAVY_PACKAGES = ("agno", "openai", "vapi", "twilio", "pdfplumber", "googlemaps")
+
+# Runs inside the fresh interpreter: argv[1] is a JSON list of modules
+PROBE_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+for module in json.loads(sys.argv[1]):
+    importlib.import_module(module)
+finished = time.perf_counter()
+print(json.dumps({
+    "setup_ms": (setup_done - started) * 1000,
+    "import_ms": (finished - setup_done) * 1000,
+    "modules": len(sys.modules),
+    "heavy_packages": sorted({name.split(".")[0] for name in sys.modules} & set(json.loads(sys.argv[2]))),
+}))
+"""
+
+
+class ImportBenchmark:
+    """Median cold-start timings per profile over several fresh interpreters"""
+
+    def __init__(self, repeat: int = 5, settings_module: Optional[str] = None):
+        self.repeat = max(1, repeat)
+        self.settings_module = settings_module or os.environ.get("DJANGO_SETTINGS_MODULE")
+
+    def probe(self, modules: List[str], importtime: bool = False) -> Dict[str, Any]:
+        """One fresh interpreter; with importtime, also the -X importtime log"""
+        command = [sys.executable]
+        if importtime:
+            command += ["-X", "importtime"]
+        command += ["-c", PROBE_SCRIPT, json.dumps(modules), json.dumps(HEAVY_PACKAGES)]
+
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=self.settings_module)
+        completed = subprocess.run(
+            command, cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Import probe failed for {modules}: {completed.stderr.strip()[-500:]}")
+
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        if importtime:
+            sample["importtime"] = completed.stderr
+        return sample
+
+    def run(self, profiles: List[str]) -> Dict[str, Any]:
+        """Report with one entry per profile"""
+        results = {}
+        for profile in profiles:
+            samples = [self.probe(IMPORT_PROFILES[profile]) for _ in range(self.repeat)]
+            setup_ms = statistics.median(sample["setup_ms"] for sample in samples)
+            import_ms = statistics.median(sample["import_ms"] for sample in samples)
+            results[profile] = {
+                "modules": IMPORT_PROFILES[profile],
+                "setup_ms": round(setup_ms, 1),
+                "import_ms": round(import_ms, 1),
+                "total_ms": round(setup_ms + import_ms, 1),
+                "loaded_modules": samples[-1]["modules"],
+                "heavy_packages": samples[-1]["heavy_packages"],
+            }
+
+        return {
+            "environment": {"python": sys.version.split()[0], "settings": self.settings_module},
+            "repeat": self.repeat,
+            "profiles": results,
+        }
+
+    def slowest_imports(self, profile: str, limit: int = 15) -> List[Dict[str, Any]]:
+        """Top-level packages by cumulative -X importtime microseconds"""
+        log = self.probe(IMPORT_PROFILES[profile], importtime=True)["importtime"]
+        totals = []
+        for line in log.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|", 2)
+            # Only modules imported directly by the probe - nested ones are already counted
+            if cumulative.strip().isdigit() and not name.startswith("  "):
+                totals.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+        return sorted(totals, key=lambda item: item["cumulative_ms"], reverse=True)[:limit]
@@ -0,0 +1,114 @@
+"""
+Matcher Candidates - Precomputed ranked entities per (department category, city)
+Mirrors MatcherService's city-match ranking (primary + same-city alternatives,
+then other-city fallbacks) in MatcherCandidate rows, rebuilt per category when
+departments or entities change. Rows hold ids only - names, phones and addresses
+are read from the department directory, so renames need no rebuild
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+
+from apps.depts.choices import DepartmentCategory
+from apps.depts.models import Department, DepartmentEntity, MatcherCandidate
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
+
+logger = logging.getLogger(__name__)
+
+# Primary + fallbacks kept per (category, city) - MatcherService returns at most 1 + 3
+CANDIDATES_PER_CITY = 4
+# Same-city entities kept before other-city fallbacks fill the rest
+SAME_CITY_CANDIDATES = 3
+
+DEFAULT_PHONE = "+92-300-0000000"
+
+
+class MatcherCandidateIndex:
+    """Builds MatcherCandidate rows - DEPARTMENT_DIRECTORY serves them to the matcher"""
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    def rebuild(self, categories: Optional[Iterable[str]] = None) -> int:
+        """
+        Recompute the candidate rows of some (or all) categories
+
+        Returns:
+            Number of rows written
+        """
+        categories = list(categories) if categories is not None else list(DepartmentCategory.values)
+        written = 0
+        with transaction.atomic():
+            for category in categories:
+                written += self._rebuild_category(category)
+
+        # Workers hold the rows in their directory snapshot
+        DEPARTMENT_DIRECTORY.bump_version()
+
+        logger.info(f"🗂️ Rebuilt matcher candidates for {', '.join(categories) or 'no categories'}: {written} rows")
+        return written
+
+    def rebuild_on_commit(self, categories: Iterable[str]) -> None:
+        """Rebuild after the surrounding transaction commits (used by signals)"""
+        categories = sorted(set(categories) - {None, ""})
+        if categories:
+            transaction.on_commit(lambda: self._safe_rebuild(categories))
+
+    def categories_for_entities(self, **entity_filters) -> List[str]:
+        """Categories whose rows mention matching entities, e.g. location_id=..."""
+        return list(
+            MatcherCandidate.objects.filter(
+                **{f'entity__{field}': value for field, value in entity_filters.items()}
+            ).values_list('category', flat=True).distinct()
+        )
+
+    def _safe_rebuild(self, categories: List[str]) -> None:
+        # A failed rebuild leaves the old rows; the matcher still works off them
+        try:
+            self.rebuild(categories)
+        except Exception as e:
+            logger.warning(f"Failed to rebuild matcher candidates for {categories}: {e}")
+
+    def _rebuild_category(self, category: str) -> int:
+        MatcherCandidate.objects.filter(category=category).delete()
+
+        # Same department choice as MatcherService: first active one for the category
+        department = Department.objects.filter(category=category, is_active=True).order_by('pk').first()
+        if not department:
+            return 0
+
+        entities = list(
+            DepartmentEntity.objects.filter(department=department, is_active=True).order_by('pk')
+        )
+
+        by_city = {}
+        for entity in entities:
+            by_city.setdefault(entity.city_id, []).append(entity)
+
+        rows = []
+        for city_id, city_entities in by_city.items():
+            ranked = city_entities[:SAME_CITY_CANDIDATES]
+            ranked += [
+                entity for entity in entities if entity.city_id != city_id
+            ][:CANDIDATES_PER_CITY - len(ranked)]
+
+            for rank, entity in enumerate(ranked):
+                row = MatcherCandidate(
+                    category=category,
+                    city_id=city_id,
+                    rank=rank,
+                    entity=entity,
+                    same_city=entity.city_id == city_id
+                )
+                # bulk_create skips save(), so ids are assigned here
+                row.id = row.generate_custom_id()
+                rows.append(row)
+
+        MatcherCandidate.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+# Process-wide instance used by MatcherService and the depts signals
+MATCHER_CANDIDATES = MatcherCandidateIndex()
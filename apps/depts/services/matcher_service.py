@@ -2,18 +2,12 @@
 Matcher Service - Find best department entity
 Simple, effective, city-based matching with distance fallback
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from apps.depts.models import Department, DepartmentEntity, City
+from typing import Optional, List, Tuple
+from apps.depts.models import City
+from apps.depts.services.geo_index import ENTITY_GEO_INDEX, CITY_COORDINATE_INDEX
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY, DepartmentRecord, EntityRecord
+from apps.depts.services.matcher_candidates import CANDIDATES_PER_CITY, DEFAULT_PHONE, SAME_CITY_CANDIDATES
 import math
 
 # =============================================================================
@@ -42,6 +36,7 @@ class MatcherOutput(BaseModel):
     success: bool
     matched_entity: Optional[EntityInfo] = None
     fallback_entities: List[EntityInfo] = []
+    department_id: Optional[str] = None  # Department the entities were matched from
     match_strategy: str
     error_message: Optional[str] = None
 
@@ -79,34 +74,22 @@ class MatcherService:
         In production, this would use Google Maps Geocoding API
         """
         try:
-            from apps.depts.models import City
-
-            # Find closest city by calculating distance to all cities with coordinates
-            cities_with_coords = City.objects.filter(
-                latitude__isnull=False,
-                longitude__isnull=False
-            )
-
-            closest_city = None
-            min_distance = float('inf')
-
-            for city in cities_with_coords:
-                distance = MatcherService.calculate_distance(
-                    lat, lng,
-                    float(city.latitude), float(city.longitude)
-                )
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_city = city
-
-            # Return city if within reasonable distance (100km)
-            if closest_city and min_distance <= 100:
-                return closest_city
-
-            return None
+            # Closest city within reasonable distance (100km), from the cached coordinate array
+            return CITY_COORDINATE_INDEX.nearest(lat, lng, max_distance_km=100)
         except Exception:
             return None
 
+    @staticmethod
+    def resolve_cities_from_coordinates(coordinates: List[Tuple[float, float]]) -> List[Optional['City']]:
+        """
+        Batch version of resolve_city_from_coordinates for backfills and replays
+        Resolves every (lat, lng) pair in a single vectorized pass
+        """
+        try:
+            return CITY_COORDINATE_INDEX.nearest_many(coordinates, max_distance_km=100)
+        except Exception:
+            return [None] * len(coordinates)
+
     @staticmethod
     def find_city_by_name(city_name: str) -> Optional['City']:
         """Find city by name with multiple matching strategies"""
@@ -139,15 +122,40 @@ class MatcherService:
         except Exception:
             return None
 
+    @staticmethod
+    def _entity_info(entity: EntityRecord, department: DepartmentRecord, match_reason: str,
+                     distance_km: Optional[float] = None) -> EntityInfo:
+        return EntityInfo(
+            id=entity.id,
+            name=entity.name,
+            phone=entity.phone or department.main_phone or DEFAULT_PHONE,
+            city=entity.city_name,
+            address=entity.address,
+            distance_km=distance_km,
+            match_reason=match_reason
+        )
+
+    @staticmethod
+    def resolve_target_city(input_data: MatcherInput):
+        """City named by the user, else the city around their coordinates (no DB access)"""
+        if input_data.user_city:
+            return DEPARTMENT_DIRECTORY.city_by_name(input_data.user_city)
+
+        if input_data.user_location and 'lat' in input_data.user_location and 'lng' in input_data.user_location:
+            return MatcherService.resolve_city_from_coordinates(
+                float(input_data.user_location['lat']), float(input_data.user_location['lng'])
+            )
+        return None
+
     @staticmethod
     def find_best_entity(input_data: MatcherInput) -> MatcherOutput:
-        """Find the best department entity based on input criteria"""
+        """
+        Find the best department entity based on input criteria
+        Reads only the in-process DEPARTMENT_DIRECTORY and geo indexes
+        """
         try:
             # Get department
-            department = Department.objects.filter(
-                category=input_data.department_category,
-                is_active=True
-            ).first()
+            department = DEPARTMENT_DIRECTORY.department_for_category(input_data.department_category)
 
             if not department:
                 return MatcherOutput(
@@ -157,78 +165,45 @@ class MatcherService:
                 )
 
             # Get all active entities for this department
-            entities = DepartmentEntity.objects.filter(
-                department=department,
-                is_active=True
-            ).select_related('city', 'location')
+            entities = DEPARTMENT_DIRECTORY.entities_for_department(department.id)
 
-            if not entities.exists():
+            if not entities:
                 return MatcherOutput(
                     success=False,
+                    department_id=department.id,
                     match_strategy="no_entities",
                     error_message=f"No active entities found for department: {department.name}"
                 )
 
-            # STRATEGY 1: Strict city matching using ForeignKey (first priority)
-            target_city = None
-
-            # If user provides city name, resolve it to City object
-            if input_data.user_city:
-                target_city = MatcherService.find_city_by_name(input_data.user_city)
-
-            # If user provides coordinates but no city name, resolve city from coordinates
-            elif input_data.user_location and 'lat' in input_data.user_location and 'lng' in input_data.user_location:
-                user_lat = float(input_data.user_location['lat'])
-                user_lng = float(input_data.user_location['lng'])
-                target_city = MatcherService.resolve_city_from_coordinates(user_lat, user_lng)
+            # STRATEGY 1: Strict city matching (first priority)
+            target_city = MatcherService.resolve_target_city(input_data)
 
-            # If we have a target city, find entities in that exact city
             if target_city:
-                city_entities = entities.filter(city=target_city)
-
-                if city_entities.exists():
-                    best_entity = city_entities.first()
-                    entity_info = EntityInfo(
-                        id=best_entity.id,
-                        name=best_entity.name,
-                        phone=best_entity.phone or department.main_phone or "+92-300-0000000",
-                        city=best_entity.city.name,
-                        address=getattr(best_entity.location, 'formatted_address', '') if best_entity.location else '',
-                        match_reason=f"Exact city match: {target_city.name}"
-                    )
-
-                    # Get fallback entities from SAME city first, then other cities
-                    fallback_entities = []
-
-                    # First, add other entities from same city
-                    same_city_alternatives = city_entities.exclude(id=best_entity.id)[:2]
-                    for entity in same_city_alternatives:
-                        fallback_entities.append(EntityInfo(
-                            id=entity.id,
-                            name=entity.name,
-                            phone=entity.phone or department.main_phone or "+92-300-0000000",
-                            city=entity.city.name,
-                            address=getattr(entity.location, 'formatted_address', '') if entity.location else '',
-                            match_reason=f"Alternative in {entity.city.name}"
-                        ))
-
-                    # Then add entities from other cities if needed
-                    if len(fallback_entities) < 3:
-                        other_city_entities = entities.exclude(city=target_city)[:3-len(fallback_entities)]
-                        for entity in other_city_entities:
-                            fallback_entities.append(EntityInfo(
-                                id=entity.id,
-                                name=entity.name,
-                                phone=entity.phone or department.main_phone or "+92-300-0000000",
-                                city=entity.city.name,
-                                address=getattr(entity.location, 'formatted_address', '') if entity.location else '',
-                                match_reason=f"Fallback in {entity.city.name}"
-                            ))
-
+                # Precomputed ranking (MatcherCandidate), else rank the directory's entities here
+                ranked = DEPARTMENT_DIRECTORY.candidates(input_data.department_category, target_city.id)
+                if not ranked:
+                    city_entities = [entity for entity in entities if entity.city_id == target_city.id]
+                    if city_entities:
+                        other_city_entities = [entity for entity in entities if entity.city_id != target_city.id]
+                        ranked = [(entity, True) for entity in city_entities[:SAME_CITY_CANDIDATES]]
+                        ranked += [(entity, False) for entity in other_city_entities[:CANDIDATES_PER_CITY - len(ranked)]]
+
+                if ranked:
+                    best_entity, _ = ranked[0]
                     return MatcherOutput(
                         success=True,
-                        matched_entity=entity_info,
-                        fallback_entities=fallback_entities,
+                        matched_entity=MatcherService._entity_info(
+                            best_entity, department, f"Exact city match: {target_city.name}"
+                        ),
+                        # Other entities from the same city first, then other cities
+                        fallback_entities=[
+                            MatcherService._entity_info(
+                                entity, department,
+                                f"Alternative in {entity.city_name}" if same_city else f"Fallback in {entity.city_name}"
+                            )
+                            for entity, same_city in ranked[1:]
+                        ],
+                        department_id=department.id,
                         match_strategy="city_match"
                     )
 
@@ -237,78 +212,60 @@ class MatcherService:
                 user_lat = float(input_data.user_location['lat'])
                 user_lng = float(input_data.user_location['lng'])
 
-                entities_with_distance = []
-
-                for entity in entities:
-                    if entity.location and entity.location.lat and entity.location.lng:
-                        distance = MatcherService.calculate_distance(
-                            user_lat, user_lng,
-                            float(entity.location.lat), float(entity.location.lng)
-                        )
-                        entities_with_distance.append((entity, distance))
+                # The department's closest entities come pre-sorted from the in-memory geo index
+                nearest = ENTITY_GEO_INDEX.nearest(department.id, user_lat, user_lng, k=4)
+                entities_with_distance = [
+                    (DEPARTMENT_DIRECTORY.entity(entity_id), distance)
+                    for entity_id, distance in nearest
+                ]
+                entities_with_distance = [
+                    (entity, distance) for entity, distance in entities_with_distance if entity
+                ]
 
                 if entities_with_distance:
-                    # Sort by distance
-                    entities_with_distance.sort(key=lambda x: x[1])
                     best_entity, best_distance = entities_with_distance[0]
 
-                    entity_info = EntityInfo(
-                        id=best_entity.id,
-                        name=best_entity.name,
-                        phone=best_entity.phone or department.main_phone or "+92-300-0000000",
-                        city=best_entity.city.name,
-                        address=getattr(best_entity.location, 'formatted_address', '') if best_entity.location else '',
-                        distance_km=round(best_distance, 2),
-                        match_reason=f"Closest entity: {round(best_distance, 2)} km away"
+                    entity_info = MatcherService._entity_info(
+                        best_entity, department,
+                        f"Closest entity: {round(best_distance, 2)} km away",
+                        distance_km=round(best_distance, 2)
                     )
 
                     # Get next closest as fallbacks
-                    fallback_entities = []
-                    for entity, distance in entities_with_distance[1:4]:
-                        fallback_entities.append(EntityInfo(
-                            id=entity.id,
-                            name=entity.name,
-                            phone=entity.phone or department.main_phone or "+92-300-0000000",
-                            city=entity.city.name,
-                            address=getattr(entity.location, 'formatted_address', '') if entity.location else '',
-                            distance_km=round(distance, 2),
-                            match_reason=f"Alternative: {round(distance, 2)} km away"
-                        ))
+                    fallback_entities = [
+                        MatcherService._entity_info(
+                            entity, department,
+                            f"Alternative: {round(distance, 2)} km away",
+                            distance_km=round(distance, 2)
+                        )
+                        for entity, distance in entities_with_distance[1:4]
+                    ]
 
                     return MatcherOutput(
                         success=True,
                         matched_entity=entity_info,
                         fallback_entities=fallback_entities,
+                        department_id=department.id,
                         match_strategy="distance_match"
                     )
 
             # STRATEGY 3: Default fallback - first available entity
-            first_entity = entities.first()
-            entity_info = EntityInfo(
-                id=first_entity.id,
-                name=first_entity.name,
-                phone=first_entity.phone or department.main_phone or "+92-300-0000000",
-                city=first_entity.city.name,
-                address=getattr(first_entity.location, 'formatted_address', '') if first_entity.location else '',
-                match_reason="Default fallback - first available entity"
+            first_entity = entities[0]
+            entity_info = MatcherService._entity_info(
+                first_entity, department, "Default fallback - first available entity"
             )
 
             # Get other entities as fallbacks
-            fallback_entities = []
-            for entity in entities.exclude(id=first_entity.id)[:3]:
-                fallback_entities.append(EntityInfo(
-                    id=entity.id,
-                    name=entity.name,
-                    phone=entity.phone or department.main_phone or "+92-300-0000000",
-                    city=entity.city.name,
-                    address=getattr(entity.location, 'formatted_address', '') if entity.location else '',
-                    match_reason="Alternative option"
-                ))
+            fallback_entities = [
+                MatcherService._entity_info(entity, department, "Alternative option")
+                for entity in entities[1:4]
+            ]
 
             return MatcherOutput(
                 success=True,
                 matched_entity=entity_info,
                 fallback_entities=fallback_entities,
+                department_id=department.id,
                 match_strategy="default_fallback"
             )
 
@@ -0,0 +1,397 @@
+"""
+Pipeline Benchmark - Repeatable end-to-end runs of SimplifiedEmergencyPipeline
+The LLM agents (router, department specialists) and the providers (Twilio, SMTP,
+VAPI) are swapped for deterministic local stubs that sleep for a configurable
+latency, so the numbers measure our own code - DB work, stage scheduling, dispatch
+ledger, audit writes - and are comparable between releases.
+Run it through: python manage.py benchmark_pipeline
+"""
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from unittest import mock
+
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.utils import timezone
+
+from apps.depts.choices import DepartmentCategory, UrgencyLevel
+from apps.depts.models import CitizenRequest, City
+from apps.depts.services.service_registry import SERVICE_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Stage names reported by StageGraph, in pipeline order
+BENCHMARK_STAGES = ["router", "matcher", "department", "trigger", "actions", "next_steps"]
+PERCENTILES = [50, 95, 99]
+
+# Categories the router may return that have fake-data templates
+BENCHMARK_CATEGORIES = [DepartmentCategory.POLICE, DepartmentCategory.FIRE_BRIGADE, DepartmentCategory.AMBULANCE]
+CRITICALITY_CYCLE = [UrgencyLevel.CRITICAL, UrgencyLevel.HIGH, UrgencyLevel.MEDIUM, UrgencyLevel.LOW]
+
+BENCHMARK_USER_EMAIL = "benchmark@pipeline.local"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, 0 for no values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(pct / 100.0 * len(ordered))))
+    return float(ordered[rank - 1])
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    summary = {f"p{pct}": round(percentile(values, pct), 2) for pct in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values), 2) if values else 0.0
+    summary["count"] = len(values)
+    return summary
+
+
+# =============================================================================
+# STUBS
+# =============================================================================
+
+class StubLatency:
+    """Sleeps mean ± jitter milliseconds, drawn from a seeded generator"""
+
+    def __init__(self, mean_ms: float, jitter_ms: float = 0.0, seed: int = 0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self) -> None:
+        delay_ms = self._draw_ms()
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+    async def sleep_async(self) -> None:
+        delay_ms = self._draw_ms()
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+    def _draw_ms(self) -> float:
+        with self._lock:
+            return self.mean_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+
+
+class StubRunResponse:
+    """Looks like agno's RunResponse - the services only read .content"""
+
+    def __init__(self, content):
+        self.content = content
+
+
+class StubRouterAgent:
+    """Router agent stand-in - returns the category the request was generated for"""
+
+    def __init__(self, latency: StubLatency, categories: Dict[str, str]):
+        self.latency = latency
+        self.categories = categories
+
+    def run(self, input=None, session_id=None, user_id=None, **kwargs):
+        from apps.depts.agents.router_agent.pydantic_models import RouterDecision
+
+        self.latency.sleep()
+        department = self.categories.get(input.request_text, DepartmentCategory.POLICE)
+        return StubRunResponse(RouterDecision(
+            department=department,
+            confidence=0.9,
+            urgency_indicators=[],
+            reason="Benchmark stub classification",
+            keywords_detected=[],
+            classification_source="llm"
+        ))
+
+
+class StubDepartmentAgent:
+    """Specialist agent stand-in - criticality is a stable function of the request text"""
+
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+
+    def run(self, input=None, **kwargs):
+        from apps.depts.agents.department_orchestrator_agent.pydantic_models import (
+            ActionPlan, ActionStep, DepartmentOrchestratorOutput, RequestPlan
+        )
+
+        self.latency.sleep()
+        criticality = CRITICALITY_CYCLE[zlib.crc32(input.original_request.encode("utf-8")) % len(CRITICALITY_CYCLE)]
+        return StubRunResponse(DepartmentOrchestratorOutput(
+            criticality=criticality,
+            action_plan=ActionPlan(
+                immediate_actions=[ActionStep(
+                    step_number=1, action="Dispatch nearest unit", timeline="0-10 minutes", responsible_party="Department"
+                )],
+                follow_up_actions=[ActionStep(
+                    step_number=1, action="Follow up with citizen", timeline="1 hour", responsible_party="Department"
+                )],
+                estimated_resolution_time="1 hour"
+            ),
+            request_plan=RequestPlan(
+                incident_summary=input.original_request[:120],
+                location_details=f"User City: {input.user_city or 'Not provided'}",
+                additional_context="Benchmark request",
+                required_response="Send the nearest unit and keep the citizen informed"
+            ),
+            rationale="Benchmark stub plan"
+        ))
+
+
+class StubChannelService:
+    """Stands in for the email, SMS and voice action services"""
+
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def _send(self, action) -> Dict[str, Any]:
+        self.latency.sleep()
+        return self._sent(action)
+
+    async def _send_async(self, action) -> Dict[str, Any]:
+        await self.latency.sleep_async()
+        return self._sent(action)
+
+    def _sent(self, action) -> Dict[str, Any]:
+        with self._lock:
+            self.sent += 1
+        return {
+            "success": True,
+            "status": "sent",
+            "action_type": action.action_type.value,
+            "recipient": getattr(action, "recipient_email", None) or getattr(action, "recipient_phone", None),
+        }
+
+    # Email is sync like the SMTP service (run on worker threads); SMS and voice are awaitables
+    execute_email_action = _send
+    execute_sms_action = _send
+    execute_sms_action_async = _send_async
+    execute_voice_action = _send
+    execute_voice_action_async = _send_async
+
+
+class StubCallAgent:
+    """VAPI EmergencyCallAgent stand-in used by the pipeline's trigger stage"""
+
+    def __init__(self, latency: Optional[StubLatency] = None):
+        self.latency = latency
+
+    def make_emergency_call(self, phone_number: str, call_reason: str, additional_context: dict = None):
+        if self.latency:
+            self.latency.sleep()
+        return {"success": True, "call_id": f"bench-{zlib.crc32(call_reason.encode('utf-8'))}"}
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+class QueryCounter:
+    """Counts SQL statements from every thread's connection while installed"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def installed(self) -> Iterator["QueryCounter"]:
+        counter = self
+        original_execute, original_executemany = CursorWrapper.execute, CursorWrapper.executemany
+
+        def execute(cursor, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return original_execute(cursor, *args, **kwargs)
+
+        def executemany(cursor, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return original_executemany(cursor, *args, **kwargs)
+
+        with mock.patch.object(CursorWrapper, "execute", execute), \
+                mock.patch.object(CursorWrapper, "executemany", executemany):
+            yield self
+
+
+# =============================================================================
+# WORKLOAD
+# =============================================================================
+
+def synthetic_requests(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Requests built from generate_fake_data's templates and the cities in the database"""
+    from apps.depts.management.commands.generate_fake_data import REQUEST_TEMPLATES
+
+    rng = random.Random(seed)
+    city_names = list(City.objects.order_by("name").values_list("name", flat=True)) or ["Karachi"]
+    templates = [
+        (category, template)
+        for category in BENCHMARK_CATEGORIES
+        for template in REQUEST_TEMPLATES.get(category.value, [])
+    ]
+
+    requests = []
+    for _ in range(count):
+        category, template = rng.choice(templates)
+        city_name = rng.choice(city_names)
+        requests.append({
+            "request_text": template.format(location=f"Block {rng.randint(1, 20)}, {city_name}"),
+            "user_city": city_name,
+            "category": category.value,
+        })
+    return requests
+
+
+def load_recorded_requests(path: str) -> List[Dict[str, Any]]:
+    """JSON lines with request_text and optional user_city, user_coordinates, category"""
+    requests = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                requests.append(json.loads(line))
+    return requests
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+class PipelineBenchmark:
+    """
+    Runs the pipeline over a workload with stubbed agents and providers
+
+    Stage durations come from PipelineResult.stage_durations_ms; query counts
+    cover every thread (stage pool and action workers included).
+    """
+
+    def __init__(self, llm_latency_ms: float = 800, provider_latency_ms: float = 150,
+                 jitter_ms: float = 0, concurrency: int = 1, seed: int = 0):
+        self.llm_latency_ms = llm_latency_ms
+        self.provider_latency_ms = provider_latency_ms
+        self.jitter_ms = jitter_ms
+        self.concurrency = max(1, concurrency)
+        self.seed = seed
+
+    @contextmanager
+    def stubbed_pipeline(self, requests: List[Dict[str, Any]]):
+        """A SimplifiedEmergencyPipeline wired to the local stubs"""
+        from apps.depts.agents.department_orchestrator_agent import service as department_service
+        from apps.depts.services import simplified_emergency_pipeline as pipeline_module
+
+        llm_latency = StubLatency(self.llm_latency_ms, self.jitter_ms, self.seed)
+        provider_latency = StubLatency(self.provider_latency_ms, self.jitter_ms, self.seed + 1)
+        categories = {request["request_text"]: request.get("category") for request in requests if request.get("category")}
+
+        pipeline = pipeline_module.SimplifiedEmergencyPipeline()
+        channel_service = StubChannelService(provider_latency)
+        department_agent = StubDepartmentAgent(llm_latency)
+
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.object(
+                pipeline.router_service, "router_agent", StubRouterAgent(llm_latency, categories)
+            ))
+            stack.enter_context(mock.patch.object(
+                department_service, "get_specialized_agent", lambda category: department_agent
+            ))
+            stack.enter_context(SERVICE_REGISTRY.override("vapi_call_agent", StubCallAgent(provider_latency)))
+            for attribute in ("email_service", "sms_service", "voice_service"):
+                stack.enter_context(mock.patch.object(pipeline.action_executor, attribute, channel_service))
+            yield pipeline
+
+    def run(self, requests: List[Dict[str, Any]], keep_requests: bool = False) -> Dict[str, Any]:
+        """Process every request and return the machine-readable report"""
+        from apps.authentication.models import CustomUser
+        from apps.depts.services.simplified_emergency_pipeline import EmergencyRequest
+
+        user, _ = CustomUser.objects.get_or_create(
+            email=BENCHMARK_USER_EMAIL, defaults={"first_name": "Benchmark", "last_name": "User"}
+        )
+        counter = QueryCounter()
+        results = []
+
+        def process(index_and_request):
+            index, request = index_and_request
+            try:
+                result = pipeline.process_emergency_request(EmergencyRequest(
+                    request_text=request["request_text"],
+                    user_city=request.get("user_city"),
+                    user_coordinates=request.get("user_coordinates"),
+                    user_id=user.id,
+                    user_name="Benchmark User",
+                    stream_id=f"bench-{run_id}-{index}"
+                ))
+                return result
+            finally:
+                # Worker threads are not request threads - nothing else closes their connection
+                if self.concurrency > 1:
+                    connection.close()
+
+        run_id = int(time.time())
+        with self.stubbed_pipeline(requests) as pipeline, counter.installed():
+            started = time.perf_counter()
+            if self.concurrency == 1:
+                results = [process(item) for item in enumerate(requests)]
+            else:
+                with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="benchmark") as pool:
+                    results = list(pool.map(process, enumerate(requests)))
+            elapsed = time.perf_counter() - started
+
+        report = self._report(results, elapsed, counter.count)
+        logger.info(
+            f"⏱️ Benchmarked {len(results)} requests in {elapsed:.1f}s "
+            f"({report['succeeded']} succeeded, {counter.count} queries)"
+        )
+
+        if not keep_requests:
+            case_codes = [result.case_code for result in results if result.case_code]
+            CitizenRequest.objects.filter(case_code__in=case_codes).delete()
+
+        return report
+
+    def _report(self, results, elapsed_seconds: float, query_count: int) -> Dict[str, Any]:
+        succeeded = [result for result in results if result.success]
+        stages = {
+            stage: summarize([
+                result.stage_durations_ms[stage] for result in succeeded if stage in result.stage_durations_ms
+            ])
+            for stage in BENCHMARK_STAGES
+        }
+        stages["total"] = summarize([result.total_duration_ms for result in succeeded])
+
+        return {
+            "generated_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "database": connection.vendor,
+            },
+            "config": {
+                "requests": len(results),
+                "concurrency": self.concurrency,
+                "llm_latency_ms": self.llm_latency_ms,
+                "provider_latency_ms": self.provider_latency_ms,
+                "jitter_ms": self.jitter_ms,
+                "seed": self.seed,
+            },
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "errors": sorted({result.error_message for result in results if result.error_message})[:10],
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "throughput_per_second": round(len(results) / elapsed_seconds, 3) if elapsed_seconds else 0.0,
+            "db_queries": {
+                "total": query_count,
+                "per_request": round(query_count / len(results), 1) if results else 0.0,
+            },
+            "stages_ms": stages,
+        }
@@ -0,0 +1,75 @@
+"""
+Pipeline Events - Publishes emergency pipeline progress over Redis
+Every event is appended to a per-stream list (for replay after a page refresh)
+and published on a per-stream channel (for live subscribers)
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from apps.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# How long a finished stream can still be replayed
+EVENT_TTL_SECONDS = 3600
+
+# Event names, in the order a successful request emits them
+EVENT_RECEIVED = "received"
+EVENT_ROUTER_CLASSIFIED = "router_classified"
+EVENT_ENTITY_MATCHED = "entity_matched"
+EVENT_PLAN_GENERATED = "plan_generated"
+EVENT_ACTIONS_PLANNED = "actions_planned"
+EVENT_ACTIONS_EXECUTED = "actions_executed"
+EVENT_NEXT_STEPS_READY = "next_steps_ready"
+EVENT_COMPLETED = "completed"
+EVENT_FAILED = "failed"
+# Published instead of EVENT_FAILED when the task will retry - not terminal
+EVENT_RETRYING = "retrying"
+
+TERMINAL_EVENTS = {EVENT_COMPLETED, EVENT_FAILED}
+
+
+def events_key(stream_id: str) -> str:
+    return f"pipeline:events:{stream_id}"
+
+
+def events_channel(stream_id: str) -> str:
+    return f"pipeline:channel:{stream_id}"
+
+
+class PipelineEventPublisher:
+    """
+    Publishes progress events for one pipeline run
+    A publisher without stream_id, or without Redis configured, is a no-op
+    """
+
+    def __init__(self, stream_id: Optional[str] = None):
+        self.stream_id = stream_id
+        self.client = get_redis_client() if stream_id else None
+
+    def publish(self, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Record and broadcast an event - never raises into the pipeline"""
+        if not self.client:
+            return
+
+        payload = {"event": event, "data": data or {}, "ts": time.time()}
+        try:
+            key = events_key(self.stream_id)
+            # List length after the push doubles as the event sequence number
+            seq = self.client.rpush(key, json.dumps(payload, default=str))
+            self.client.expire(key, EVENT_TTL_SECONDS)
+            self.client.publish(events_channel(self.stream_id), json.dumps({**payload, "seq": seq}, default=str))
+        except Exception as e:
+            logger.warning(f"Failed to publish pipeline event {event} for {self.stream_id}: {e}")
+
+
+def read_events(stream_id: str) -> List[Dict[str, Any]]:
+    """All events published so far for a stream, each with its seq number"""
+    client = get_redis_client()
+    if not client:
+        return []
+
+    raw_events = client.lrange(events_key(stream_id), 0, -1)
+    return [{**json.loads(raw), "seq": index + 1} for index, raw in enumerate(raw_events)]
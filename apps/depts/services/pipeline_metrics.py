@@ -0,0 +1,306 @@
+"""
+Pipeline Metrics - Per-stage wall time, DB queries, LLM tokens and provider calls
+Each pipeline stage runs under a StageRecorder held in a context variable, so the
+DB execute wrapper, the agent services and the dispatch ledger can attribute their
+work to the stage without threading it through every call. Finished stages are
+folded into process-independent counters (a Redis hash, or local memory without
+Redis) and served in the Prometheus text format by the core metrics view.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from apps.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "metrics:pipeline"
+
+# Histogram upper bounds in seconds
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROVIDER_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Stage the current thread (or task) is working for, if any
+CURRENT_STAGE: contextvars.ContextVar[Optional["StageRecorder"]] = contextvars.ContextVar(
+    "pipeline_stage", default=None
+)
+
+
+# =============================================================================
+# PER-RUN RECORDING
+# =============================================================================
+
+class StageRecorder:
+    """Counters for one stage of one pipeline run"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.wall_ms = 0
+        self.success = True
+        self.db_queries = 0
+        self.llm_calls = 0
+        self.llm_tokens = 0
+        self.provider_calls = 0
+        self.provider_errors = 0
+        self.provider_ms = 0
+        self._lock = threading.Lock()
+
+    def add(self, **increments) -> None:
+        # Action workers report provider calls for the same stage concurrently
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_ms": self.wall_ms,
+            "success": self.success,
+            "db_queries": self.db_queries,
+            "llm_calls": self.llm_calls,
+            "llm_tokens": self.llm_tokens,
+            "provider_calls": self.provider_calls,
+            "provider_errors": self.provider_errors,
+            "provider_ms": self.provider_ms,
+        }
+
+
+class RunMetrics:
+    """Stage recorders of one pipeline run"""
+
+    def __init__(self):
+        self.stages: Dict[str, StageRecorder] = {}
+
+    def instrument(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a stage function so its work is recorded under name"""
+        def instrumented(**kwargs):
+            recorder = StageRecorder(name)
+            self.stages[name] = recorder
+            token = CURRENT_STAGE.set(recorder)
+            started = time.perf_counter()
+            try:
+                return func(**kwargs)
+            except Exception:
+                recorder.success = False
+                raise
+            finally:
+                recorder.wall_ms = int((time.perf_counter() - started) * 1000)
+                CURRENT_STAGE.reset(token)
+                PIPELINE_METRICS.observe_stage(recorder)
+
+        return instrumented
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: recorder.as_dict() for name, recorder in self.stages.items()}
+
+
+# =============================================================================
+# HOOKS
+# =============================================================================
+
+def count_query(execute, sql, params, many, context):
+    """Django execute wrapper - installed on every connection by the depts signals"""
+    recorder = CURRENT_STAGE.get()
+    if recorder is not None:
+        recorder.add(db_queries=1)
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection) -> None:
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def record_llm_usage(result) -> None:
+    """Attribute an agent run (agno RunOutput) and its tokens to the current stage"""
+    recorder = CURRENT_STAGE.get()
+    if recorder is None:
+        return
+    metrics = getattr(result, "metrics", None)
+    tokens = metrics.get("total_tokens") if isinstance(metrics, dict) else getattr(metrics, "total_tokens", 0)
+    if isinstance(tokens, list):
+        tokens = sum(tokens)
+    recorder.add(llm_calls=1, llm_tokens=int(tokens or 0))
+
+
+@contextmanager
+def record_provider_call(channel: str) -> Iterator[Dict[str, Any]]:
+    """
+    Time one provider send (SMS, email, voice); set outcome["success"] inside
+
+    with record_provider_call("sms") as outcome:
+        outcome["success"] = send()["success"]
+    """
+    outcome = {"success": False}
+    started = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        elapsed = time.perf_counter() - started
+        recorder = CURRENT_STAGE.get()
+        if recorder is not None:
+            recorder.add(
+                provider_calls=1,
+                provider_errors=0 if outcome["success"] else 1,
+                provider_ms=int(elapsed * 1000)
+            )
+        PIPELINE_METRICS.observe_provider(channel, elapsed, bool(outcome["success"]))
+
+
+# =============================================================================
+# PROCESS-INDEPENDENT AGGREGATES
+# =============================================================================
+
+def _bucket(value: float, buckets: Tuple[float, ...]) -> str:
+    for bound in buckets:
+        if value <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+class PipelineMetricsRegistry:
+    """
+    Counters shared by every web and Celery process through one Redis hash
+
+    Hash fields are "<series>|<label values>"; render() turns them into
+    Prometheus counters and cumulative histograms.
+    """
+
+    def __init__(self):
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        """Whether this run's stage metrics are persisted on the CitizenRequest"""
+        return random.random() < getattr(settings, "PIPELINE_METRICS_SAMPLE_RATE", 0.1)
+
+    def observe_stage(self, recorder: StageRecorder) -> None:
+        seconds = recorder.wall_ms / 1000.0
+        stage = recorder.stage
+        self._increment({
+            f"stage_seconds_bucket|{stage}|{_bucket(seconds, STAGE_BUCKETS)}": 1,
+            f"stage_seconds_sum|{stage}": seconds,
+            f"stage_seconds_count|{stage}": 1,
+            f"stage_failures|{stage}": 0 if recorder.success else 1,
+            f"stage_db_queries|{stage}": recorder.db_queries,
+            f"stage_llm_calls|{stage}": recorder.llm_calls,
+            f"stage_llm_tokens|{stage}": recorder.llm_tokens,
+            f"stage_provider_calls|{stage}": recorder.provider_calls,
+        })
+
+    def observe_provider(self, channel: str, seconds: float, success: bool) -> None:
+        self._increment({
+            f"provider_seconds_bucket|{channel}|{_bucket(seconds, PROVIDER_BUCKETS)}": 1,
+            f"provider_seconds_sum|{channel}": seconds,
+            f"provider_seconds_count|{channel}": 1,
+            f"provider_calls|{channel}|{'success' if success else 'failure'}": 1,
+        })
+
+    def observe_run(self, seconds: float, success: bool) -> None:
+        self._increment({
+            f"run_seconds_bucket||{_bucket(seconds, STAGE_BUCKETS)}": 1,
+            "run_seconds_sum|": seconds,
+            "run_seconds_count|": 1,
+            f"runs|{'success' if success else 'failure'}": 1,
+        })
+
+    def _increment(self, increments: Dict[str, float]) -> None:
+        increments = {field: value for field, value in increments.items() if value}
+        client = get_redis_client()
+        if client:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for field, value in increments.items():
+                    pipe.hincrbyfloat(METRICS_KEY, field, value)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.debug(f"Pipeline metrics write failed, keeping them locally: {e}")
+
+        with self._lock:
+            for field, value in increments.items():
+                self._local[field] = self._local.get(field, 0) + value
+
+    def snapshot(self) -> Dict[str, float]:
+        client = get_redis_client()
+        if client:
+            try:
+                return {field: float(value) for field, value in client.hgetall(METRICS_KEY).items()}
+            except Exception as e:
+                logger.debug(f"Pipeline metrics read failed: {e}")
+        with self._lock:
+            return dict(self._local)
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        values = self.snapshot()
+        lines: List[str] = []
+
+        self._render_histogram(lines, values, "run_seconds", "emergency_pipeline_run_seconds",
+                               "End-to-end pipeline wall time", None, STAGE_BUCKETS)
+        self._render_counter(lines, values, "runs", "emergency_pipeline_runs_total",
+                             "Pipeline runs by outcome", "outcome")
+        self._render_histogram(lines, values, "stage_seconds", "emergency_pipeline_stage_seconds",
+                               "Wall time per pipeline stage", "stage", STAGE_BUCKETS)
+        for series, help_text in (
+            ("stage_failures", "Stage runs that raised"),
+            ("stage_db_queries", "SQL statements issued while a stage ran"),
+            ("stage_llm_calls", "Agent (LLM) runs per stage"),
+            ("stage_llm_tokens", "LLM tokens per stage"),
+            ("stage_provider_calls", "SMS/email/voice provider sends per stage"),
+        ):
+            self._render_counter(lines, values, series, f"emergency_pipeline_{series}_total", help_text, "stage")
+        self._render_histogram(lines, values, "provider_seconds", "emergency_pipeline_provider_seconds",
+                               "Provider send latency", "channel", PROVIDER_BUCKETS)
+
+        provider_calls = self._series(values, "provider_calls")
+        lines.append("# HELP emergency_pipeline_provider_calls_total Provider sends by channel and outcome")
+        lines.append("# TYPE emergency_pipeline_provider_calls_total counter")
+        for labels, value in sorted(provider_calls.items()):
+            channel, outcome = (labels.split("|") + [""])[:2]
+            lines.append(
+                f'emergency_pipeline_provider_calls_total{{channel="{channel}",outcome="{outcome}"}} {value:g}'
+            )
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _series(values: Dict[str, float], series: str) -> Dict[str, float]:
+        prefix = f"{series}|"
+        return {field[len(prefix):]: value for field, value in values.items() if field.startswith(prefix)}
+
+    def _render_counter(self, lines: List[str], values: Dict[str, float], series: str,
+                        name: str, help_text: str, label: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for label_value, value in sorted(self._series(values, series).items()):
+            lines.append(f'{name}{{{label}="{label_value}"}} {value:g}')
+
+    def _render_histogram(self, lines: List[str], values: Dict[str, float], series: str, name: str,
+                          help_text: str, label: Optional[str], buckets: Tuple[float, ...]) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+
+        counts = self._series(values, f"{series}_count")
+        sums = self._series(values, f"{series}_sum")
+        per_bucket = self._series(values, f"{series}_bucket")
+
+        for label_value in sorted(counts):
+            prefix = f'{label}="{label_value}",' if label else ""
+            cumulative = 0.0
+            for bound in buckets:
+                cumulative += per_bucket.get(f"{label_value}|{bound}", 0)
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative:g}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {counts[label_value]:g}')
+            braces = f"{{{prefix.rstrip(',')}}}" if label else ""
+            lines.append(f"{name}_sum{braces} {sums.get(label_value, 0):g}")
+            lines.append(f"{name}_count{braces} {counts[label_value]:g}")
+
+
+# Process-wide instance used by the pipelines, agent services, dispatch ledger and metrics view
+PIPELINE_METRICS = PipelineMetricsRegistry()
@@ -0,0 +1,103 @@
+"""
+Request Detail Service - One fixed-cost load of a citizen request and its history
+Foreign keys are joined and every reverse relation is fetched by a Prefetch with
+its ordering (and slice) baked in, so the detail views and the AJAX payload read
+prefetched lists only - the query count doesn't grow with actions, calls or
+appointments
+"""
+from typing import Any, Dict, Optional
+
+from django.db.models import Prefetch, QuerySet
+
+from apps.depts.models import (
+    ActionLog, Appointment, CitizenRequest, CitizenRequestAssignment, EmergencyCall
+)
+
+# Actions shown in the dashboard request popup
+RECENT_ACTIONS_LIMIT = 10
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+
+
+class RequestDetailService:
+    """Prefetched detail querysets and the dashboard request-detail payload"""
+
+    @staticmethod
+    def detail_queryset(queryset: Optional[QuerySet] = None, full_history: bool = True) -> QuerySet:
+        """
+        Citizen requests with everything the detail pages read
+
+        Prefetched lists land on to_attr attributes:
+            ordered_assignments, recent_actions, and with full_history also
+            ordered_actions, ordered_appointments, ordered_calls
+        """
+        queryset = queryset if queryset is not None else CitizenRequest.objects.all()
+        prefetches = [
+            Prefetch(
+                'assignments',
+                queryset=CitizenRequestAssignment.objects.order_by('assigned_at', 'pk'),
+                to_attr='ordered_assignments'
+            ),
+            # Sliced per request with a window function - still one query
+            Prefetch(
+                'actions',
+                queryset=ActionLog.objects.order_by('-created_at', '-pk')[:RECENT_ACTIONS_LIMIT],
+                to_attr='recent_actions'
+            ),
+        ]
+        if full_history:
+            prefetches += [
+                Prefetch('actions', queryset=ActionLog.objects.order_by('created_at', 'pk'), to_attr='ordered_actions'),
+                Prefetch(
+                    'appointments',
+                    queryset=Appointment.objects.select_related('entity').order_by('-scheduled_at', '-pk'),
+                    to_attr='ordered_appointments'
+                ),
+                Prefetch(
+                    'emergency_calls',
+                    queryset=EmergencyCall.objects.select_related('department').order_by('initiated_at', 'pk'),
+                    to_attr='ordered_calls'
+                ),
+            ]
+
+        return queryset.select_related(
+            'user', 'target_location__city', 'assigned_department', 'assigned_entity'
+        ).prefetch_related(*prefetches)
+
+    @staticmethod
+    def serialize(request_obj: CitizenRequest) -> Dict[str, Any]:
+        """JSON payload for the dashboard request popup - reads prefetched data only"""
+        assignment = request_obj.ordered_assignments[0] if request_obj.ordered_assignments else None
+        location = request_obj.target_location
+
+        return {
+            'success': True,
+            'request': {
+                'case_code': request_obj.case_code,
+                'user_name': request_obj.user.get_full_name() or request_obj.user.email,
+                'request_text': request_obj.request_text,
+                'urgency_level': request_obj.urgency_level or 'LOW',
+                'category': request_obj.category or 'GENERAL',
+                'status': request_obj.status,
+                'created_at': request_obj.created_at.strftime(DATETIME_FORMAT),
+                'assigned_at': assignment.assigned_at.strftime(DATETIME_FORMAT) if assignment else 'Not assigned yet',
+            },
+            'location': {
+                'area': location.area,
+                'city': location.city.name,
+            } if location else {'area': '', 'city': 'Unknown'},
+            'assignment': {
+                'department': request_obj.assigned_department.name if request_obj.assigned_department else 'Not assigned',
+                'entity': request_obj.assigned_entity.name if request_obj.assigned_entity else 'Not assigned',
+                'status': request_obj.status,
+            },
+            'recent_actions': [
+                {
+                    'description': action.description,
+                    'created_at': action.created_at.strftime(DATETIME_FORMAT),
+                    'action_type': action.action_type,
+                    'success': action.success,
+                }
+                for action in request_obj.recent_actions
+            ]
+        }
@@ -0,0 +1,243 @@
+"""
+Request Search - Ranked full-text search over citizen requests
+Postgres: a tsvector column on depts_citizenrequest with a GIN index.
+SQLite: an FTS5 virtual table keyed by request id, ranked with bm25().
+Both index case code, reporter name/email, request text, AI response and
+category, and are kept current by the depts signals.
+"""
+import logging
+from typing import Iterable, List
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, QuerySet, When
+from django.db.models.expressions import RawSQL
+
+from apps.depts.models import CitizenRequest
+
+logger = logging.getLogger(__name__)
+
+# Ranked search returns at most this many requests
+SEARCH_RESULT_LIMIT = 100
+
+# Created by migration 0008_request_search_index
+FTS_TABLE = "depts_citizenrequest_fts"
+SEARCH_VECTOR_COLUMN = "search_vector"
+# 'simple' - requests mix English, Urdu and Roman Urdu, so no language stemming
+PG_SEARCH_CONFIG = "simple"
+
+DOCUMENT_FIELDS = ('id', 'case_code', 'user__first_name', 'user__last_name', 'user__email',
+                   'request_text', 'ai_response', 'category')
+
+# CitizenRequest field name -> attribute whose change alters the indexed document
+INDEXED_FIELDS = {
+    'case_code': 'case_code',
+    'user': 'user_id',
+    'request_text': 'request_text',
+    'ai_response': 'ai_response',
+    'category': 'category',
+}
+
+# CustomUser fields copied into the reporter text of every request they filed
+REPORTER_FIELDS = ('first_name', 'last_name', 'email')
+
+# Stands in for a deferred (never loaded) field
+_NOT_LOADED = object()
+
+
+def _documents(request_ids: Iterable[str]) -> List[tuple]:
+    """(id, case_code, reporter, request_text, ai_response, category) rows to index"""
+    rows = CitizenRequest.objects.filter(pk__in=list(request_ids)).values_list(*DOCUMENT_FIELDS)
+    return [
+        (request_id, case_code or "", f"{first_name} {last_name} {email}".strip(),
+         request_text or "", ai_response or "", category or "")
+        for request_id, case_code, first_name, last_name, email, request_text, ai_response, category in rows
+    ]
+
+
+def _fts5_query(query: str) -> str:
+    """User text as an FTS5 query - every term must match, last one as a prefix"""
+    terms = [term.replace('"', '') for term in query.split()]
+    terms = [term for term in terms if term]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " AND ".join(quoted)
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class PostgresRequestSearch:
+    """tsvector column + GIN index, ranked with ts_rank_cd"""
+
+    def index(self, request_ids: Iterable[str]) -> int:
+        documents = _documents(request_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"""
+                UPDATE depts_citizenrequest SET {SEARCH_VECTOR_COLUMN} =
+                    setweight(to_tsvector('{PG_SEARCH_CONFIG}', %s), 'A') ||
+                    setweight(to_tsvector('{PG_SEARCH_CONFIG}', %s), 'A') ||
+                    setweight(to_tsvector('{PG_SEARCH_CONFIG}', %s), 'B') ||
+                    setweight(to_tsvector('{PG_SEARCH_CONFIG}', %s), 'C') ||
+                    setweight(to_tsvector('{PG_SEARCH_CONFIG}', %s), 'D')
+                WHERE id = %s
+                """,
+                [(case_code, reporter, request_text, ai_response, category, request_id)
+                 for request_id, case_code, reporter, request_text, ai_response, category in documents]
+            )
+        return len(documents)
+
+    def remove(self, request_ids: Iterable[str]) -> None:
+        # The vector lives on the row itself
+        pass
+
+    def search(self, queryset: QuerySet, query: str, limit: int) -> QuerySet:
+        tsquery = f"websearch_to_tsquery('{PG_SEARCH_CONFIG}', %s)"
+        return queryset.annotate(
+            search_rank=RawSQL(f"ts_rank_cd(depts_citizenrequest.{SEARCH_VECTOR_COLUMN}, {tsquery})", (query,))
+        ).extra(
+            where=[f"depts_citizenrequest.{SEARCH_VECTOR_COLUMN} @@ {tsquery}"], params=[query]
+        ).order_by('-search_rank', '-created_at')[:limit]
+
+
+class SqliteRequestSearch:
+    """FTS5 side table, ranked with bm25()"""
+
+    def index(self, request_ids: Iterable[str]) -> int:
+        documents = _documents(request_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE request_id = %s", [(row[0],) for row in documents])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (request_id, case_code, reporter, request_text, ai_response, category) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)",
+                documents
+            )
+        return len(documents)
+
+    def remove(self, request_ids: Iterable[str]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE request_id = %s", [(pk,) for pk in request_ids])
+
+    def search(self, queryset: QuerySet, query: str, limit: int) -> QuerySet:
+        match = _fts5_query(query)
+        if not match:
+            return queryset.none()
+
+        # Column weights follow the Postgres A/B/C/D setup: codes and names first
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT request_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, 0, 10.0, 10.0, 4.0, 2.0, 1.0) LIMIT %s",
+                [match, limit]
+            )
+            ranked_ids = [row[0] for row in cursor.fetchall()]
+
+        return queryset.filter(pk__in=ranked_ids).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=-position) for position, pk in enumerate(ranked_ids)],
+                output_field=IntegerField()
+            )
+        ).order_by('-search_rank')
+
+
+class IContainsRequestSearch:
+    """Unindexed fallback for other databases"""
+
+    def index(self, request_ids: Iterable[str]) -> int:
+        return 0
+
+    def remove(self, request_ids: Iterable[str]) -> None:
+        pass
+
+    def search(self, queryset: QuerySet, query: str, limit: int) -> QuerySet:
+        return queryset.filter(
+            Q(case_code__icontains=query) |
+            Q(user__first_name__icontains=query) |
+            Q(user__last_name__icontains=query) |
+            Q(category__icontains=query) |
+            Q(request_text__icontains=query) |
+            Q(ai_response__icontains=query)
+        ).order_by('-created_at')[:limit]
+
+
+# =============================================================================
+# FACADE
+# =============================================================================
+
+class RequestSearch:
+    """Picks the backend matching the default database"""
+
+    def __init__(self):
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if connection.vendor == "postgresql":
+                self._backend = PostgresRequestSearch()
+            elif connection.vendor == "sqlite":
+                self._backend = SqliteRequestSearch()
+            else:
+                self._backend = IContainsRequestSearch()
+        return self._backend
+
+    def search(self, queryset: QuerySet, query: str, limit: int = SEARCH_RESULT_LIMIT) -> QuerySet:
+        """Best matches first, annotated with search_rank"""
+        return self.backend.search(queryset, query.strip(), limit)
+
+    def index(self, request_ids: Iterable[str]) -> int:
+        return self.backend.index(request_ids)
+
+    def remove(self, request_ids: Iterable[str]) -> None:
+        self.backend.remove(request_ids)
+
+    @staticmethod
+    def indexed_values(instance: CitizenRequest):
+        """In-memory values of the indexed columns, without loading deferred ones"""
+        return {attr: instance.__dict__.get(attr, _NOT_LOADED) for attr in INDEXED_FIELDS.values()}
+
+    def needs_reindex(self, instance: CitizenRequest, created: bool = False, update_fields=None) -> bool:
+        """
+        Whether a save changed the indexed document - False when it skipped every
+        indexed column or none changed since load / the last indexed save
+        """
+        if created:
+            return True
+        if update_fields is not None and not INDEXED_FIELDS.keys() & set(update_fields):
+            return False
+        return self.indexed_values(instance) != getattr(instance, '_search_values', None)
+
+    @staticmethod
+    def reporter_values(user):
+        """In-memory values of the user fields indexed with their requests"""
+        return {field: user.__dict__.get(field, _NOT_LOADED) for field in REPORTER_FIELDS}
+
+    def reporter_needs_reindex(self, user, created: bool = False, update_fields=None) -> bool:
+        """
+        Whether a user save changed the reporter text of their requests - False for
+        new users (no requests yet), last_login-only saves and unchanged names
+        """
+        if created:
+            return False
+        if update_fields is not None and not set(REPORTER_FIELDS) & set(update_fields):
+            return False
+        return self.reporter_values(user) != getattr(user, '_search_reporter_values', None)
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """(Re)index every request in primary key batches"""
+        indexed = 0
+        ids = CitizenRequest.objects.order_by('pk').values_list('pk', flat=True)
+
+        batch = list(ids[:batch_size])
+        while batch:
+            indexed += self.index(batch)
+            logger.info(f"🔎 Indexed {indexed} requests for search")
+            batch = list(ids.filter(pk__gt=batch[-1])[:batch_size])
+        return indexed
+
+
+# Process-wide instance used by the request list view and the depts signals
+REQUEST_SEARCH = RequestSearch()
@@ -0,0 +1,277 @@
+"""
+Rollup Service - Hourly/daily RequestRollup counts for analytics
+Signals apply +1/-1 deltas as requests change; reconcile() rebuilds a recent
+window from CitizenRequest to heal drift from bulk updates that skip signals
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.depts.choices import RollupGranularity, RollupMetric
+from apps.depts.models import CitizenRequest, Location, RequestRollup
+
+logger = logging.getLogger(__name__)
+
+# CitizenRequest columns a rollup key is derived from
+SNAPSHOT_FIELDS = (
+    'created_at', 'resolved_at', 'category', 'urgency_level', 'status',
+    'target_location_id', 'target_location__city_id', 'assigned_department_id'
+)
+
+# Model field name -> attribute a save can change a rollup key through
+TRACKED_FIELDS = {
+    'created_at': 'created_at',
+    'resolved_at': 'resolved_at',
+    'category': 'category',
+    'urgency_level': 'urgency_level',
+    'status': 'status',
+    'target_location': 'target_location_id',
+    'assigned_department': 'assigned_department_id',
+}
+
+# Stands in for a deferred (never loaded) field
+_NOT_LOADED = object()
+
+RollupKey = Tuple[str, str, datetime, str, str, str, str, str]
+
+ROLLUP_DIMENSIONS = ('category', 'urgency_level', 'status', 'city_key', 'department_key')
+
+
+def _bucket(value: datetime, granularity: str) -> datetime:
+    """Start of the hour/day holding value - matches TruncHour/TruncDay in the current timezone"""
+    local = timezone.localtime(value)
+    if granularity == RollupGranularity.HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_keys(snapshot: Optional[Dict[str, Any]]) -> List[RollupKey]:
+    """Every rollup row a request (as a values() snapshot) contributes one count to"""
+    if not snapshot or not snapshot.get('created_at'):
+        return []
+
+    dimensions = (
+        snapshot.get('category') or "",
+        snapshot.get('urgency_level') or "",
+        snapshot.get('status') or "",
+        snapshot.get('target_location__city_id') or "",
+        snapshot.get('assigned_department_id') or "",
+    )
+
+    keys = []
+    for granularity in RollupGranularity.values:
+        keys.append((granularity, RollupMetric.CREATED, _bucket(snapshot['created_at'], granularity), *dimensions))
+        if snapshot.get('resolved_at'):
+            keys.append((granularity, RollupMetric.RESOLVED, _bucket(snapshot['resolved_at'], granularity), *dimensions))
+    return keys
+
+
+class RollupService:
+    """Maintains and reads RequestRollup"""
+
+    # -------------------------------------------------------------------------
+    # Incremental maintenance
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def tracked_values(instance: CitizenRequest) -> Dict[str, Any]:
+        """In-memory values of the rollup columns, without loading deferred ones"""
+        return {attr: instance.__dict__.get(attr, _NOT_LOADED) for attr in TRACKED_FIELDS.values()}
+
+    @staticmethod
+    def may_change_rollups(instance: CitizenRequest, update_fields=None) -> bool:
+        """
+        Whether saving instance can move it to other rollup rows - False when the
+        save skips every rollup column or none changed since load / last save
+        """
+        if instance._state.adding:
+            return True
+        if update_fields is not None and not TRACKED_FIELDS.keys() & set(update_fields):
+            return False
+        return RollupService.tracked_values(instance) != getattr(instance, '_rollup_values', None)
+
+    @staticmethod
+    def remember_saved_values(instance: CitizenRequest, update_fields=None) -> None:
+        """Record the rollup columns just written, for the next may_change_rollups()"""
+        values = RollupService.tracked_values(instance)
+        if update_fields is not None:
+            saved = {TRACKED_FIELDS[name] for name in update_fields if name in TRACKED_FIELDS}
+            previous = getattr(instance, '_rollup_values', None) or {}
+            values = {attr: values[attr] if attr in saved else previous.get(attr, _NOT_LOADED) for attr in values}
+        instance._rollup_values = values
+
+    @staticmethod
+    def snapshot_from_db(request_id: str) -> Optional[Dict[str, Any]]:
+        """Rollup-relevant columns of a request as currently stored"""
+        return CitizenRequest.objects.filter(pk=request_id).values(*SNAPSHOT_FIELDS).first()
+
+    @staticmethod
+    def snapshot_from_instance(instance: CitizenRequest,
+                               previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Rollup-relevant columns of an in-memory request - the city needs one lookup
+        unless the location is the one in the previous snapshot
+        """
+        if previous and previous.get('target_location_id') == instance.target_location_id:
+            city_id = previous.get('target_location__city_id')
+        elif instance.target_location_id:
+            city_id = Location.objects.filter(id=instance.target_location_id).values_list('city_id', flat=True).first()
+        else:
+            city_id = None
+
+        return {
+            'created_at': instance.created_at,
+            'resolved_at': instance.resolved_at,
+            'category': instance.category,
+            'urgency_level': instance.urgency_level,
+            'status': instance.status,
+            'target_location_id': instance.target_location_id,
+            'target_location__city_id': city_id,
+            'assigned_department_id': instance.assigned_department_id,
+        }
+
+    @staticmethod
+    def apply_change(old_snapshot: Optional[Dict[str, Any]], new_snapshot: Optional[Dict[str, Any]]) -> None:
+        """
+        Move one request's counts from its old rollup rows to its new ones - one
+        insert for rows that don't exist yet and one UPDATE for every delta
+        """
+        deltas = Counter(rollup_keys(new_snapshot))
+        deltas.subtract(Counter(rollup_keys(old_snapshot)))
+        lookups = [(RollupService._key_lookup(key), delta) for key, delta in deltas.items() if delta]
+        if not lookups:
+            return
+
+        with transaction.atomic():
+            # Rows that exist (or another worker just created) are left alone
+            new_rows = [RequestRollup(request_count=0, **lookup) for lookup, delta in lookups if delta > 0]
+            for row in new_rows:
+                row.id = row.generate_custom_id()
+            RequestRollup.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+            key_filter = Q()
+            for lookup, _ in lookups:
+                key_filter |= Q(**lookup)
+            RequestRollup.objects.filter(key_filter).update(
+                request_count=F('request_count') + Case(
+                    *[When(Q(**lookup), then=Value(delta)) for lookup, delta in lookups],
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            )
+
+    @staticmethod
+    def _key_lookup(key: RollupKey) -> Dict[str, Any]:
+        granularity, metric, bucket_start, *dimensions = key
+        return {
+            'granularity': granularity,
+            'metric': metric,
+            'bucket_start': bucket_start,
+            **dict(zip(ROLLUP_DIMENSIONS, dimensions))
+        }
+
+    # -------------------------------------------------------------------------
+    # Reconciliation
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def reconcile(since: Optional[datetime] = None) -> int:
+        """
+        Recompute every rollup row from `since` (or all time) directly from CitizenRequest
+
+        Returns:
+            Number of rollup rows written
+        """
+        rows = []
+        with transaction.atomic():
+            for granularity, trunc in ((RollupGranularity.HOUR, TruncHour), (RollupGranularity.DAY, TruncDay)):
+                window_start = _bucket(since, granularity) if since else None
+
+                stale = RequestRollup.objects.filter(granularity=granularity)
+                if window_start:
+                    stale = stale.filter(bucket_start__gte=window_start)
+                stale.delete()
+
+                for metric, time_field in ((RollupMetric.CREATED, 'created_at'), (RollupMetric.RESOLVED, 'resolved_at')):
+                    requests = CitizenRequest.objects.filter(**{f'{time_field}__isnull': False})
+                    if window_start:
+                        requests = requests.filter(**{f'{time_field}__gte': window_start})
+
+                    grouped = requests.annotate(bucket=trunc(time_field)).values(
+                        'bucket', 'category', 'urgency_level', 'status',
+                        'target_location__city_id', 'assigned_department_id'
+                    ).annotate(total=Count('id')).order_by()
+
+                    rows.extend(
+                        RequestRollup(
+                            granularity=granularity,
+                            metric=metric,
+                            bucket_start=group['bucket'],
+                            category=group['category'] or "",
+                            urgency_level=group['urgency_level'] or "",
+                            status=group['status'] or "",
+                            city_key=group['target_location__city_id'] or "",
+                            department_key=group['assigned_department_id'] or "",
+                            request_count=group['total']
+                        )
+                        for group in grouped
+                    )
+
+            # bulk_create skips save(), so ids are assigned here
+            for row in rows:
+                row.id = row.generate_custom_id()
+            RequestRollup.objects.bulk_create(rows, batch_size=1000)
+
+        logger.info(f"Reconciled request rollups since {since or 'the beginning'}: {len(rows)} rows")
+        return len(rows)
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def daily(metric: str = RollupMetric.CREATED, since: Optional[datetime] = None):
+        """Daily rollup rows for one metric"""
+        rows = RequestRollup.objects.filter(granularity=RollupGranularity.DAY, metric=metric)
+        if since:
+            rows = rows.filter(bucket_start__gte=_bucket(since, RollupGranularity.DAY))
+        return rows
+
+    @staticmethod
+    def trend(days: int = 30, metric: str = RollupMetric.CREATED) -> List[Dict[str, Any]]:
+        """[{bucket_start, total}] per day for the last `days` days (days without requests omitted)"""
+        since = timezone.now() - timedelta(days=days - 1)
+        return list(
+            RollupService.daily(metric, since).values('bucket_start')
+            .annotate(total=Sum('request_count')).order_by('bucket_start')
+        )
+
+    @staticmethod
+    def breakdown(dimension: str, since: Optional[datetime] = None,
+                  metric: str = RollupMetric.CREATED) -> List[Dict[str, Any]]:
+        """[{<dimension>, total}] largest first, e.g. breakdown('category')"""
+        if dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+        return list(
+            RollupService.daily(metric, since).values(dimension)
+            .annotate(total=Sum('request_count')).filter(total__gt=0).order_by('-total')
+        )
+
+    @staticmethod
+    def totals(filters: Dict[str, Q]) -> Dict[str, int]:
+        """One aggregate over daily rollups - {name: Sum(request_count, filter=q)}"""
+        result = RequestRollup.objects.filter(granularity=RollupGranularity.DAY).aggregate(
+            **{name: Sum('request_count', filter=q) for name, q in filters.items()}
+        )
+        return {name: value or 0 for name, value in result.items()}
+
+
+def reconcile_recent(hours: int = 48) -> int:
+    """Rebuild the rollups covering the last `hours` hours"""
+    return RollupService.reconcile(timezone.now() - timedelta(hours=hours))
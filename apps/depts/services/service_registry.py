@@ -0,0 +1,119 @@
+"""
+Service Registry - Agents, pipelines and provider clients built on first use
+Components are registered by dotted path, so importing a pipeline or a Celery
+tasks module never imports agno, OpenAI, VAPI or Twilio and never builds an
+agent; each component is imported and constructed once per process the first
+time something actually asks for it.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# name -> dotted path; a class is instantiated with no arguments,
+# anything else (a module-level agent) is used as is
+DEFAULT_COMPONENTS = {
+    # Agents
+    "router_agent": "apps.depts.agents.router_agent.agent.ROUTER_AGENT",
+    "police_agent": "apps.depts.agents.department_orchestrator_agent.member_agents.police_agent.POLICE_AGENT",
+    "fire_agent": "apps.depts.agents.department_orchestrator_agent.member_agents.fire_agent.FIRE_AGENT",
+    "ambulance_agent": "apps.depts.agents.department_orchestrator_agent.member_agents.ambulance_agent.AMBULANCE_AGENT",
+    "cybercrime_agent": "apps.depts.agents.department_orchestrator_agent.member_agents.cybercrime_agent.CYBERCRIME_AGENT",
+    "disaster_agent": "apps.depts.agents.department_orchestrator_agent.member_agents.disaster_agent.DISASTER_AGENT",
+    # Provider clients
+    "vapi_call_agent": "apps.depts.services.actions.vapi_call_agent.EmergencyCallAgent",
+    "email_action_service": "apps.depts.services.actions.email_action_service.EmailActionService",
+    "sms_action_service": "apps.depts.services.actions.sms_action_service.SMSActionService",
+    "voice_action_service": "apps.depts.services.actions.voice_action_service.VoiceActionService",
+    # Pipelines
+    "action_executor": "apps.depts.services.actions.action_executor.ActionExecutor",
+    "simplified_emergency_pipeline": "apps.depts.services.simplified_emergency_pipeline.SimplifiedEmergencyPipeline",
+    "emergency_pipeline": "apps.depts.services.emergency_pipeline_service.EmergencyPipelineService",
+}
+
+
+class ServiceRegistry:
+    """
+    Process-wide, thread-safe lazy singletons
+
+    get() builds a component on first call; lazy() hands out a proxy that
+    calls get() on first attribute access, for module globals and constructor
+    defaults that must stay free to import.
+    """
+
+    def __init__(self, components: Dict[str, str]):
+        self._components = dict(components)
+        self._instances: Dict[str, Any] = {}
+        self._build_ms: Dict[str, int] = {}
+        # Re-entrant: building the pipeline builds the action executor
+        self._lock = threading.RLock()
+
+    def register(self, name: str, path: str) -> None:
+        with self._lock:
+            self._components[name] = path
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._build(name)
+            return self._instances[name]
+
+    def lazy(self, name: str) -> Any:
+        if name not in self._components:
+            raise KeyError(f"Unknown component '{name}'")
+        return SimpleLazyObject(lambda: self.get(name))
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def build_times_ms(self) -> Dict[str, int]:
+        """Components built so far and how long each took (import + construction)"""
+        return dict(self._build_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._instances.clear()
+            self._build_ms.clear()
+
+    @contextmanager
+    def override(self, name: str, instance: Any) -> Iterator[Any]:
+        """Serve instance for name while the block runs - used by benchmarks and tests"""
+        with self._lock:
+            missing = object()
+            previous = self._instances.get(name, missing)
+            self._instances[name] = instance
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                if previous is missing:
+                    self._instances.pop(name, None)
+                else:
+                    self._instances[name] = previous
+
+    def _build(self, name: str) -> Any:
+        if name not in self._components:
+            raise KeyError(f"Unknown component '{name}'")
+
+        started = time.perf_counter()
+        target = import_string(self._components[name])
+        instance = target() if isinstance(target, type) else target
+        self._build_ms[name] = int((time.perf_counter() - started) * 1000)
+
+        logger.info(f"🔧 Built {name} in {self._build_ms[name]}ms")
+        return instance
+
+
+# Process-wide instance used by the pipelines, action executor and Celery tasks
+SERVICE_REGISTRY = ServiceRegistry(DEFAULT_COMPONENTS)
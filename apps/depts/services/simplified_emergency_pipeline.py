@@ -2,37 +2,53 @@
 Simplified Emergency Pipeline Service
 Clean, maintainable version that preserves all functionality
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from typing import Optional, Dict, List, Any
+import json
 import logging
 import time
 from pydantic import BaseModel, Field
 
 # Import services
 from apps.depts.agents.router_agent.service import RouterAgentService
-from apps.depts.services.matcher_service import MatcherService, MatcherInput
+from apps.depts.agents.router_agent.pydantic_models import RouterDecision
+from apps.depts.services.matcher_service import MatcherService, MatcherInput, MatcherOutput
 from apps.depts.agents.department_orchestrator_agent.service import DepartmentOrchestratorService
-from apps.depts.agents.department_orchestrator_agent.pydantic_models import DepartmentOrchestratorInput
-from apps.depts.services.trigger_orchestrator_service import TriggerOrchestratorService, TriggerOrchestratorInput
+from apps.depts.agents.department_orchestrator_agent.pydantic_models import (
+    DepartmentOrchestratorInput, DepartmentOrchestratorServiceOutput
+)
+from apps.depts.services.trigger_orchestrator_service import (
+    TriggerOrchestratorService, TriggerOrchestratorInput, TriggerOrchestratorOutput
+)
 from apps.depts.services.actions.action_executor import ActionExecutor
-from apps.ai_agents.internal_agents.next_steps_agent import NextStepsAgentService, NextStepsInput
+from apps.ai_agents.internal_agents.next_steps_agent import NextStepsAgentService, NextStepsInput, NextStepsOutput
 from apps.depts.services.database_service import EmergencyDatabaseService
-from apps.depts.services.actions.vapi_call_agent import EmergencyCallAgent
-from apps.depts.services.trigger_orchestrator_service import EmailService, SMSService
+from apps.depts.services.audit_writer import AUDIT_WRITER
+from apps.depts.services.stage_graph import StageGraph, PipelineStage
+from apps.depts.services.pipeline_metrics import PIPELINE_METRICS, RunMetrics
+from apps.depts.services.pipeline_events import (
+    PipelineEventPublisher, EVENT_RECEIVED, EVENT_ROUTER_CLASSIFIED, EVENT_ENTITY_MATCHED,
+    EVENT_PLAN_GENERATED, EVENT_ACTIONS_PLANNED, EVENT_ACTIONS_EXECUTED,
+    EVENT_NEXT_STEPS_READY, EVENT_COMPLETED, EVENT_FAILED, EVENT_RETRYING
+)
+from apps.depts.services.trigger_orchestrator_service import EmailService, SMSService, TriggerActionType
+from apps.depts.services.actions.dispatch_ledger import DISPATCH_LEDGER
+from apps.depts.services.service_registry import SERVICE_REGISTRY
 
 # Import models
 from apps.depts.models import CitizenRequest
 
 logger = logging.getLogger(__name__)
 
+# How each checkpointed stage result is restored (None = plain JSON dict)
+STAGE_RESULT_TYPES = {
+    "router": RouterDecision,
+    "matcher": MatcherOutput,
+    "department": DepartmentOrchestratorServiceOutput,
+    "trigger": TriggerOrchestratorOutput,
+    "actions": None,
+    "next_steps": NextStepsOutput,
+}
+
 class EmergencyRequest(BaseModel):
     """Simplified request model - uses Django models directly"""
     request_text: str = Field(..., description="Emergency description")
@@ -42,6 +58,8 @@ class EmergencyRequest(BaseModel):
     user_coordinates: Optional[Dict[str, float]] = Field(None, description="GPS coordinates")
     user_id: Optional[int] = Field(None, description="User ID if authenticated")
     user_name: Optional[str] = Field("Anonymous", description="User's name")
+    stream_id: Optional[str] = Field(None, description="Progress event stream ID (Celery task ID)")
+    final_attempt: bool = Field(True, description="False while the task still has retries left")
 
 class PipelineResult(BaseModel):
     """Simplified result model"""
@@ -63,6 +81,9 @@ class PipelineResult(BaseModel):
     # Error handling
     error_message: Optional[str] = None
     total_duration_ms: int = 0
+    stage_durations_ms: Dict[str, int] = Field(default_factory=dict)
+    # Per stage: wall_ms, db_queries, llm_calls, llm_tokens, provider_calls/errors/ms
+    stage_metrics: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
 class SimplifiedEmergencyPipeline:
     """
@@ -97,30 +118,60 @@ class SimplifiedEmergencyPipeline:
 
         # Convert to dict for database service
         request_data = request.dict()
+        events = PipelineEventPublisher(request.stream_id)
+        run_metrics = RunMetrics()
 
         try:
-            # 1. Create database record
-            citizen_request = self.db_service.create_citizen_request(request_data, request_id)
-            logger.info(f"📝 Created database record: {citizen_request.case_code}")
-
-            # 2. Process through pipeline steps
-            router_result = self._process_router_step(request)
-            matcher_result = self._process_matcher_step(request, router_result)
-            dept_result = self._process_department_step(request, router_result)
-            trigger_result = self._process_trigger_step(request, router_result, matcher_result, dept_result)
-            execution_result = self._process_actions_step(trigger_result)
-            
-            # 3. Generate citizen response
-            next_steps_result = self._process_next_steps(request, dept_result, matcher_result, execution_result, citizen_request.case_code)
-            
-            # 4. Update database with results
+            # 1. Create database record - or pick up the one a failed attempt of
+            #    this task left behind, along with the stages it completed
+            citizen_request, checkpoints = self.db_service.load_checkpoints(request.stream_id)
+            if citizen_request:
+                request_id = checkpoints.get("received", {}).get("request_id", request_id)
+                logger.info(f"♻️ Resuming {citizen_request.case_code} after: {', '.join(checkpoints)}")
+            else:
+                citizen_request = self.db_service.create_citizen_request(request_data, request_id)
+                logger.info(f"📝 Created database record: {citizen_request.case_code}")
+                events.publish(EVENT_RECEIVED, {"case_code": citizen_request.case_code})
+                self._save_checkpoint(citizen_request, request.stream_id, "received", {"request_id": request_id})
+
+            # 2-3. Process pipeline steps and generate citizen response - matcher and
+            #      department only depend on the router, so they run concurrently
+            stage_graph = StageGraph(
+                [
+                    PipelineStage(stage.name, run_metrics.instrument(stage.name, stage.func), stage.depends_on)
+                    for stage in self._build_stages(request, citizen_request.case_code)
+                ],
+                on_stage_complete=lambda stage_name, result: self._on_stage_complete(
+                    events, citizen_request, request.stream_id, stage_name, result
+                ),
+                initial_results=self._restore_checkpoints(checkpoints)
+            )
+            stage_results = stage_graph.run()
+
+            router_result = stage_results["router"]
+            matcher_result = stage_results["matcher"]
+            dept_result = stage_results["department"]
+            execution_result = stage_results["actions"]
+            next_steps_result = stage_results["next_steps"]
+
+            # 4. Update database with results - a sample of runs keeps their stage metrics
             self.db_service.update_request_with_results(
-                citizen_request, router_result, matcher_result, dept_result, execution_result
+                citizen_request, router_result, matcher_result, dept_result, execution_result,
+                stage_metrics=run_metrics.as_dict() if PIPELINE_METRICS.should_sample() else None
             )
 
+            self.db_service.clear_checkpoints(request.stream_id)
+
             # 5. Create success response
             total_duration = int((time.time() - start_time) * 1000)
             logger.info(f"🎉 Pipeline completed successfully in {total_duration}ms")
+            PIPELINE_METRICS.observe_run(total_duration / 1000.0, success=True)
+
+            events.publish(EVENT_COMPLETED, {
+                "case_code": citizen_request.case_code,
+                "citizen_message": next_steps_result.citizen_message,
+                "total_duration_ms": total_duration
+            })
 
             return PipelineResult(
                 success=True,
@@ -133,13 +184,16 @@ class SimplifiedEmergencyPipeline:
                 actions_executed=execution_result.get("successful_actions", 0),
                 citizen_message=next_steps_result.citizen_message,
                 reference_number=next_steps_result.reference_number,
-                total_duration_ms=total_duration
+                total_duration_ms=total_duration,
+                stage_durations_ms=stage_graph.durations_ms,
+                stage_metrics=run_metrics.as_dict()
             )
 
         except Exception as e:
             # Handle errors gracefully
             logger.error(f"❌ Pipeline failed: {str(e)}")
             total_duration = int((time.time() - start_time) * 1000)
+            PIPELINE_METRICS.observe_run(total_duration / 1000.0, success=False)
             
             # Log error to database if we have a citizen_request
             try:
@@ -148,14 +202,136 @@ class SimplifiedEmergencyPipeline:
             except:
                 pass  # Don't let logging errors break the response
 
+            # A retry reuses this stream, so only the last attempt may end it
+            if request.final_attempt:
+                # Nothing will resume this stream - don't leave its checkpoints behind
+                try:
+                    self.db_service.clear_checkpoints(request.stream_id)
+                except Exception as cleanup_error:
+                    logger.warning(f"Failed to clear checkpoints for {request.stream_id}: {cleanup_error}")
+
+                events.publish(EVENT_FAILED, {
+                    "message": "Please call emergency services directly: 15 (Police) / 1122 (Rescue)",
+                    "reference": request_id
+                })
+            else:
+                events.publish(EVENT_RETRYING, {"reference": request_id})
+
             return PipelineResult(
                 success=False,
                 request_id=request_id,
                 error_message=str(e),
                 total_duration_ms=total_duration,
+                stage_durations_ms=stage_graph.durations_ms if 'stage_graph' in locals() else {},
+                stage_metrics=run_metrics.as_dict(),
                 citizen_message=f"Emergency request received but system error occurred. Please call emergency services directly: 15 (Police) / 1122 (Rescue). Reference: {request_id}"
             )
 
+        finally:
+            # Audit rows buffered by this run are written even when it failed -
+            # other runs' rows stay buffered for their own flush
+            if 'citizen_request' in locals() and citizen_request is not None:
+                AUDIT_WRITER.flush(citizen_request_id=citizen_request.id)
+
+    def _build_stages(self, request: EmergencyRequest, case_code: str) -> List[PipelineStage]:
+        """Pipeline stages and their dependencies - declaration order breaks ties"""
+        return [
+            PipelineStage("router", lambda: self._process_router_step(request)),
+            PipelineStage(
+                "matcher",
+                lambda router: self._process_matcher_step(request, router),
+                depends_on=["router"]
+            ),
+            PipelineStage(
+                "department",
+                lambda router: self._process_department_step(request, router),
+                depends_on=["router"]
+            ),
+            PipelineStage(
+                "trigger",
+                lambda router, matcher, department: self._process_trigger_step(
+                    request, router, matcher, department, case_code
+                ),
+                depends_on=["router", "matcher", "department"]
+            ),
+            PipelineStage(
+                "actions",
+                lambda trigger: self._process_actions_step(trigger, case_code),
+                depends_on=["trigger"]
+            ),
+            PipelineStage(
+                "next_steps",
+                lambda matcher, department, actions: self._process_next_steps(
+                    request, department, matcher, actions, case_code
+                ),
+                depends_on=["matcher", "department", "actions"]
+            ),
+        ]
+
+    def _on_stage_complete(self, events: PipelineEventPublisher, citizen_request: CitizenRequest,
+                           stream_id: Optional[str], stage_name: str, result) -> None:
+        """Checkpoint a finished stage, then report it to the citizen"""
+        # Failed/degraded results are not worth resuming from - let a retry redo them
+        if getattr(result, "success", True) is not False and not getattr(result, "degraded_mode_used", False):
+            payload = result.model_dump(mode="json") if isinstance(result, BaseModel) else json.loads(
+                json.dumps(result, default=str)
+            )
+            self._save_checkpoint(citizen_request, stream_id, stage_name, payload)
+
+        self._publish_stage_event(events, stage_name, result)
+
+    def _save_checkpoint(self, citizen_request: CitizenRequest, stream_id: Optional[str], stage_name: str, payload) -> None:
+        if not stream_id:
+            return
+        try:
+            self.db_service.save_checkpoint(citizen_request, stream_id, stage_name, payload)
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint stage {stage_name}: {e}")
+
+    def _restore_checkpoints(self, checkpoints: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild stage results from checkpoint payloads, dropping any that no longer parse"""
+        restored = {}
+        for stage_name, result_type in STAGE_RESULT_TYPES.items():
+            if stage_name not in checkpoints:
+                continue
+            try:
+                payload = checkpoints[stage_name]
+                restored[stage_name] = result_type.model_validate(payload) if result_type else payload
+            except Exception as e:
+                logger.warning(f"Discarding checkpoint for stage {stage_name}: {e}")
+        return restored
+
+    def _publish_stage_event(self, events: PipelineEventPublisher, stage_name: str, result) -> None:
+        """Translate a finished stage into a citizen-facing progress event"""
+        if stage_name == "router":
+            events.publish(EVENT_ROUTER_CLASSIFIED, {
+                "department": result.department,
+                "confidence": result.confidence
+            })
+        elif stage_name == "matcher":
+            events.publish(EVENT_ENTITY_MATCHED, {
+                "entity": result.matched_entity.name,
+                "city": result.matched_entity.city,
+                "distance_km": result.matched_entity.distance_km
+            })
+        elif stage_name == "department":
+            events.publish(EVENT_PLAN_GENERATED, {
+                "criticality": result.criticality,
+                "incident_summary": result.request_plan.incident_summary
+            })
+        elif stage_name == "trigger":
+            events.publish(EVENT_ACTIONS_PLANNED, {"actions": len(result.triggered_actions)})
+        elif stage_name == "actions":
+            events.publish(EVENT_ACTIONS_EXECUTED, {
+                "successful_actions": result.get("successful_actions", 0),
+                "total_actions": result.get("total_actions", 0)
+            })
+        elif stage_name == "next_steps":
+            events.publish(EVENT_NEXT_STEPS_READY, {
+                "actionable_steps": result.actionable_steps,
+                "reference_number": result.reference_number
+            })
+
     def _process_router_step(self, request: EmergencyRequest):
         """Process router step"""
         logger.info("📍 Step 1: Classifying request...")
@@ -163,7 +339,9 @@ class SimplifiedEmergencyPipeline:
         router_result = self.router_service.route_request(
             request_text=request.request_text,
             user_city=request.user_city,
-            user_location=request.user_coordinates
+            user_location=request.user_coordinates,
+            request_id=request.stream_id,
+            user_id=str(request.user_id) if request.user_id else None
         )
         
         if not router_result:
@@ -209,27 +387,33 @@ class SimplifiedEmergencyPipeline:
         logger.info(f"✅ Criticality: {dept_result.criticality}")
         return dept_result
 
-    def _process_trigger_step(self, request: EmergencyRequest, router_result, matcher_result, dept_result):
+    def _process_trigger_step(self, request: EmergencyRequest, router_result, matcher_result, dept_result, case_code: str):
         """Process trigger orchestrator step"""
         logger.info("⚡ Step 4: Mapping to intelligent actions...")
 
 
-        # Make an emergency call
-        call_agent = EmergencyCallAgent()
-        call_result = call_agent.make_emergency_call(
-            # phone_number=matcher_result.matched_entity.phone,
-            phone_number="+923472533106",
-            call_reason=dept_result.request_plan.incident_summary,
-            additional_context={
-                "user_city": request.user_city,
-                "user_coordinates": request.user_coordinates,
-                "request_plan": dept_result.request_plan.model_dump_json(),
-                "emergency_type": dept_result.request_plan.incident_summary,
-                "location": dept_result.request_plan.location_details,
-                "reported_by": request.user_name,
-                "urgency_level": dept_result.criticality,
-                "additional_notes": dept_result.request_plan.additional_context
-            }
+        # Make an emergency call - at most once per case and number, across retries
+        # and the voice actions the trigger orchestrator plans below
+        # call_phone = matcher_result.matched_entity.phone
+        call_phone = "+923472533106"
+        call_agent = SERVICE_REGISTRY.get("vapi_call_agent")
+        call_result = DISPATCH_LEDGER.dispatch(
+            case_code, TriggerActionType.VOICE_CALL.value, call_phone, "",
+            send=lambda: call_agent.make_emergency_call(
+                phone_number=call_phone,
+                call_reason=dept_result.request_plan.incident_summary,
+                additional_context={
+                    "user_city": request.user_city,
+                    "user_coordinates": request.user_coordinates,
+                    "request_plan": dept_result.request_plan.model_dump_json(),
+                    "emergency_type": dept_result.request_plan.incident_summary,
+                    "location": dept_result.request_plan.location_details,
+                    "reported_by": request.user_name,
+                    "urgency_level": dept_result.criticality,
+                    "additional_notes": dept_result.request_plan.additional_context
+                }
+            ),
+            subject="Emergency Voice Alert"
         )
 
         # Send SMS to department entity
@@ -282,13 +466,14 @@ class SimplifiedEmergencyPipeline:
         logger.info(f"✅ Actions: {len(trigger_result.triggered_actions)}")
         return trigger_result
 
-    def _process_actions_step(self, trigger_result):
+    def _process_actions_step(self, trigger_result, case_code: str):
         """Process action execution step"""
         logger.info("🚀 Step 5: Executing emergency actions...")
         
         execution_result = self.action_executor.execute_multiple_actions(
             trigger_result.triggered_actions,
-            parallel=True
+            parallel=True,
+            case_code=case_code
         )
         
         logger.info(f"✅ Executed: {execution_result['successful_actions']}/{execution_result['total_actions']}")
@@ -398,5 +583,5 @@ def process_citizen_emergency(
     pipeline = SimplifiedEmergencyPipeline()
     return pipeline.process_emergency_request(request)
 
-# Global instance for easy access
-SIMPLIFIED_EMERGENCY_PIPELINE = SimplifiedEmergencyPipeline()
+# Global instance for easy access - built on first use
+SIMPLIFIED_EMERGENCY_PIPELINE = SERVICE_REGISTRY.lazy("simplified_emergency_pipeline")
@@ -0,0 +1,129 @@
+"""
+Stage Graph - Runs pipeline stages as a dependency graph
+Stages whose dependencies are satisfied run concurrently; everything else waits
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Long-lived pool shared by every pipeline run in this process
+STAGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pipeline-stage")
+
+
+class PipelineStage:
+    """
+    A named unit of pipeline work
+
+    func receives the results of its dependencies as keyword arguments,
+    e.g. a stage depending on ["router"] is called as func(router=...)
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], depends_on: Optional[List[str]] = None):
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on or []
+
+    def __repr__(self):
+        return f"PipelineStage(name={self.name!r}, depends_on={self.depends_on!r})"
+
+
+class StageGraph:
+    """
+    Executes PipelineStages in dependency order with maximum overlap
+
+    When several stages become ready together, the first one (in declaration
+    order) runs on the calling thread so it keeps the caller's DB connection,
+    and the rest are offloaded to STAGE_POOL. The first stage failure stops
+    scheduling and is re-raised unchanged. on_stage_complete(name, result) is
+    called on the calling thread as each stage finishes.
+
+    initial_results pre-completes stages (e.g. restored from a checkpoint);
+    those stages are not run and on_stage_complete is not called for them.
+    """
+
+    def __init__(self, stages: List[PipelineStage],
+                 on_stage_complete: Optional[Callable[[str, Any], None]] = None,
+                 initial_results: Optional[Dict[str, Any]] = None):
+        names = [stage.name for stage in stages]
+        for stage in stages:
+            missing = [dep for dep in stage.depends_on if dep not in names]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+        self.stages = stages
+        self.on_stage_complete = on_stage_complete
+        self.results: Dict[str, Any] = {
+            name: result for name, result in (initial_results or {}).items() if name in names
+        }
+        self.durations_ms: Dict[str, int] = {}
+
+    def run(self) -> Dict[str, Any]:
+        """Run every stage and return {stage_name: result}"""
+        pending = [stage for stage in self.stages if stage.name not in self.results]
+        running = {}  # future -> stage
+
+        try:
+            while pending or running:
+                ready = [
+                    stage for stage in pending
+                    if all(dep in self.results for dep in stage.depends_on)
+                ]
+
+                if not ready and not running:
+                    raise RuntimeError(f"Stage graph cannot progress, unresolved stages: {pending}")
+
+                for stage in ready:
+                    pending.remove(stage)
+
+                for stage in ready[1:]:
+                    running[STAGE_POOL.submit(self._run_offloaded, stage, self._stage_kwargs(stage))] = stage
+
+                if ready:
+                    inline_stage = ready[0]
+                    self._complete(inline_stage, self._run_timed(inline_stage, self._stage_kwargs(inline_stage)))
+                    done = [future for future in running if future.done()]
+                else:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stage = running.pop(future)
+                    self._complete(stage, future.result())
+
+        finally:
+            # Never leave offloaded stages running unobserved after a failure
+            if running:
+                wait(running)
+
+        return self.results
+
+    def _complete(self, stage: PipelineStage, result: Any) -> None:
+        self.results[stage.name] = result
+        if self.on_stage_complete:
+            # Observers must not be able to fail the pipeline
+            try:
+                self.on_stage_complete(stage.name, result)
+            except Exception as e:
+                logger.warning(f"Stage completion hook failed for {stage.name}: {e}")
+
+    def _stage_kwargs(self, stage: PipelineStage) -> Dict[str, Any]:
+        return {dep: self.results[dep] for dep in stage.depends_on}
+
+    def _run_timed(self, stage: PipelineStage, kwargs: Dict[str, Any]) -> Any:
+        start = time.time()
+        try:
+            return stage.func(**kwargs)
+        finally:
+            self.durations_ms[stage.name] = int((time.time() - start) * 1000)
+            logger.info(f"⏱️ Stage {stage.name} took {self.durations_ms[stage.name]}ms")
+
+    def _run_offloaded(self, stage: PipelineStage, kwargs: Dict[str, Any]) -> Any:
+        try:
+            return self._run_timed(stage, kwargs)
+        finally:
+            # Worker threads get their own DB connection; don't leak it between runs
+            connection.close()
@@ -2,15 +2,6 @@
 Trigger Orchestrator Service - Maps criticality to intelligent actions
 This is the "wow factor" component that will impress judges
 """
-import os
-import sys
-import django
-from pathlib import Path
-
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
-django.setup()
-
 from pydantic import BaseModel, Field
 from typing import List, Optional, Union, Dict, Any
 from enum import Enum
@@ -46,6 +37,9 @@ class BaseAction(BaseModel):
     description: str
     estimated_duration: str
     requires_user_input: bool = False
+    # None = use the ActionExecutor default for this priority
+    latency_budget_seconds: Optional[float] = None
+    timeout_seconds: Optional[float] = None
 
 class EmailAction(BaseAction):
     """Email notification action"""
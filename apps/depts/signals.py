@@ -0,0 +1,205 @@
+import logging
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from apps.depts.agents.router_agent.rules import FAST_PATH_CONFIG, FAST_PATH_CONFIG_DEFAULTS
+from apps.depts.choices import DepartmentCategory
+from apps.depts.models import City, CitizenRequest, Department, DepartmentEntity, Location, SystemConfiguration
+from apps.depts.services.geo_index import ENTITY_GEO_INDEX, CITY_COORDINATE_INDEX
+from apps.depts.services.matcher_candidates import MATCHER_CANDIDATES
+from apps.depts.services.pipeline_metrics import install_query_counter
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
+from apps.depts.services.request_search import REQUEST_SEARCH
+from apps.depts.services.rollup_service import RollupService
+from apps.authentication.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=DepartmentEntity)
+def refresh_geo_index_for_entity(sender, instance, **kwargs):
+    """Entity moved, changed department or was (de)activated - rebuild its department once committed"""
+    transaction.on_commit(lambda: ENTITY_GEO_INDEX.invalidate_entity(instance.id, instance.department_id))
+
+
+@receiver([post_save, post_delete], sender=Location)
+def refresh_geo_index_for_location(sender, instance, created=False, **kwargs):
+    """Coordinates of an indexed entity changed - new locations are not indexed yet"""
+    if created:
+        return
+    transaction.on_commit(lambda: ENTITY_GEO_INDEX.invalidate_location(instance.id))
+
+
+@receiver([post_save, post_delete], sender=Department)
+def refresh_geo_index_for_department(sender, instance, **kwargs):
+    """Department active flag changed - rebuild its tree once committed"""
+    transaction.on_commit(lambda: ENTITY_GEO_INDEX.invalidate(instance.id))
+
+
+@receiver([post_save, post_delete], sender=City)
+def refresh_city_coordinate_index(sender, instance, **kwargs):
+    """City added, moved or removed - reload the coordinate array"""
+    CITY_COORDINATE_INDEX.invalidate()
+
+
+@receiver([post_save, post_delete], sender=DepartmentEntity)
+def refresh_matcher_candidates_for_entity(sender, instance, **kwargs):
+    """Rebuild the entity's current category and any category still listing it"""
+    category = Department.objects.filter(id=instance.department_id).values_list('category', flat=True).first()
+    MATCHER_CANDIDATES.rebuild_on_commit(
+        [category] + MATCHER_CANDIDATES.categories_for_entities(id=instance.id)
+    )
+
+
+@receiver([post_save, post_delete], sender=Department)
+def refresh_matcher_candidates_for_department(sender, instance, **kwargs):
+    """Active department or category changed - the old category may be affected too"""
+    MATCHER_CANDIDATES.rebuild_on_commit(DepartmentCategory.values)
+
+
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=DepartmentEntity)
+def refresh_department_directory(sender, instance, **kwargs):
+    """Reference data edited (admin or code) - every worker reloads its directory"""
+    transaction.on_commit(DEPARTMENT_DIRECTORY.bump_version)
+
+
+@receiver([post_save, post_delete], sender=Location)
+def refresh_department_directory_for_location(sender, instance, created=False, **kwargs):
+    """
+    Entity address edited - intake creates a Location per request, and those
+    are never in the directory, so new or unreferenced locations are skipped
+    """
+    if created:
+        return
+    if kwargs.get('signal') is post_save and not DepartmentEntity.objects.filter(location_id=instance.id).exists():
+        return
+    transaction.on_commit(DEPARTMENT_DIRECTORY.bump_version)
+
+
+@receiver([post_save, post_delete], sender=City)
+def refresh_department_directory_for_city(sender, instance, created=False, **kwargs):
+    """City renamed or removed - cities intake creates on the fly have no entities yet"""
+    if not created:
+        transaction.on_commit(DEPARTMENT_DIRECTORY.bump_version)
+
+
+@receiver([post_save, post_delete], sender=SystemConfiguration)
+def refresh_router_fast_path_config(sender, instance, **kwargs):
+    """Router fast path thresholds/mode edited - reload them on next use"""
+    if instance.key in FAST_PATH_CONFIG_DEFAULTS:
+        FAST_PATH_CONFIG.invalidate()
+
+
+@receiver(post_init, sender=CitizenRequest)
+def remember_request_rollup_values(sender, instance, **kwargs):
+    """Rollup columns as loaded - saves that leave them alone skip the rollup work"""
+    instance._rollup_values = RollupService.tracked_values(instance)
+
+
+@receiver(pre_save, sender=CitizenRequest)
+def capture_request_rollup_snapshot(sender, instance, update_fields=None, **kwargs):
+    """Remember what the row looked like before this save, if it can change rollups"""
+    instance._rollup_changed = RollupService.may_change_rollups(instance, update_fields)
+    instance._rollup_snapshot = None
+    if instance._rollup_changed and not instance._state.adding:
+        instance._rollup_snapshot = RollupService.snapshot_from_db(instance.pk)
+
+
+@receiver(post_save, sender=CitizenRequest)
+def update_request_rollups(sender, instance, update_fields=None, **kwargs):
+    """Move the request's counts to the rollup rows matching its new state"""
+    if not getattr(instance, '_rollup_changed', True):
+        return
+    RollupService.remember_saved_values(instance, update_fields)
+
+    old_snapshot = getattr(instance, '_rollup_snapshot', None)
+    new_snapshot = RollupService.snapshot_from_instance(instance, old_snapshot)
+    if old_snapshot == new_snapshot:
+        return
+    transaction.on_commit(lambda: _apply_rollup_change(old_snapshot, new_snapshot))
+
+
+@receiver(pre_delete, sender=CitizenRequest)
+def capture_deleted_request_rollup_snapshot(sender, instance, **kwargs):
+    instance._rollup_snapshot = RollupService.snapshot_from_db(instance.pk)
+
+
+@receiver(post_delete, sender=CitizenRequest)
+def remove_request_from_rollups(sender, instance, **kwargs):
+    old_snapshot = getattr(instance, '_rollup_snapshot', None)
+    transaction.on_commit(lambda: _apply_rollup_change(old_snapshot, None))
+
+
+def _apply_rollup_change(old_snapshot, new_snapshot):
+    # Analytics must never break request handling - the periodic reconcile heals misses
+    try:
+        RollupService.apply_change(old_snapshot, new_snapshot)
+    except Exception as e:
+        logger.warning(f"Failed to update request rollups: {e}")
+
+
+@receiver(post_init, sender=CitizenRequest)
+def remember_request_search_values(sender, instance, **kwargs):
+    """Indexed columns as loaded - saves that leave them alone skip re-indexing"""
+    instance._search_values = REQUEST_SEARCH.indexed_values(instance)
+
+
+@receiver(post_save, sender=CitizenRequest)
+def index_request_for_search(sender, instance, created=False, update_fields=None, **kwargs):
+    """Keep the full-text index in step with the request text, summary and case code"""
+    if not REQUEST_SEARCH.needs_reindex(instance, created, update_fields):
+        return
+    if update_fields is None:
+        instance._search_values = REQUEST_SEARCH.indexed_values(instance)
+
+    request_id = instance.pk
+    transaction.on_commit(lambda: _update_search_index([request_id]))
+
+
+@receiver(post_delete, sender=CitizenRequest)
+def remove_request_from_search(sender, instance, **kwargs):
+    request_id = instance.pk
+    transaction.on_commit(lambda: _remove_from_search_index([request_id]))
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_reporter_search_values(sender, instance, **kwargs):
+    """Reporter fields as loaded - logins and other saves that leave them alone skip re-indexing"""
+    instance._search_reporter_values = REQUEST_SEARCH.reporter_values(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def reindex_reporter_requests(sender, instance, created=False, update_fields=None, **kwargs):
+    """Reporter names are indexed with every request they filed"""
+    if not REQUEST_SEARCH.reporter_needs_reindex(instance, created, update_fields):
+        return
+    if update_fields is None:
+        instance._search_reporter_values = REQUEST_SEARCH.reporter_values(instance)
+
+    request_ids = list(CitizenRequest.objects.filter(user=instance).values_list('pk', flat=True))
+    if request_ids:
+        transaction.on_commit(lambda: _update_search_index(request_ids))
+
+
+def _update_search_index(request_ids):
+    # Search must never break request handling - rebuild_request_search_index heals misses
+    try:
+        REQUEST_SEARCH.index(request_ids)
+    except Exception as e:
+        logger.warning(f"Failed to update request search index: {e}")
+
+
+def _remove_from_search_index(request_ids):
+    try:
+        REQUEST_SEARCH.remove(request_ids)
+    except Exception as e:
+        logger.warning(f"Failed to remove requests from search index: {e}")
+
+
+@receiver(connection_created)
+def count_pipeline_stage_queries(sender, connection, **kwargs):
+    """Every new DB connection attributes its queries to the running pipeline stage"""
+    install_query_counter(connection)
@@ -1,14 +1,34 @@
 from celery import shared_task
+from celery.signals import worker_process_init, worker_ready
 from django.utils import timezone
 from django.conf import settings
-from apps.depts.services.simplified_emergency_pipeline import SimplifiedEmergencyPipeline, EmergencyRequest
+from apps.depts.services.simplified_emergency_pipeline import SIMPLIFIED_EMERGENCY_PIPELINE, EmergencyRequest
+from apps.depts.services.service_registry import SERVICE_REGISTRY
 from apps.depts.models import CitizenRequest, ActionLog, Location, City
 import logging
-
-from call_agent import EmergencyCallAgent
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+
+@worker_ready.connect
+@worker_process_init.connect
+def warm_up_voice_calls(**kwargs):
+    """
+    Resolve the shared VAPI emergency assistant when a worker (or prefork child)
+    starts, so the first critical call dials without creating it. Runs in a thread -
+    Celery kills a child whose process-init handlers take longer than 4 seconds.
+    """
+    if not settings.VAPI_WARMUP_ON_WORKER_START or not os.getenv("VAPI_API_KEY"):
+        return
+
+    def warm_up():
+        if SERVICE_REGISTRY.get("vapi_call_agent").warm_up():
+            logger.info("📞 VAPI emergency assistant ready")
+
+    threading.Thread(target=warm_up, name="vapi-warmup", daemon=True).start()
+
 @shared_task(bind=True, max_retries=3)
 def process_emergency_request_task(self, request_data):
     """
@@ -18,7 +38,8 @@ def process_emergency_request_task(self, request_data):
         logger.info(f"Starting emergency request processing")
         logger.info(f"Request data: {request_data}")
 
-        pipeline = SimplifiedEmergencyPipeline()
+        # Built on the worker's first request, then reused
+        pipeline = SIMPLIFIED_EMERGENCY_PIPELINE
 
    
         emergency_request = EmergencyRequest(
@@ -31,11 +52,17 @@ def process_emergency_request_task(self, request_data):
                 "latitude": request_data.get('latitude')
             },
             user_id=request_data.get('user_id'),
-            user_name=request_data.get('user_name')
+            user_name=request_data.get('user_name'),
+            stream_id=self.request.id,
+            final_attempt=self.request.retries >= self.max_retries
         )
         logger.info(f"Emergency request: {emergency_request}")
         result = pipeline.process_emergency_request(emergency_request)
 
+        # Completed stages are checkpointed, so a retry only redoes what failed
+        if not result.success:
+            raise Exception(result.error_message or "Emergency pipeline failed")
+
         logger.info(f"Emergency request processing completed: {result}")
 
         return {
@@ -46,8 +73,8 @@ def process_emergency_request_task(self, request_data):
     except Exception as e:
         logger.error(f"Error in process_emergency_request_task: {str(e)}")
 
-        # Retry the task after 30 seconds
-        raise self.retry(countdown=30, exc=e)
+        # Retries resume from the last checkpointed stage, so back off briefly: 5s, 10s, 20s
+        raise self.retry(countdown=5 * 2 ** self.request.retries, exc=e)
 
 
 @shared_task
@@ -59,7 +86,8 @@ def make_emergency_call_task(phone_number: str, call_reason: str, context_data:
 
         logger.info(f"Making emergency call to {phone_number} for {call_reason}")
 
-        agent = EmergencyCallAgent()
+        # Same pooled voice client as the pipeline and VoiceActionService
+        agent = SERVICE_REGISTRY.get("vapi_call_agent")
         result = agent.make_emergency_call(
             phone_number=phone_number,
             call_reason=call_reason,
@@ -97,4 +125,20 @@ def follow_up_emergency_task(citizen_request_id: int):
 
     except Exception as e:
         logger.error(f"Error in follow_up_emergency_task: {str(e)}")
-        return {'success': False, 'error': str(e)}
\ No newline at end of file
+        return {'success': False, 'error': str(e)}
+
+@shared_task
+def reconcile_request_rollups_task(hours: int = 48):
+    """
+    Periodic task rebuilding recent RequestRollup rows from CitizenRequest,
+    healing counts missed by bulk updates or failed signal handlers
+    """
+    from apps.depts.services.rollup_service import reconcile_recent
+
+    try:
+        rows = reconcile_recent(hours)
+        return {'success': True, 'rows': rows}
+
+    except Exception as e:
+        logger.error(f"Error in reconcile_request_rollups_task: {str(e)}")
+        return {'success': False, 'error': str(e)}
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.depts.services.actions import action_loop
+from apps.depts.services.actions.action_executor import ActionExecutor
+from apps.depts.services.actions.action_loop import ACTION_LOOP, PrioritySlots, PriorityWorkerPool
+from apps.depts.services.trigger_orchestrator_service import ActionPriority, EmailAction, SMSAction
+
+
+def sms(priority, phone='+923001234567', **fields):
+    return SMSAction(
+        priority=priority, title=f'{priority.value} SMS', description='Test SMS',
+        estimated_duration='30 seconds', recipient_phone=phone, message='Help is on the way', **fields
+    )
+
+
+class RecordingSMSService:
+    """Awaitable SMS channel that records the order sends start in"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.started = []
+        self.finished = []
+        self.cancelled = []
+
+    async def execute_sms_action_async(self, action):
+        self.started.append(action.priority.value)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(action.priority.value)
+            raise
+        if self.error:
+            raise self.error
+        self.finished.append(action.priority.value)
+        return {'success': True, 'status': 'sent', 'action_type': action.action_type.value}
+
+
+class BlockingEmailService:
+    """SMTP-style channel with only a blocking send"""
+
+    def __init__(self):
+        self.threads = []
+
+    def execute_email_action(self, action):
+        self.threads.append(threading.current_thread().name)
+        return {'success': True, 'status': 'sent', 'action_type': action.action_type.value}
+
+
+class ActionExecutorTests(SimpleTestCase):
+    """Sends run on the shared action loop in priority order, bounded by their timeout"""
+
+    def setUp(self):
+        self.executor = ActionExecutor()
+
+    def test_actions_start_in_priority_order(self):
+        self.executor.sms_service = RecordingSMSService()
+        actions = [sms(ActionPriority.SCHEDULED), sms(ActionPriority.NORMAL),
+                   sms(ActionPriority.IMMEDIATE), sms(ActionPriority.URGENT)]
+
+        ACTION_LOOP.run(asyncio.sleep(0))  # make sure the loop and its slots exist
+        with mock.patch.object(ACTION_LOOP._slots, 'limit', 1):
+            result = self.executor.execute_multiple_actions(actions)
+
+        self.assertEqual(self.executor.sms_service.started, ['critical', 'high', 'medium', 'low'])
+        self.assertEqual(result['successful_actions'], 4)
+        self.assertEqual(result['execution_mode'], 'parallel')
+
+    def test_timeout_cancels_a_send_in_flight(self):
+        self.executor.sms_service = RecordingSMSService(delay=5)
+        actions = [sms(ActionPriority.IMMEDIATE, timeout_seconds=0.1), sms(ActionPriority.NORMAL, timeout_seconds=0.1)]
+
+        started = time.monotonic()
+        result = self.executor.execute_multiple_actions(actions)
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(result['failed_actions'], 2)
+        self.assertEqual({outcome['status'] for outcome in result['results']}, {'timeout'})
+        self.assertEqual(sorted(self.executor.sms_service.cancelled), ['critical', 'medium'])
+        self.assertEqual(self.executor.sms_service.finished, [])
+
+    def test_failed_send_is_reported(self):
+        self.executor.sms_service = RecordingSMSService(error=RuntimeError('Twilio unavailable'))
+
+        result = self.executor.execute_multiple_actions([sms(ActionPriority.URGENT), sms(ActionPriority.NORMAL)])
+
+        self.assertEqual(result['failed_actions'], 2)
+        for outcome in result['results']:
+            self.assertFalse(outcome['success'])
+            self.assertEqual(outcome['error'], 'Twilio unavailable')
+            self.assertEqual(outcome['action_type'], 'sms')
+
+    def test_blocking_channel_runs_on_worker_threads(self):
+        self.executor.email_service = BlockingEmailService()
+        email = EmailAction(
+            priority=ActionPriority.URGENT, title='Alert', description='Test email',
+            estimated_duration='1 minute', recipient_email='ops@example.com', subject='Fire', body='Shop on fire'
+        )
+
+        result = self.executor.execute_single_action(email)
+
+        self.assertTrue(result['success'])
+        self.assertTrue(self.executor.email_service.threads[0].startswith('action-worker'))
+
+
+class PrioritySlotsTests(SimpleTestCase):
+    """Waiting sends are admitted lowest rank first, whatever order they arrived in"""
+
+    def test_waiters_admitted_by_rank(self):
+        async def scenario():
+            slots = PrioritySlots(limit=1)
+            admitted = []
+
+            async def send(rank):
+                await slots.acquire(rank)
+                admitted.append(rank)
+                slots.release()
+
+            await slots.acquire(0)
+            waiting = [asyncio.ensure_future(send(rank)) for rank in (3, 2, 0, 1)]
+            await asyncio.sleep(0)
+            slots.release()
+            await asyncio.gather(*waiting)
+            return admitted
+
+        self.assertEqual(asyncio.run(scenario()), [0, 1, 2, 3])
+
+    def test_cancelled_waiter_does_not_leak_the_slot(self):
+        async def scenario():
+            slots = PrioritySlots(limit=1)
+            await slots.acquire(0)
+            waiter = asyncio.ensure_future(slots.acquire(1))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            slots.release()
+            await asyncio.wait_for(slots.acquire(2), timeout=1)
+            return slots._active
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+
+
+class PriorityWorkerPoolTests(SimpleTestCase):
+    """Workers keep their DB connection across calls and close it once when they retire"""
+
+    def test_connection_closed_once_per_worker(self):
+        pool = PriorityWorkerPool(max_workers=1, idle_seconds=0.05)
+
+        with mock.patch.object(action_loop, 'connection') as connection:
+            results = [pool.submit(0, lambda value=value: value * 2).result(timeout=5) for value in range(3)]
+
+            deadline = time.monotonic() + 5
+            while pool._workers and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual(results, [0, 2, 4])
+        self.assertEqual(pool._workers, 0)
+        connection.close.assert_called_once_with()
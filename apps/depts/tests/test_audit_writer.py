@@ -0,0 +1,101 @@
+import subprocess
+import sys
+import textwrap
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import ActionType
+from apps.depts.models import ActionLog, CitizenRequest, NotificationLog
+from apps.depts.services.audit_writer import AuditWriter
+
+
+def inserts(queries):
+    return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+
+
+class AuditWriterBatchTests(TemporaryMediaRootMixin, TestCase):
+    """Buffered rows are written with one INSERT per model, scoped to a request when asked"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email='audit@example.com', password='secret', first_name='Hina')
+        cls.first = CitizenRequest.objects.create(user=user, request_text='Shop on fire')
+        cls.second = CitizenRequest.objects.create(user=user, request_text='Car stolen')
+
+    def log(self, writer, citizen_request, count):
+        for index in range(count):
+            writer.add(ActionLog(citizen_request=citizen_request, description=f'Step {index}'))
+
+    def test_flush_batches_per_model(self):
+        writer = AuditWriter(flush_interval_seconds=0)
+        self.log(writer, self.first, 5)
+        writer.add(NotificationLog(
+            citizen_request=self.first, notification_type=ActionType.SMS_SENT,
+            recipient='+923001234567', message='Help is on the way'
+        ))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(writer.flush(), 6)
+
+        self.assertEqual(len(inserts(queries)), 2)
+        self.assertEqual(ActionLog.objects.filter(citizen_request=self.first).count(), 5)
+        self.assertEqual(NotificationLog.objects.filter(citizen_request=self.first).count(), 1)
+
+    def test_scoped_flush_leaves_other_requests_buffered(self):
+        writer = AuditWriter(flush_interval_seconds=0)
+        self.log(writer, self.first, 3)
+        self.log(writer, self.second, 2)
+
+        self.assertEqual(writer.flush(citizen_request_id=self.first.id), 3)
+        self.assertFalse(ActionLog.objects.filter(citizen_request=self.second).exists())
+        self.assertEqual(len(writer.pending(ActionLog)), 2)
+
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(ActionLog.objects.filter(citizen_request=self.second).count(), 2)
+
+    def test_full_buffer_flushes_immediately(self):
+        writer = AuditWriter(flush_interval_seconds=0, max_buffered_rows=3)
+        self.log(writer, self.first, 3)
+
+        self.assertEqual(writer.pending(ActionLog), [])
+        self.assertEqual(ActionLog.objects.filter(citizen_request=self.first).count(), 3)
+
+
+class AuditWriterTimerTests(SimpleTestCase):
+    """Rows are written on a short timer, and by the atexit hook when the process ends"""
+
+    def test_timer_flushes_buffered_rows(self):
+        writer = AuditWriter(flush_interval_seconds=0.05)
+        written = threading.Event()
+        writer._write = lambda model, rows: written.set() or len(rows)
+
+        writer.add(ActionLog(citizen_request_id='REQ-1', description='Buffered'))
+
+        self.assertTrue(written.wait(timeout=5))
+        self.assertEqual(writer.pending(ActionLog), [])
+
+    def test_buffered_rows_written_at_exit(self):
+        script = textwrap.dedent("""
+            import django
+            django.setup()
+
+            from apps.depts.models import ActionLog
+            from apps.depts.services.audit_writer import AUDIT_WRITER
+
+            AUDIT_WRITER.flush_interval_seconds = 0
+            AUDIT_WRITER._write = lambda model, rows: print(f"wrote {len(rows)} {model.__name__}") or len(rows)
+            AUDIT_WRITER.add(ActionLog(citizen_request_id='REQ-1', description='Buffered at exit'))
+        """)
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=120
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('wrote 1 ActionLog', result.stdout)
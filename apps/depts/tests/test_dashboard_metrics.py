@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.db.models import Avg
+from django.test import TestCase
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import CaseStatus
+from apps.depts.models import ActionLog, CitizenRequest
+from apps.depts.services.dashboard_metrics_service import ACTIVE_STATUSES, DashboardMetricsService, _percentage_change
+from apps.depts.services.rollup_service import RollupService
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def baseline_kpis(now):
+    """The dashboard's original per-card CitizenRequest queries"""
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_of_month = start_of_today.replace(day=1)
+    start_of_last_month = (start_of_month - timedelta(days=1)).replace(day=1)
+    same_day_last_month = start_of_last_month + timedelta(days=now.day - 1)
+    last_month = CitizenRequest.objects.filter(created_at__gte=start_of_last_month, created_at__lt=start_of_month)
+
+    current_month_requests = CitizenRequest.objects.filter(created_at__gte=start_of_month).count()
+    active_cases = CitizenRequest.objects.filter(status__in=ACTIVE_STATUSES).count()
+    resolved = CitizenRequest.objects.filter(status=CaseStatus.RESOLVED)
+    resolved_today = resolved.filter(resolved_at__gte=start_of_today).count()
+    resolved_last_month_same_day = resolved.filter(
+        resolved_at__gte=same_day_last_month, resolved_at__lt=same_day_last_month + timedelta(days=1)
+    ).count()
+    avg_response_time = ActionLog.objects.filter(
+        success=True, completed_at__isnull=False, duration_seconds__isnull=False
+    ).aggregate(avg=Avg('duration_seconds'))['avg'] or 0
+
+    return {
+        'total_requests': CitizenRequest.objects.count(),
+        'jobs_percentage_change': _percentage_change(current_month_requests, last_month.count()),
+        'active_cases': active_cases,
+        'resumes_percentage_change': _percentage_change(
+            active_cases, last_month.filter(status__in=ACTIVE_STATUSES).count()
+        ),
+        'resolved_today': resolved_today,
+        'applications_percentage_change': _percentage_change(resolved_today, resolved_last_month_same_day),
+        'avg_response_time_minutes': round(avg_response_time / 60, 1) if avg_response_time else 14.0,
+        'match_rate_percentage_change': 5.2,
+    }
+
+
+class DashboardMetricsTests(TemporaryMediaRootMixin, TestCase):
+    """Rollup-backed KPIs agree with counting CitizenRequest directly"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='dashboard@example.com', password='secret', first_name='Sana')
+        rows = [
+            # created, status, resolved
+            (NOW - timedelta(hours=2), CaseStatus.SUBMITTED, None),
+            (NOW - timedelta(hours=5), CaseStatus.RESOLVED, NOW - timedelta(hours=1)),
+            (NOW - timedelta(days=3), CaseStatus.IN_PROGRESS, None),
+            (NOW - timedelta(days=20), CaseStatus.ASSIGNED, None),
+            (NOW - timedelta(days=31), CaseStatus.RESOLVED, NOW - timedelta(days=30, hours=2)),
+            (NOW - timedelta(days=40), CaseStatus.SUBMITTED, None),
+            (NOW - timedelta(days=90), CaseStatus.CLOSED, None),
+        ]
+        for index, (created_at, status, resolved_at) in enumerate(rows):
+            request_obj = CitizenRequest.objects.create(user=cls.user, request_text=f'Request {index}')
+            # Backdate without signals, as a bulk import would
+            CitizenRequest.objects.filter(pk=request_obj.pk).update(
+                created_at=created_at, status=status, resolved_at=resolved_at
+            )
+            ActionLog.objects.create(
+                citizen_request=request_obj, description='Dispatched', completed_at=created_at,
+                duration_seconds=60 * (index + 1)
+            )
+        RollupService.reconcile()
+
+    def test_kpis_match_direct_counts(self):
+        with mock.patch('django.utils.timezone.now', return_value=NOW):
+            kpis = DashboardMetricsService.compute_kpis()
+            expected = baseline_kpis(NOW)
+
+        self.assertEqual(kpis, expected)
+        self.assertEqual(kpis['total_requests'], 7)
+        self.assertEqual(kpis['active_cases'], 4)
+        self.assertEqual(kpis['resolved_today'], 1)
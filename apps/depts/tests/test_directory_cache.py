@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import DepartmentCategory, EntityType, Province
+from apps.depts.models import City, Department, DepartmentEntity, Location
+from apps.depts.services.audit_writer import AUDIT_WRITER
+from apps.depts.services.database_service import EmergencyDatabaseService
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
+from apps.depts.services.matcher_service import EntityInfo, MatcherOutput
+
+
+class DepartmentDirectoryInvalidationTests(TestCase):
+    """Edits to departments and entities reach the directory snapshot once committed"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Karachi', province=Province.SINDH)
+        cls.department = Department.objects.create(name='Sindh Police', category=DepartmentCategory.POLICE)
+        cls.entity = DepartmentEntity.objects.create(
+            name='Clifton Police Station', type=EntityType.POLICE_STATION,
+            department=cls.department, city=city
+        )
+
+    def setUp(self):
+        DEPARTMENT_DIRECTORY.invalidate()
+
+    def save_and_commit(self, instance, **changes):
+        for field, value in changes.items():
+            setattr(instance, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+
+    def test_entity_save_reloads_directory(self):
+        self.assertEqual(DEPARTMENT_DIRECTORY.entity(self.entity.id).name, 'Clifton Police Station')
+
+        self.save_and_commit(DepartmentEntity.objects.get(pk=self.entity.pk), name='Boat Basin Police Station')
+        self.assertEqual(DEPARTMENT_DIRECTORY.entity(self.entity.id).name, 'Boat Basin Police Station')
+        self.assertIsNotNone(DEPARTMENT_DIRECTORY.entity_by_name('Boat Basin Police Station'))
+
+        self.save_and_commit(DepartmentEntity.objects.get(pk=self.entity.pk), is_active=False)
+        self.assertIsNone(DEPARTMENT_DIRECTORY.entity(self.entity.id))
+
+    def test_department_save_reloads_directory(self):
+        self.assertEqual(DEPARTMENT_DIRECTORY.department_for_category(DepartmentCategory.POLICE).id, self.department.id)
+        self.assertEqual(len(DEPARTMENT_DIRECTORY.entities_for_department(self.department.id)), 1)
+
+        self.save_and_commit(Department.objects.get(pk=self.department.pk), is_active=False)
+        self.assertIsNone(DEPARTMENT_DIRECTORY.department_for_category(DepartmentCategory.POLICE))
+        self.assertEqual(DEPARTMENT_DIRECTORY.entities_for_department(self.department.id), [])
+
+
+class MatchedEntityResolutionTests(TestCase):
+    """The assigned entity is resolved by primary key, and only while it is still active"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Quetta', province=Province.BALOCHISTAN)
+        department = Department.objects.create(name='Balochistan Police', category=DepartmentCategory.POLICE)
+        cls.entities = [
+            DepartmentEntity.objects.create(
+                name='Civil Lines Police Station', type=EntityType.POLICE_STATION,
+                department=department, city=city, phone=phone
+            )
+            for phone in ('+92819201111', '+92819202222')
+        ]
+
+    def setUp(self):
+        DEPARTMENT_DIRECTORY.invalidate()
+
+    def matched(self, entity_id):
+        entity = EntityInfo(id=entity_id, name='Civil Lines Police Station', city='Quetta', match_reason='same_city')
+        return MatcherOutput(success=True, matched_entity=entity, match_strategy='city')
+
+    def test_same_named_entities_resolve_to_the_matched_one(self):
+        for entity in self.entities:
+            self.assertEqual(EmergencyDatabaseService._get_entity_id(self.matched(entity.id)), entity.id)
+
+    def test_inactive_or_removed_entity_is_not_assigned(self):
+        inactive, removed = self.entities
+        removed_id = removed.id  # delete() clears the pk
+        with self.captureOnCommitCallbacks(execute=True):
+            DepartmentEntity.objects.filter(pk=inactive.pk).update(is_active=False)
+            removed.delete()
+        DEPARTMENT_DIRECTORY.invalidate()  # update() skips the signals
+
+        self.assertIsNone(EmergencyDatabaseService._get_entity_id(self.matched(inactive.id)))
+        self.assertIsNone(EmergencyDatabaseService._get_entity_id(self.matched(removed_id)))
+        self.assertIsNone(EmergencyDatabaseService._get_entity_id(
+            MatcherOutput(success=False, match_strategy='none')
+        ))
+
+
+class DirectoryVersionTests(TemporaryMediaRootMixin, TestCase):
+    """Only reference data edits bump the directory version - request intake never does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Lahore', province=Province.PUNJAB)
+        cls.location = Location.objects.create(city=cls.city, area='Gulberg')
+        department = Department.objects.create(name='Punjab Police', category=DepartmentCategory.POLICE)
+        DepartmentEntity.objects.create(
+            name='Gulberg Police Station', type=EntityType.POLICE_STATION,
+            department=department, city=cls.city, location=cls.location
+        )
+
+    def bumps(self, action):
+        with mock.patch.object(DEPARTMENT_DIRECTORY, 'bump_version') as bump_version:
+            with self.captureOnCommitCallbacks(execute=True):
+                action()
+        return bump_version.call_count
+
+    def test_intake_leaves_version_unchanged(self):
+        # Intake buffers its ActionLog - write it while the test database exists
+        self.addCleanup(AUDIT_WRITER.flush)
+        for city_name in ('Lahore', 'Okara'):
+            request_data = {
+                'request_text': 'Two cars collided on the main road',
+                'user_email': f'citizen-{city_name.lower()}@example.com',
+                'user_name': 'Ali',
+                'user_city': city_name,
+                'user_coordinates': {'lat': 31.5204, 'lng': 74.3587},
+            }
+            create = lambda: EmergencyDatabaseService.create_citizen_request(request_data, f'EMR-{city_name}')
+            self.assertEqual(self.bumps(create), 0, city_name)
+
+        self.assertTrue(City.objects.filter(name='Okara').exists())
+
+    def test_reference_edits_bump_version(self):
+        unreferenced = Location.objects.create(city=self.city, area='Model Town')
+
+        unreferenced.area = 'Model Town Block C'
+        self.assertEqual(self.bumps(unreferenced.save), 0)
+
+        self.location.formatted_address = 'Main Boulevard, Gulberg III, Lahore'
+        self.assertEqual(self.bumps(self.location.save), 1)
+
+        self.city.name = 'Lahore Cantt'
+        self.assertEqual(self.bumps(self.city.save), 1)
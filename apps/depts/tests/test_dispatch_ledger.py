@@ -0,0 +1,157 @@
+import asyncio
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import ActionType
+from apps.depts.models import CitizenRequest, NotificationLog
+from apps.depts.services.actions import dispatch_ledger
+from apps.depts.services.actions.action_loop import ACTION_LOOP
+from apps.depts.services.actions.dispatch_ledger import (
+    LEDGER_KEY_PREFIX, STATUS_DUPLICATE, DispatchLedger, dispatch_key
+)
+from apps.depts.services.audit_writer import AUDIT_WRITER
+
+RECIPIENT = '+923001234567'
+MESSAGE = 'Help is on the way'
+
+
+class LedgerStandIn:
+    """SET NX / SET / DELETE of the Redis claim keys, backed by a dict"""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class Sender:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes) or [{'success': True, 'message_id': 'SM1'}]
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        outcome = self.outcomes[min(self.calls, len(self.outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class DispatchLedgerTests(TemporaryMediaRootMixin, TestCase):
+    """A notification goes out once per case, however often it is dispatched"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email='ledger@example.com', password='secret', first_name='Imran')
+        cls.request_obj = CitizenRequest.objects.create(user=user, request_text='Shop on fire')
+
+    def setUp(self):
+        self.ledger = DispatchLedger()
+        self.redis = None
+        for target, attribute, value in (
+            (dispatch_ledger, 'get_redis_client', lambda: self.redis),
+            (AUDIT_WRITER, 'flush_interval_seconds', 0),
+        ):
+            patcher = mock.patch.object(target, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(AUDIT_WRITER.flush)
+
+    def dispatch(self, send, recipient=RECIPIENT, content=MESSAGE):
+        return self.ledger.dispatch(self.request_obj.case_code, ActionType.SMS_SENT, recipient, content, send)
+
+    def test_repeat_dispatch_is_skipped(self):
+        send = Sender()
+
+        self.assertTrue(self.dispatch(send)['success'])
+        # Same recipient written differently, while the first log row is still buffered
+        repeat = self.dispatch(send, recipient=f'  {RECIPIENT} ')
+
+        self.assertEqual(repeat['status'], STATUS_DUPLICATE)
+        self.assertEqual(send.calls, 1)
+
+        self.assertEqual(self.dispatch(send, content='Officers are 5 minutes away')['success'], True)
+        self.assertEqual(send.calls, 2)
+
+    def test_logged_send_is_skipped_after_flush(self):
+        self.dispatch(Sender())
+        AUDIT_WRITER.flush(citizen_request_id=self.request_obj.id)
+
+        log = NotificationLog.objects.get(citizen_request=self.request_obj)
+        self.assertEqual(log.dedup_key, dispatch_key(self.request_obj.case_code, ActionType.SMS_SENT, RECIPIENT, MESSAGE))
+        self.assertEqual(log.external_id, 'SM1')
+
+        send = Sender()
+        self.assertEqual(self.dispatch(send)['status'], STATUS_DUPLICATE)
+        self.assertEqual(send.calls, 0)
+
+    def test_failed_or_raising_send_can_be_retried(self):
+        self.redis = LedgerStandIn()
+        send = Sender(
+            {'success': False, 'error': 'Twilio unavailable'},
+            ConnectionError('reset by peer'),
+            {'success': True, 'message_id': 'SM2'},
+        )
+
+        self.assertFalse(self.dispatch(send)['success'])
+        with self.assertRaises(ConnectionError):
+            self.dispatch(send)
+        self.assertTrue(self.dispatch(send)['success'])
+        self.assertEqual(send.calls, 3)
+        self.assertEqual(list(self.redis.values.values()), ['sent'])
+
+    def test_claim_held_by_another_worker_is_skipped(self):
+        self.redis = LedgerStandIn()
+        key = dispatch_key(self.request_obj.case_code, ActionType.SMS_SENT, RECIPIENT, MESSAGE)
+        self.redis.values[LEDGER_KEY_PREFIX + key] = 'pending'
+
+        send = Sender()
+        self.assertEqual(self.dispatch(send)['status'], STATUS_DUPLICATE)
+        self.assertEqual(send.calls, 0)
+
+    def test_sends_without_case_or_recipient_are_not_deduplicated(self):
+        send = Sender()
+        for _ in range(2):
+            self.ledger.dispatch(None, ActionType.SMS_SENT, RECIPIENT, MESSAGE, send)
+        self.assertEqual(send.calls, 2)
+
+
+class DispatchLedgerAsyncTests(TransactionTestCase):
+    """A send cancelled by its timeout releases the claim for the retry"""
+
+    def test_cancelled_send_releases_claim(self):
+        redis = LedgerStandIn()
+        ledger = DispatchLedger()
+        sent = []
+
+        async def hang():
+            await asyncio.sleep(5)
+
+        async def succeed():
+            sent.append(True)
+            return {'success': True}
+
+        def dispatch(send, timeout):
+            return ACTION_LOOP.run(asyncio.wait_for(
+                ledger.dispatch_async('C-LEDGER01', ActionType.SMS_SENT, RECIPIENT, MESSAGE, send), timeout
+            ))
+
+        with mock.patch.object(dispatch_ledger, 'get_redis_client', return_value=redis):
+            with self.assertRaises(asyncio.TimeoutError):
+                dispatch(hang, timeout=0.2)
+            self.assertEqual(redis.values, {})
+
+            self.assertTrue(dispatch(succeed, timeout=5)['success'])
+            self.assertEqual(dispatch(succeed, timeout=5)['status'], STATUS_DUPLICATE)
+
+        self.assertEqual(sent, [True])
@@ -0,0 +1,161 @@
+import random
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.depts.choices import DepartmentCategory, EntityType, Province
+from apps.depts.models import City, Department, DepartmentEntity, Location
+from apps.depts.services.geo_index import CITY_COORDINATE_INDEX, ENTITY_GEO_INDEX, CityCoordinateIndex, EntityGeoIndex
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
+from apps.depts.services.matcher_service import MatcherInput, MatcherService
+
+
+def random_point(rng):
+    """(lat, lng) somewhere over Pakistan, at the precision Location stores"""
+    return round(rng.uniform(24.0, 36.5), 6), round(rng.uniform(61.0, 77.5), 6)
+
+
+def brute_force_nearest(points, lat, lng, k):
+    """[(key, km)] of the k closest {key: (lat, lng)} by haversine"""
+    distances = [(MatcherService.calculate_distance(lat, lng, *point), key) for key, point in points.items()]
+    return [(key, distance) for distance, key in sorted(distances)[:k]]
+
+
+class EntityGeoIndexTests(TestCase):
+    """k-d tree answers match a haversine scan, and committed entity edits rebuild the department"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        city = City.objects.create(name='Lahore', province=Province.PUNJAB)
+        cls.department = Department.objects.create(name='Punjab Police', category=DepartmentCategory.POLICE)
+        cls.points = {}
+        for index in range(40):
+            lat, lng = random_point(rng)
+            location = Location.objects.create(city=city, lat=Decimal(str(lat)), lng=Decimal(str(lng)))
+            entity = DepartmentEntity.objects.create(
+                name=f'Station {index}', type=EntityType.POLICE_STATION,
+                department=cls.department, city=city, location=location
+            )
+            cls.points[entity.id] = (lat, lng)
+
+    def setUp(self):
+        ENTITY_GEO_INDEX.invalidate()
+
+    def test_nearest_matches_haversine_brute_force(self):
+        index = EntityGeoIndex()
+        rng = random.Random(11)
+        for _ in range(25):
+            lat, lng = random_point(rng)
+            found = index.nearest(self.department.id, lat, lng, k=4)
+            expected = brute_force_nearest(self.points, lat, lng, 4)
+
+            self.assertEqual([entity_id for entity_id, _ in found], [entity_id for entity_id, _ in expected])
+            for (_, distance), (_, expected_distance) in zip(found, expected):
+                self.assertAlmostEqual(distance, expected_distance, delta=1e-6)
+
+    def test_entity_save_rebuilds_its_department_after_commit(self):
+        entity_id, (lat, lng) = next(iter(self.points.items()))
+        self.assertEqual(ENTITY_GEO_INDEX.nearest(self.department.id, lat, lng, k=1)[0][0], entity_id)
+
+        entity = DepartmentEntity.objects.get(pk=entity_id)
+        entity.is_active = False
+        with self.captureOnCommitCallbacks() as callbacks:
+            entity.save()
+            # Still uncommitted - the tree is left alone
+            self.assertEqual(ENTITY_GEO_INDEX.nearest(self.department.id, lat, lng, k=1)[0][0], entity_id)
+
+        for callback in callbacks:
+            callback()
+        nearest = [found for found, _ in ENTITY_GEO_INDEX.nearest(self.department.id, lat, lng, k=40)]
+        self.assertNotIn(entity_id, nearest)
+        self.assertEqual(len(nearest), 39)
+
+
+class NearestEntityMatchTests(TestCase):
+    """Distance matching returns the routed department's closest entity, however far away"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Multan', province=Province.PUNJAB)
+        # The matcher routes to the category's first department by pk (ids are random)
+        cls.department, other = sorted(
+            [Department.objects.create(name=name, category=DepartmentCategory.FIRE_BRIGADE)
+             for name in ('Rescue 1122', 'Private Fire Service')],
+            key=lambda department: department.pk
+        )
+
+        def entity(department, name, lat, lng):
+            location = Location.objects.create(city=city, lat=Decimal(lat), lng=Decimal(lng))
+            return DepartmentEntity.objects.create(
+                name=name, type=EntityType.FIRE_STATION, department=department, city=city, location=location
+            )
+
+        # Four of the other department's stations sit right next to the caller
+        for index in range(4):
+            entity(other, f'Private Station {index}', f'30.19{index}000', '71.470000')
+        cls.far_station = entity(cls.department, 'Rescue Station', '30.240000', '71.470000')
+
+    def setUp(self):
+        ENTITY_GEO_INDEX.invalidate()
+        DEPARTMENT_DIRECTORY.invalidate()
+
+    def test_department_entity_found_past_other_departments(self):
+        self.assertEqual(DEPARTMENT_DIRECTORY.department_for_category(DepartmentCategory.FIRE_BRIGADE).id, self.department.id)
+
+        result = MatcherService.find_best_entity(MatcherInput(
+            department_category=DepartmentCategory.FIRE_BRIGADE,
+            user_location={'lat': 30.19, 'lng': 71.47}
+        ))
+
+        self.assertTrue(result.success, result.error_message)
+        self.assertEqual(result.matched_entity.id, self.far_station.id)
+        self.assertEqual(result.match_strategy, 'distance_match')
+
+
+class CityCoordinateIndexTests(TestCase):
+    """Vectorized nearest-city lookups match a haversine scan, in batches and after edits"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(3)
+        cls.points = {}
+        for index in range(30):
+            lat, lng = random_point(rng)
+            city = City.objects.create(
+                name=f'City {index}', province=Province.PUNJAB,
+                latitude=Decimal(str(lat)), longitude=Decimal(str(lng))
+            )
+            cls.points[city.id] = (lat, lng)
+
+    def setUp(self):
+        CITY_COORDINATE_INDEX.invalidate()
+
+    def expected_city(self, lat, lng, max_distance_km):
+        city_id, distance = brute_force_nearest(self.points, lat, lng, 1)[0]
+        return city_id if distance <= max_distance_km else None
+
+    def test_nearest_many_matches_haversine_brute_force(self):
+        rng = random.Random(5)
+        coordinates = [random_point(rng) for _ in range(50)]
+
+        index = CityCoordinateIndex()
+        # Force several chunks
+        index.MAX_BATCH_CELLS = 7 * len(self.points)
+        for max_distance_km in (100, 10_000):
+            found = [city.id if city else None for city in index.nearest_many(coordinates, max_distance_km)]
+            expected = [self.expected_city(lat, lng, max_distance_km) for lat, lng in coordinates]
+            self.assertEqual(found, expected)
+
+        self.assertIn(None, index.nearest_many(coordinates, 100))
+
+    def test_city_save_reloads_coordinates(self):
+        city_id, (lat, lng) = next(iter(self.points.items()))
+        self.assertEqual(CITY_COORDINATE_INDEX.nearest(lat, lng).id, city_id)
+
+        city = City.objects.get(pk=city_id)
+        city.latitude, city.longitude = Decimal('10.0'), Decimal('10.0')
+        city.save()
+
+        self.assertNotEqual(CITY_COORDINATE_INDEX.nearest(lat, lng, max_distance_km=10_000).id, city_id)
+        self.assertEqual(CITY_COORDINATE_INDEX.nearest(10.0, 10.0).id, city_id)
@@ -0,0 +1,69 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from apps.depts.services.import_benchmark import IMPORT_PROFILES, ImportBenchmark
+from apps.depts.services.service_registry import ServiceRegistry
+
+
+class Component:
+    built = 0
+
+    def __init__(self):
+        type(self).built += 1
+        self.name = 'component'
+
+
+class ServiceRegistryTests(SimpleTestCase):
+    """Components are imported and built on first use, once per process"""
+
+    def setUp(self):
+        Component.built = 0
+        self.registry = ServiceRegistry({'component': f'{__name__}.Component'})
+
+    def test_lazy_proxy_builds_on_first_access(self):
+        proxy = self.registry.lazy('component')
+        self.assertFalse(self.registry.is_built('component'))
+
+        self.assertEqual(proxy.name, 'component')
+        self.assertTrue(self.registry.is_built('component'))
+        self.assertIs(self.registry.get('component'), self.registry.get('component'))
+        self.assertEqual(Component.built, 1)
+        self.assertIn('component', self.registry.build_times_ms())
+
+    def test_concurrent_first_use_builds_once(self):
+        barrier = threading.Barrier(8)
+        built = []
+
+        def use():
+            barrier.wait()
+            built.append(self.registry.get('component'))
+
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(Component.built, 1)
+        self.assertEqual(len({id(instance) for instance in built}), 1)
+
+    def test_override_restores_previous_instance(self):
+        original = self.registry.get('component')
+        with self.registry.override('component', 'stand-in'):
+            self.assertEqual(self.registry.get('component'), 'stand-in')
+        self.assertIs(self.registry.get('component'), original)
+
+    def test_unknown_component(self):
+        with self.assertRaises(KeyError):
+            self.registry.lazy('missing')
+
+
+class ColdImportTests(SimpleTestCase):
+    """Booting a web or Celery process must not pull in the agent and provider SDKs"""
+
+    def test_profiles_import_no_heavy_packages(self):
+        benchmark = ImportBenchmark(repeat=1)
+        for profile, modules in IMPORT_PROFILES.items():
+            with self.subTest(profile=profile):
+                self.assertEqual(benchmark.probe(modules)['heavy_packages'], [])
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.depts.choices import DepartmentCategory, EntityType, Province
+from apps.depts.models import City, Department, DepartmentEntity, MatcherCandidate
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
+from apps.depts.services.matcher_candidates import CANDIDATES_PER_CITY, MATCHER_CANDIDATES, SAME_CITY_CANDIDATES
+
+
+class MatcherCandidateRebuildTests(TestCase):
+    """Candidates rank same-city entities first, then other-city fallbacks, in primary key order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cities = [
+            City.objects.create(name=name, province=Province.PUNJAB) for name in ('Lahore', 'Multan', 'Sialkot')
+        ]
+        cls.department = Department.objects.create(name='Rescue 1122 Fire', category=DepartmentCategory.FIRE_BRIGADE)
+        for city, count in zip(cls.cities, (5, 1, 2)):
+            for index in range(count):
+                DepartmentEntity.objects.create(
+                    name=f'{city.name} Fire Station {index}', type=EntityType.FIRE_STATION,
+                    department=cls.department, city=city
+                )
+        DepartmentEntity.objects.create(
+            name='Closed Station', type=EntityType.FIRE_STATION,
+            department=cls.department, city=cls.cities[1], is_active=False
+        )
+
+    def ranked(self, city):
+        return list(
+            MatcherCandidate.objects.filter(category=DepartmentCategory.FIRE_BRIGADE, city=city)
+            .order_by('rank').values_list('entity_id', 'same_city')
+        )
+
+    def expected(self, city):
+        active = list(DepartmentEntity.objects.filter(department=self.department, is_active=True).order_by('pk'))
+        same_city = [entity for entity in active if entity.city_id == city.id][:SAME_CITY_CANDIDATES]
+        others = [entity for entity in active if entity.city_id != city.id][:CANDIDATES_PER_CITY - len(same_city)]
+        return [(entity.id, True) for entity in same_city] + [(entity.id, False) for entity in others]
+
+    def test_rebuild_ranks_same_city_then_fallbacks(self):
+        MATCHER_CANDIDATES.rebuild([DepartmentCategory.FIRE_BRIGADE])
+
+        for city in self.cities:
+            self.assertEqual(self.ranked(city), self.expected(city), city.name)
+        self.assertEqual([same for _, same in self.ranked(self.cities[0])], [True, True, True, False])
+        self.assertEqual([same for _, same in self.ranked(self.cities[1])], [True, False, False, False])
+
+    def test_entity_save_rebuilds_on_commit(self):
+        MATCHER_CANDIDATES.rebuild([DepartmentCategory.FIRE_BRIGADE])
+        dropped_id = self.ranked(self.cities[0])[0][0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entity = DepartmentEntity.objects.get(pk=dropped_id)
+            entity.is_active = False
+            entity.save()
+
+        for city in self.cities:
+            self.assertNotIn(dropped_id, [entity_id for entity_id, _ in self.ranked(city)])
+            self.assertEqual(self.ranked(city), self.expected(city), city.name)
+
+    def test_city_rename_needs_no_rebuild(self):
+        MATCHER_CANDIDATES.rebuild([DepartmentCategory.FIRE_BRIGADE])
+        city = self.cities[1]
+
+        with mock.patch.object(MATCHER_CANDIDATES, 'rebuild') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                city.name = 'Multan Cantt'
+                city.save()
+        rebuild.assert_not_called()
+
+        DEPARTMENT_DIRECTORY.invalidate()
+        entity, same_city = DEPARTMENT_DIRECTORY.candidates(DepartmentCategory.FIRE_BRIGADE, city.id)[0]
+        self.assertTrue(same_city)
+        self.assertEqual(entity.city_name, 'Multan Cantt')
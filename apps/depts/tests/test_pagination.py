@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import DepartmentCategory
+from apps.depts.models import CitizenRequest, Department, EmergencyCall
+from apps.depts.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+TIED_AT = datetime(2026, 10, 16, 9, 30, 15, 123456, tzinfo=dt_timezone.utc)
+
+
+class CursorTests(SimpleTestCase):
+
+    def test_round_trip_keeps_microseconds_and_timezone(self):
+        cursor = encode_cursor(TIED_AT, 'CALL-0f1e2d3c')
+
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), (TIED_AT, 'CALL-0f1e2d3c'))
+
+    def test_malformed_cursors_are_ignored(self):
+        for cursor in (None, '', 'not-base64!', encode_cursor(TIED_AT, 'x')[:-6], 'bm8gc2VwYXJhdG9y'):
+            self.assertIsNone(decode_cursor(cursor), cursor)
+
+
+class KeysetPaginateTests(TemporaryMediaRootMixin, TestCase):
+    """Walking pages either way visits every row once, even when timestamps tie"""
+
+    page_size = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email='calls@example.com', password='secret', first_name='Farah')
+        request_obj = CitizenRequest.objects.create(user=user, request_text='Fire in the market')
+        department = Department.objects.create(name='Rescue 1122', category=DepartmentCategory.FIRE_BRIGADE)
+
+        # Five calls share one initiated_at (a broadcast), so pages must split on pk
+        offsets = [0, 0, 0, 0, 0, 1, 2, -1]
+        for offset in offsets:
+            call = EmergencyCall.objects.create(citizen_request=request_obj, department=department, phone_number='1122')
+            EmergencyCall.objects.filter(pk=call.pk).update(initiated_at=TIED_AT + timedelta(seconds=offset))
+
+        cls.expected = list(EmergencyCall.objects.order_by('-initiated_at', '-pk').values_list('pk', flat=True))
+
+    def paginate(self, **cursors):
+        return keyset_paginate(EmergencyCall.objects.all(), 'initiated_at', self.page_size, **cursors)
+
+    def ids(self, page):
+        return [call.pk for call in page]
+
+    def test_next_cursors_visit_every_row_once(self):
+        pages = [self.paginate()]
+        while pages[-1].has_next:
+            pages.append(self.paginate(after=pages[-1].next_cursor))
+
+        self.assertEqual([pk for page in pages for pk in self.ids(page)], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertFalse(pages[0].has_previous)
+        self.assertTrue(all(page.has_previous for page in pages[1:]))
+
+    def test_previous_cursors_return_the_same_pages(self):
+        forward = [self.paginate()]
+        while forward[-1].has_next:
+            forward.append(self.paginate(after=forward[-1].next_cursor))
+
+        backward = [forward[-1]]
+        while backward[-1].has_previous:
+            backward.append(self.paginate(before=backward[-1].previous_cursor))
+
+        self.assertEqual([self.ids(page) for page in reversed(backward)], [self.ids(page) for page in forward])
+
+    def test_before_the_newest_row_falls_back_to_the_first_page(self):
+        newest = EmergencyCall.objects.get(pk=self.expected[0])
+        page = self.paginate(before=encode_cursor(newest.initiated_at, newest.pk))
+
+        self.assertEqual(self.ids(page), self.expected[:self.page_size])
+        self.assertFalse(page.has_previous)
@@ -0,0 +1,97 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TransactionTestCase
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import DepartmentCategory, EntityType, Province
+from apps.depts.models import ActionLog, CitizenRequest, City, Department, DepartmentEntity, Location, PipelineCheckpoint
+from apps.depts.services.audit_writer import AUDIT_WRITER
+from apps.depts.services.directory_cache import DEPARTMENT_DIRECTORY
+from apps.depts.services.geo_index import ENTITY_GEO_INDEX
+from apps.depts.services.pipeline_benchmark import PipelineBenchmark
+from apps.depts.services.simplified_emergency_pipeline import EmergencyRequest
+
+REQUEST_TEXT = 'My phone was snatched near Liberty Market, Lahore'
+STREAM_ID = 'task-checkpoint-1'
+RESUMABLE_STAGES = {'received', 'router', 'matcher', 'department', 'trigger'}
+
+
+class PipelineCheckpointTests(TemporaryMediaRootMixin, TransactionTestCase):
+    """A retried task resumes after its completed stages; the last attempt cleans up either way"""
+
+    def setUp(self):
+        city = City.objects.create(name='Lahore', province=Province.PUNJAB)
+        department = Department.objects.create(name='Punjab Police', category=DepartmentCategory.POLICE)
+        location = Location.objects.create(city=city, lat=Decimal('31.510000'), lng=Decimal('74.340000'))
+        DepartmentEntity.objects.create(
+            name='Gulberg Police Station', type=EntityType.POLICE_STATION, department=department,
+            city=city, location=location, phone='+924235712345'
+        )
+        self.user = CustomUser.objects.create_user(email='checkpoint@example.com', password='secret', first_name='Ali')
+
+        DEPARTMENT_DIRECTORY.invalidate()
+        ENTITY_GEO_INDEX.invalidate()
+        self.addCleanup(AUDIT_WRITER.flush)
+
+        benchmark = PipelineBenchmark(llm_latency_ms=0, provider_latency_ms=0)
+        stubbed = benchmark.stubbed_pipeline([{'request_text': REQUEST_TEXT, 'category': DepartmentCategory.POLICE}])
+        self.pipeline = stubbed.__enter__()
+        self.addCleanup(stubbed.__exit__, None, None, None)
+
+    def process(self, final_attempt):
+        return self.pipeline.process_emergency_request(EmergencyRequest(
+            request_text=REQUEST_TEXT, user_city='Lahore', user_id=self.user.id,
+            user_name='Ali', stream_id=STREAM_ID, final_attempt=final_attempt
+        ))
+
+    def fail_actions(self):
+        return mock.patch.object(self.pipeline, '_process_actions_step', side_effect=RuntimeError('SMS gateway down'))
+
+    def saved_stages(self):
+        return set(PipelineCheckpoint.objects.filter(stream_id=STREAM_ID).values_list('stage', flat=True))
+
+    def test_retry_resumes_after_completed_stages(self):
+        with self.fail_actions():
+            failed = self.process(final_attempt=False)
+
+        self.assertFalse(failed.success)
+        self.assertTrue(RESUMABLE_STAGES <= self.saved_stages(), self.saved_stages())
+
+        # Anything before the failed stage must come from its checkpoint
+        finished_stages = ['_process_router_step', '_process_matcher_step',
+                           '_process_department_step', '_process_trigger_step']
+        patches = [mock.patch.object(self.pipeline, name, side_effect=AssertionError(f'{name} re-ran'))
+                   for name in finished_stages]
+        for patch in patches:
+            patch.start()
+        try:
+            result = self.process(final_attempt=True)
+        finally:
+            for patch in patches:
+                patch.stop()
+
+        self.assertTrue(result.success, result.error_message)
+        self.assertEqual(result.request_id, failed.request_id)
+        self.assertEqual(CitizenRequest.objects.count(), 1)
+        self.assertEqual(self.saved_stages(), set())
+
+    def test_failed_final_attempt_clears_checkpoints(self):
+        with self.fail_actions():
+            result = self.process(final_attempt=True)
+
+        self.assertFalse(result.success)
+        self.assertEqual(self.saved_stages(), set())
+
+    def test_run_flushes_only_its_own_audit_rows(self):
+        other = CitizenRequest.objects.create(user=self.user, request_text='Car stolen outside the mall')
+
+        with mock.patch.object(AUDIT_WRITER, 'flush_interval_seconds', 0):
+            AUDIT_WRITER.add(ActionLog(citizen_request=other, description='Buffered by another run'))
+            result = self.process(final_attempt=True)
+
+        self.assertTrue(result.success, result.error_message)
+        self.assertTrue(ActionLog.objects.filter(citizen_request__case_code=result.case_code).exists())
+        self.assertEqual(len(AUDIT_WRITER.pending(ActionLog, citizen_request_id=other.id)), 1)
+        self.assertFalse(ActionLog.objects.filter(citizen_request=other).exists())
@@ -0,0 +1,129 @@
+import math
+import re
+from collections import defaultdict
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.depts.services import pipeline_metrics
+from apps.depts.services.pipeline_metrics import STAGE_BUCKETS, PipelineMetricsRegistry, StageRecorder
+
+METRIC_NAME = r'[a-zA-Z_:][a-zA-Z0-9_:]*'
+SAMPLE_LINE = re.compile(rf'^({METRIC_NAME})(?:\{{(.*)\}})? (\S+)$')
+LABEL_PAIR = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\[\\"n])*)"(?:,|$)')
+METRIC_TYPES = {'counter', 'gauge', 'histogram', 'summary', 'untyped'}
+HISTOGRAM_SUFFIXES = ('_bucket', '_sum', '_count')
+
+
+def parse_exposition(text):
+    """
+    Parse the Prometheus text format strictly enough to reject malformed output
+
+    Returns {family: {'type': ..., 'samples': [(name, labels, value)]}}
+    """
+    assert text.endswith('\n'), 'exposition must end with a newline'
+    families = {}
+    current = None
+
+    for line in text[:-1].split('\n'):
+        if line.startswith('# HELP '):
+            name = line.split(' ', 3)[2]
+            assert re.fullmatch(METRIC_NAME, name), line
+            assert name not in families, f'{name} declared twice'
+            families[name] = {'type': None, 'samples': []}
+            current = name
+        elif line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            assert name == current and families[name]['type'] is None, f'TYPE out of place: {line}'
+            assert metric_type in METRIC_TYPES, line
+            families[name]['type'] = metric_type
+        else:
+            match = SAMPLE_LINE.match(line)
+            assert match, f'not a sample line: {line!r}'
+            name, label_text, value = match.groups()
+            labels = {}
+            if label_text:
+                pairs = LABEL_PAIR.findall(label_text)
+                assert ','.join(f'{key}="{val}"' for key, val in pairs) == label_text, f'bad labels: {line}'
+                labels = dict(pairs)
+            family = families[current]
+            allowed = [current] + ([current + suffix for suffix in HISTOGRAM_SUFFIXES]
+                                   if family['type'] == 'histogram' else [])
+            assert name in allowed, f'{name} outside its family {current}'
+            family['samples'].append((name, labels, float(value)))
+
+    return families
+
+
+class PrometheusExpositionTests(SimpleTestCase):
+    """render() emits valid exposition text with cumulative histograms ending in +Inf"""
+
+    def setUp(self):
+        patcher = mock.patch.object(pipeline_metrics, 'get_redis_client', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.registry = PipelineMetricsRegistry()
+
+    def observe_stage(self, stage, wall_ms, success=True):
+        recorder = StageRecorder(stage)
+        recorder.wall_ms = wall_ms
+        recorder.success = success
+        recorder.db_queries = 3
+        self.registry.observe_stage(recorder)
+
+    def test_render_parses_with_cumulative_buckets(self):
+        # One observation beyond the largest bound only shows up in +Inf
+        for wall_ms in (40, 300, 300, 90_000):
+            self.observe_stage('router', wall_ms)
+        self.observe_stage('matcher', 700, success=False)
+        self.registry.observe_provider('sms', 0.2, success=True)
+        self.registry.observe_provider('voice', 45.0, success=False)
+        self.registry.observe_run(1.5, success=True)
+
+        families = parse_exposition(self.registry.render())
+
+        histograms = [name for name, family in families.items() if family['type'] == 'histogram']
+        self.assertEqual(sorted(histograms), [
+            'emergency_pipeline_provider_seconds', 'emergency_pipeline_run_seconds',
+            'emergency_pipeline_stage_seconds',
+        ])
+        for name in histograms:
+            series = defaultdict(dict)
+            for sample, labels, value in families[name]['samples']:
+                key = tuple(sorted((k, v) for k, v in labels.items() if k != 'le'))
+                if sample.endswith('_bucket'):
+                    series[key].setdefault('buckets', []).append((float(labels['le']), value))
+                else:
+                    series[key][sample[len(name) + 1:]] = value
+
+            self.assertTrue(series, name)
+            for key, parts in series.items():
+                bounds = [bound for bound, _ in parts['buckets']]
+                counts = [count for _, count in parts['buckets']]
+                self.assertEqual(bounds, sorted(bounds), key)
+                self.assertEqual(counts, sorted(counts), f'{name}{key} buckets are not cumulative')
+                self.assertTrue(math.isinf(bounds[-1]), key)
+                self.assertEqual(counts[-1], parts['count'], key)
+                self.assertIn('sum', parts)
+
+        router = {
+            labels['le']: value for sample, labels, value in families['emergency_pipeline_stage_seconds']['samples']
+            if sample.endswith('_bucket') and labels['stage'] == 'router'
+        }
+        self.assertEqual(router[str(STAGE_BUCKETS[0])], 1)
+        self.assertEqual(router[str(STAGE_BUCKETS[-1])], 3)
+        self.assertEqual(router['+Inf'], 4)
+
+        failures = families['emergency_pipeline_stage_failures_total']['samples']
+        self.assertEqual(failures, [('emergency_pipeline_stage_failures_total', {'stage': 'matcher'}, 1.0)])
+        provider_calls = {
+            (labels['channel'], labels['outcome']): value
+            for _, labels, value in families['emergency_pipeline_provider_calls_total']['samples']
+        }
+        self.assertEqual(provider_calls, {('sms', 'success'): 1.0, ('voice', 'failure'): 1.0})
+
+    def test_empty_registry_renders_headers_only(self):
+        families = parse_exposition(self.registry.render())
+
+        self.assertTrue(families)
+        self.assertTrue(all(family['type'] and not family['samples'] for family in families.values()))
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import CaseStatus, DepartmentCategory
+from apps.depts.models import CitizenRequest
+from apps.depts.services.request_search import REQUEST_SEARCH
+
+
+class RequestSearchSignalTests(TemporaryMediaRootMixin, TestCase):
+    """Requests are re-indexed only when an indexed column changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='search@example.com', password='secret', first_name='Sana')
+
+    def save_and_count_indexing(self, request_obj, **kwargs):
+        with mock.patch.object(REQUEST_SEARCH, 'index') as index:
+            with self.captureOnCommitCallbacks(execute=True):
+                request_obj.save(**kwargs)
+        return index.call_count
+
+    def test_only_indexed_changes_reindex(self):
+        request_obj = CitizenRequest(
+            user=self.user, request_text='Fire in the market', category=DepartmentCategory.FIRE_BRIGADE
+        )
+        self.assertEqual(self.save_and_count_indexing(request_obj), 1)
+
+        request_obj.status = CaseStatus.IN_PROGRESS
+        self.assertEqual(self.save_and_count_indexing(request_obj), 0)
+        self.assertEqual(self.save_and_count_indexing(request_obj, update_fields=['status']), 0)
+
+        reloaded = CitizenRequest.objects.get(pk=request_obj.pk)
+        self.assertEqual(self.save_and_count_indexing(reloaded), 0)
+
+        reloaded.ai_response = 'Fire brigade dispatched'
+        self.assertEqual(self.save_and_count_indexing(reloaded), 1)
+        self.assertEqual(self.save_and_count_indexing(reloaded), 0)
+
+    def test_only_reporter_name_changes_reindex_their_requests(self):
+        CitizenRequest.objects.create(user=self.user, request_text='Car stolen outside the mall')
+        user = CustomUser.objects.get(pk=self.user.pk)
+
+        self.assertEqual(self.save_and_count_indexing(user, update_fields=['last_login']), 0)
+        self.assertEqual(self.save_and_count_indexing(user), 0)
+
+        user.last_name = 'Iqbal'
+        self.assertEqual(self.save_and_count_indexing(user, update_fields=['last_name']), 1)
+        self.assertEqual(self.save_and_count_indexing(user), 1)
+        self.assertEqual(self.save_and_count_indexing(user), 0)
@@ -0,0 +1,53 @@
+from django.test import TestCase
+
+from apps.authentication.models import CustomUser
+from apps.core.testing import TemporaryMediaRootMixin
+from apps.depts.choices import CaseStatus, DepartmentCategory, Province, RollupGranularity
+from apps.depts.models import CitizenRequest, City, Location, RequestRollup
+
+
+class RequestRollupSignalTests(TemporaryMediaRootMixin, TestCase):
+    """Saves move rollup counts, and saves that touch no rollup column cost no rollup queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='rollup@example.com', password='secret', first_name='Bilal')
+        city = City.objects.create(name='Lahore', province=Province.PUNJAB)
+        cls.location = Location.objects.create(city=city, area='Gulberg')
+
+    def create_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CitizenRequest.objects.create(
+                user=self.user, request_text='Car stolen', category=DepartmentCategory.POLICE,
+                target_location=self.location
+            )
+
+    def daily_counts(self):
+        return dict(
+            RequestRollup.objects.filter(granularity=RollupGranularity.DAY, request_count__gt=0)
+            .values_list('status', 'request_count')
+        )
+
+    def test_status_change_moves_counts(self):
+        request_obj = self.create_request()
+        self.assertEqual(self.daily_counts(), {CaseStatus.SUBMITTED: 1})
+
+        request_obj.status = CaseStatus.IN_PROGRESS
+        with self.captureOnCommitCallbacks(execute=True):
+            request_obj.save()
+        self.assertEqual(self.daily_counts(), {CaseStatus.IN_PROGRESS: 1})
+
+    def test_unrelated_saves_skip_rollups(self):
+        request_obj = self.create_request()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            request_obj.ai_response = 'Officers notified'
+            with self.assertNumQueries(1):
+                request_obj.save(update_fields=['ai_response'])
+
+            reloaded = CitizenRequest.objects.get(pk=request_obj.pk)
+            reloaded.ai_response = 'Officers on the way'
+            with self.assertNumQueries(1):
+                reloaded.save()
+
+        self.assertEqual(self.daily_counts(), {CaseStatus.SUBMITTED: 1})
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.depts.agents.router_agent import cache
+from apps.depts.agents.router_agent.cache import RouterDecisionCache, normalize_request_text
+from apps.depts.agents.router_agent.pydantic_models import RouterDecision
+from apps.depts.choices import DepartmentCategory
+
+
+def decision(department=DepartmentCategory.FIRE_BRIGADE, **fields):
+    return RouterDecision(department=department, confidence=0.92, reason='Flames reported', **fields)
+
+
+class SharedCacheStandIn:
+    """get/set of the Redis tier, backed by a dict"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class NormalizeRequestTextTests(SimpleTestCase):
+
+    def test_case_punctuation_and_spacing_are_ignored(self):
+        self.assertEqual(normalize_request_text('  House  on FIRE!!! '), 'house on fire')
+        self.assertEqual(normalize_request_text('House on fire'), normalize_request_text('house, on   fire.'))
+
+    def test_semantic_bucket_drops_fillers_and_word_order(self):
+        self.assertEqual(
+            normalize_request_text('There is a fire in my house, please help', semantic_bucket=True),
+            normalize_request_text('house fire', semantic_bucket=True)
+        )
+        self.assertNotEqual(normalize_request_text('a fire in my house'), normalize_request_text('house fire'))
+
+
+class RouterDecisionCacheTests(SimpleTestCase):
+    """Hits survive cosmetic text changes; the local tier is bounded and backed by the shared one"""
+
+    def setUp(self):
+        self.shared = SharedCacheStandIn()
+        patcher = mock.patch.object(cache, 'get_redis_client', return_value=self.shared)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hit_after_set_and_miss_for_other_text(self):
+        router_cache = RouterDecisionCache()
+        router_cache.set('House on fire!', decision())
+
+        hit = router_cache.get('house ON fire')
+        self.assertEqual(hit.department, DepartmentCategory.FIRE_BRIGADE)
+        self.assertIsNone(router_cache.get('car stolen'))
+        self.assertEqual(router_cache.stats(), {'hits': 1, 'misses': 1, 'local_entries': 1})
+
+    def test_hits_are_copies(self):
+        router_cache = RouterDecisionCache()
+        router_cache.set('house on fire', decision())
+
+        router_cache.get('house on fire').keywords_detected.append('mutated')
+        self.assertEqual(router_cache.get('house on fire').keywords_detected, [])
+
+    def test_degraded_decisions_are_never_cached(self):
+        router_cache = RouterDecisionCache()
+        router_cache.set('house on fire', decision(degraded_mode_used=True))
+
+        self.assertIsNone(router_cache.get('house on fire'))
+        self.assertEqual(self.shared.values, {})
+
+    def test_local_tier_is_bounded_and_refilled_from_shared(self):
+        router_cache = RouterDecisionCache(local_max_entries=2)
+        for text in ('house on fire', 'car stolen', 'man collapsed'):
+            router_cache.set(text, decision())
+
+        self.assertEqual(router_cache.stats()['local_entries'], 2)
+        self.assertNotIn(router_cache.cache_key('house on fire'), router_cache._local)
+
+        # Evicted locally, still served by the shared tier and promoted again
+        self.assertIsNotNone(router_cache.get('house on fire'))
+        self.assertIn(router_cache.cache_key('house on fire'), router_cache._local)
+
+    def test_other_worker_reads_shared_decision(self):
+        RouterDecisionCache().set('house on fire', decision())
+
+        other_worker = RouterDecisionCache()
+        self.assertEqual(other_worker.get('House on fire.').department, DepartmentCategory.FIRE_BRIGADE)
+        self.assertEqual(other_worker.stats()['hits'], 1)
@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase, TestCase
+
+from apps.depts.agents.router_agent.rules import (
+    FAST_PATH_CONFIG_DEFAULTS, FAST_PATH_MODE_CONFIRM, FAST_PATH_MODE_SKIP, KEYWORD_ROUTER_CLASSIFIER, FastPathConfig
+)
+from apps.depts.choices import DepartmentCategory
+from apps.depts.models import SystemConfiguration
+
+
+class KeywordRouterClassifierTests(SimpleTestCase):
+    """The fast path only skips the LLM on two or more distinct keyword signals"""
+
+    skip_threshold = float(FAST_PATH_CONFIG_DEFAULTS['router_fast_path_skip_threshold'])
+
+    def test_single_keyword_stays_below_skip_threshold(self):
+        for text in ('my friend was shot at in a cyber chat', 'building on fire', 'car stolen'):
+            decision = KEYWORD_ROUTER_CLASSIFIER.classify(text)
+            self.assertLess(decision.confidence, self.skip_threshold, text)
+
+    def test_two_signals_can_skip(self):
+        decision = KEYWORD_ROUTER_CLASSIFIER.classify('house on fire, flames everywhere')
+        self.assertEqual(decision.department, DepartmentCategory.FIRE_BRIGADE)
+        self.assertGreaterEqual(decision.confidence, self.skip_threshold)
+
+
+class FastPathConfigTests(TestCase):
+    """Rules decisions are confirmed by the LLM unless an operator opts in to skipping it"""
+
+    def set_mode(self, value):
+        SystemConfiguration.objects.update_or_create(
+            key='router_fast_path_mode', defaults={'value': value, 'category': 'ai'}
+        )
+        return FastPathConfig().mode
+
+    def test_default_mode_confirms(self):
+        self.assertEqual(FastPathConfig().mode, FAST_PATH_MODE_CONFIRM)
+
+    def test_skip_is_opt_in(self):
+        self.assertEqual(self.set_mode('Skip'), FAST_PATH_MODE_SKIP)
+        self.assertEqual(self.set_mode('sometimes'), FAST_PATH_MODE_CONFIRM)
@@ -0,0 +1,49 @@
+from unittest import mock
+
+import redis
+from django.test import SimpleTestCase
+
+from apps.depts.agents import session_store
+from apps.depts.agents.session_store import (
+    HISTORY_MODE_OFF, HISTORY_MODE_REQUEST, HISTORY_MODE_USER, AgentSessionStore
+)
+
+
+class AgentSessionStoreTests(SimpleTestCase):
+    """History is off unless asked for, expires in Redis, and is capped to the last N runs"""
+
+    def store(self, mode, redis_client=None, **options):
+        with mock.patch.object(session_store, 'get_redis_client', return_value=redis_client):
+            return AgentSessionStore('router', mode=mode, **options)
+
+    def test_off_mode_keeps_no_history(self):
+        store = self.store(HISTORY_MODE_OFF, redis_client=redis.Redis())
+
+        self.assertIsNone(store.db)
+        self.assertFalse(store.add_history_to_context)
+        # Every run gets a throwaway session, even for the same request and user
+        self.assertNotEqual(store.session_id_for('REQ-1', 'USR-1'), store.session_id_for('REQ-1', 'USR-1'))
+
+    def test_history_needs_redis_and_a_known_mode(self):
+        with self.assertLogs('apps.depts.agents.session_store', 'WARNING'):
+            self.assertEqual(self.store(HISTORY_MODE_USER).mode, HISTORY_MODE_OFF)
+        with self.assertLogs('apps.depts.agents.session_store', 'WARNING'):
+            self.assertEqual(self.store('forever', redis_client=redis.Redis()).mode, HISTORY_MODE_OFF)
+
+    def test_sessions_expire_and_history_is_capped(self):
+        store = self.store(HISTORY_MODE_REQUEST, redis_client=redis.Redis(), history_runs=2, ttl_seconds=600)
+
+        self.assertTrue(store.add_history_to_context)
+        self.assertEqual(store.history_runs, 2)
+        self.assertEqual(store.db.expire, 600)
+        self.assertEqual(store.db.db_prefix, 'agno:router')
+
+    def test_session_keys_follow_the_mode(self):
+        by_request = self.store(HISTORY_MODE_REQUEST, redis_client=redis.Redis())
+        by_user = self.store(HISTORY_MODE_USER, redis_client=redis.Redis())
+
+        self.assertEqual(by_request.session_id_for('REQ-1', 'USR-1'), 'router:request:REQ-1')
+        self.assertEqual(by_user.session_id_for('REQ-1', 'USR-1'), 'router:user:USR-1')
+        # Nothing to key on - never fall back to a shared session
+        self.assertNotEqual(by_user.session_id_for('REQ-1'), by_user.session_id_for('REQ-1'))
+        self.assertTrue(by_user.session_id_for('REQ-1').startswith('router:'))
@@ -0,0 +1,86 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from apps.depts.services.stage_graph import PipelineStage, StageGraph
+
+
+class StageGraphTests(SimpleTestCase):
+    """Ready stages overlap, dependents get their inputs, and the first failure stops the run"""
+
+    def test_independent_stages_run_in_parallel(self):
+        # Both sides must be waiting at once, or the barrier times out
+        barrier = threading.Barrier(2, timeout=5)
+        threads = {}
+
+        def branch(name):
+            def run(received):
+                threads[name] = threading.current_thread().name
+                barrier.wait()
+                return f'{name}({received})'
+            return run
+
+        completed = []
+        graph = StageGraph([
+            PipelineStage('received', lambda: 'text'),
+            PipelineStage('router', branch('router'), depends_on=['received']),
+            PipelineStage('geocode', branch('geocode'), depends_on=['received']),
+            PipelineStage('matcher', lambda router, geocode: [router, geocode], depends_on=['router', 'geocode']),
+        ], on_stage_complete=lambda name, result: completed.append(name))
+
+        results = graph.run()
+
+        self.assertEqual(results['matcher'], ['router(text)', 'geocode(text)'])
+        self.assertEqual(threads['router'], threading.current_thread().name)
+        self.assertTrue(threads['geocode'].startswith('pipeline-stage'))
+        self.assertEqual(completed[0], 'received')
+        self.assertEqual(completed[-1], 'matcher')
+        self.assertEqual(set(graph.durations_ms), {'received', 'router', 'geocode', 'matcher'})
+
+    def test_first_failure_is_reraised_and_stops_scheduling(self):
+        sibling_finished = threading.Event()
+        dependent_ran = []
+
+        def slow_sibling(received):
+            sibling_finished.wait(0.2)
+            sibling_finished.set()
+
+        def fail(received):
+            raise LookupError('geocoder down')
+
+        graph = StageGraph([
+            PipelineStage('received', lambda: 'text'),
+            PipelineStage('router', fail, depends_on=['received']),
+            PipelineStage('geocode', slow_sibling, depends_on=['received']),
+            PipelineStage('matcher', lambda router, geocode: dependent_ran.append(True), depends_on=['router', 'geocode']),
+        ])
+
+        with self.assertRaisesMessage(LookupError, 'geocoder down'):
+            graph.run()
+
+        # The offloaded sibling is waited for, never left running unobserved
+        self.assertTrue(sibling_finished.is_set())
+        self.assertEqual(dependent_ran, [])
+
+    def test_initial_results_are_not_rerun(self):
+        completed = []
+        graph = StageGraph([
+            PipelineStage('router', lambda: self.fail('router re-ran')),
+            PipelineStage('matcher', lambda router: f'matched {router}', depends_on=['router']),
+        ], on_stage_complete=lambda name, result: completed.append(name), initial_results={'router': 'police'})
+
+        self.assertEqual(graph.run(), {'router': 'police', 'matcher': 'matched police'})
+        self.assertEqual(completed, ['matcher'])
+
+    def test_failing_completion_hook_does_not_fail_the_run(self):
+        def hook(name, result):
+            raise RuntimeError('checkpoint write failed')
+
+        graph = StageGraph([PipelineStage('router', lambda: 'police')], on_stage_complete=hook)
+
+        with self.assertLogs('apps.depts.services.stage_graph', 'WARNING'):
+            self.assertEqual(graph.run(), {'router': 'police'})
+
+    def test_unknown_dependency_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Stage 'matcher' depends on unknown stages: ['router']"):
+            StageGraph([PipelineStage('matcher', lambda router: None, depends_on=['router'])])
@@ -0,0 +1,119 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.depts.services.actions import vapi_call_agent
+from apps.depts.services.actions.action_loop import ACTION_LOOP
+from apps.depts.services.actions.vapi_call_agent import VAPI_TEMPLATE_CACHE, EmergencyCallAgent, vapi_http_client
+from apps.depts.tests.vapi_stand_in import LocalVapiServer
+
+CONTEXT = {'case_code': 'C-1234ABCD', 'location': 'Gulberg III, Lahore', 'reported_by': 'Ahmed Hassan'}
+
+
+class EmergencyCallTemplateCacheTests(SimpleTestCase):
+    """Emergency calls reuse one schema and assistant and only POST /call per call"""
+
+    def setUp(self):
+        VAPI_TEMPLATE_CACHE.clear_local()
+        self.vapi = LocalVapiServer().start()
+        self.addCleanup(self.vapi.stop)
+        self.agent = EmergencyCallAgent(api_key='test-key', phone_number_id='pn-1', base_url=self.vapi.base_url)
+
+    def call(self, **context):
+        result = self.agent.make_emergency_call('+923001234567', 'medical', {**CONTEXT, **context})
+        self.assertTrue(result['success'], result)
+        return result
+
+    def test_template_resources_created_once(self):
+        self.call()
+        self.call(case_code='C-5678EFGH')
+
+        self.assertEqual(self.vapi.count('POST', '/structured-output'), 1)
+        self.assertEqual(self.vapi.count('POST', '/assistant'), 1)
+        self.assertEqual(self.vapi.count('POST', '/call'), 2)
+
+    def test_call_context_passed_as_overrides(self):
+        self.call()
+
+        body = self.vapi.requests[-1][2]
+        self.assertEqual(body['assistantId'], self.agent.assistant_id)
+        variables = body['assistantOverrides']['variableValues']
+        self.assertEqual(variables['caseCode'], 'C-1234ABCD')
+        self.assertEqual(variables['location'], 'Gulberg III, Lahore')
+        self.assertEqual(variables['emergencyType'], 'MEDICAL')
+        self.assertIn('Ahmed Hassan', body['assistantOverrides']['firstMessage'])
+
+    def test_other_agents_share_the_cache(self):
+        self.call()
+        other = EmergencyCallAgent(api_key='test-key', phone_number_id='pn-1', base_url=self.vapi.base_url)
+        other.make_emergency_call('+923001234567', 'fire', CONTEXT)
+
+        self.assertEqual(self.vapi.count('POST', '/assistant'), 1)
+
+    def test_changed_template_creates_new_assistant(self):
+        self.call()
+        with mock.patch.object(vapi_call_agent, 'EMERGENCY_ASSISTANT_PROMPT', 'Call for {{reportedBy}}'):
+            self.call()
+
+        self.assertEqual(self.vapi.count('POST', '/structured-output'), 1)
+        self.assertEqual(self.vapi.count('POST', '/assistant'), 2)
+
+    def test_deleted_assistant_is_recreated(self):
+        self.call()
+        self.vapi.delete_assistant(self.agent.assistant_id)
+        self.call()
+
+        self.assertEqual(self.vapi.count('POST', '/assistant'), 2)
+        self.assertEqual(len(self.vapi.calls), 2)
+
+    def test_async_call_dials_on_the_action_loop_client(self):
+        self.call()
+        self.vapi.delete_assistant(self.agent.assistant_id)
+
+        result = ACTION_LOOP.run(self.agent.make_emergency_call_async('+923001234567', 'fire', CONTEXT))
+
+        self.assertTrue(result['success'], result)
+        self.assertEqual(self.vapi.count('POST', '/assistant'), 2)
+        self.assertEqual(len(self.vapi.calls), 2)
+        self.assertIs(self.agent._async_vapi_client, ACTION_LOOP.http)
+
+    def test_warm_up_leaves_only_the_call_on_the_call_path(self):
+        self.assertTrue(self.agent.warm_up())
+        warmed = len(self.vapi.requests)
+        self.call()
+
+        self.assertEqual([path for _, path, _ in self.vapi.requests[warmed:]], ['/call'])
+
+
+class VapiHttpClientTests(SimpleTestCase):
+    """Every agent in a process shares one keep-alive pool, rebuilt after a fork"""
+
+    def setUp(self):
+        VAPI_TEMPLATE_CACHE.clear_local()
+        self.vapi = LocalVapiServer().start()
+        self.addCleanup(self.vapi.stop)
+
+    def agent(self):
+        return EmergencyCallAgent(api_key='test-key', phone_number_id='pn-1', base_url=self.vapi.base_url)
+
+    def test_agents_share_one_connection(self):
+        first, second = self.agent(), self.agent()
+        for agent in (first, second, first):
+            self.assertTrue(agent.make_emergency_call('+923001234567', 'fire', CONTEXT)['success'])
+
+        self.assertIs(first.http, second.http)
+        self.assertEqual(self.vapi.count('POST', '/call'), 3)
+        self.assertEqual(len(self.vapi.connections), 1)
+
+    def test_forked_child_gets_its_own_client(self):
+        agent = self.agent()
+        parent_client, parent_sdk = vapi_http_client(), agent.vapi
+
+        with mock.patch.object(vapi_call_agent.os, 'getpid', return_value=os.getpid() + 1):
+            child_client = vapi_http_client()
+            self.assertIsNot(child_client, parent_client)
+            self.assertIs(vapi_http_client(), child_client)
+            # The SDK client is rebound to the new pool on next use
+            self.assertIsNot(agent.vapi, parent_sdk)
+            self.assertIs(agent._vapi_client, child_client)
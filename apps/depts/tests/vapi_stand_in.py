@@ -0,0 +1,144 @@
+"""
+Local VAPI Stand-in - Threaded HTTP server for the VAPI endpoints we use, for tests
+Answers structured-output, assistant and call requests the way VAPI does (an
+unknown assistantId is a 400), records every request and can add latency, so
+EmergencyCallAgent can be tested and its time-to-ring measured without dialing.
+Point an agent at it with EmergencyCallAgent(base_url=server.base_url) or VAPI_BASE_URL.
+"""
+import itertools
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class LocalVapiServer:
+    """
+    with LocalVapiServer(latency_ms=50) as vapi:
+        agent = EmergencyCallAgent(api_key="test", phone_number_id="pn", base_url=vapi.base_url)
+        agent.make_emergency_call(...)
+        vapi.count("POST", "/call")
+    """
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.requests: List[Tuple[str, str, Optional[Dict[str, Any]]]] = []
+        self.structured_outputs: Dict[str, Dict[str, Any]] = {}
+        self.assistants: Dict[str, Dict[str, Any]] = {}
+        self.calls: Dict[str, Dict[str, Any]] = {}
+        # Client (host, port) of every TCP connection served - one per pooled socket
+        self.connections: set = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalVapiServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="vapi-stand-in", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "LocalVapiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def count(self, method: str, path: str) -> int:
+        """Requests received for method and path (path prefix match)"""
+        with self._lock:
+            return sum(1 for seen_method, seen_path, _ in self.requests
+                       if seen_method == method and seen_path.startswith(path))
+
+    def delete_assistant(self, assistant_id: str) -> None:
+        """Simulate an assistant removed from the VAPI dashboard"""
+        with self._lock:
+            self.assistants.pop(assistant_id, None)
+
+    # -------------------------------------------------------------------------
+
+    def _handle(self, method: str, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+        with self._lock:
+            self.requests.append((method, path, body))
+
+            if method == "POST" and path == "/structured-output":
+                resource = self._resource("so", body)
+                self.structured_outputs[resource["id"]] = resource
+                return 201, resource
+
+            if method == "POST" and path == "/assistant":
+                resource = self._resource("asst", body)
+                self.assistants[resource["id"]] = resource
+                return 201, resource
+
+            if method == "POST" and path == "/call":
+                assistant_id = (body or {}).get("assistantId")
+                if assistant_id not in self.assistants:
+                    return 400, {"message": f"Couldn't Get Assistant. `assistantId` {assistant_id} Does Not Exist.",
+                                 "statusCode": 400}
+                resource = self._resource("call", body)
+                resource["status"] = "queued"
+                self.calls[resource["id"]] = resource
+                return 201, resource
+
+            if method == "GET" and path.startswith("/call/"):
+                call = self.calls.get(path[len("/call/"):])
+                return (200, call) if call else (404, {"message": "Call not found", "statusCode": 404})
+
+        return 404, {"message": f"Cannot {method} {path}", "statusCode": 404}
+
+    def _resource(self, prefix: str, body: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        return {**(body or {}), "id": f"{prefix}-{next(self._ids)}", "orgId": "local",
+                "createdAt": now, "updatedAt": now}
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real API, so connection reuse is observable
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, method: str) -> None:
+                with stand_in._lock:
+                    stand_in.connections.add(self.client_address)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload = stand_in._handle(method, self.path, body)
+                encoded = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -1,41 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from .models import CitizenRequest
 from django.views.generic import ListView
 from .models import EmergencyCall
+from .pagination import KeysetPage, KeysetPaginationMixin
+from .services.request_search import REQUEST_SEARCH
 
+REQUEST_TOTAL_CACHE_KEY = "depts:citizen_request_total"
 
 
-class CitizenRequestListView(ListView):
+class CitizenRequestListView(KeysetPaginationMixin, ListView):
     model = CitizenRequest
     template_name = "citizen_request_list.html"
     context_object_name = "requests"
-    paginate_by = 25  # optional pagination
 
-    # Optional: Order by most recent by default
-    ordering = ['-created_at']
+    # Keyset pagination, newest first - cursors on (created_at, id)
+    keyset_field = 'created_at'
+    page_size = 25
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        search = self.request.GET.get("search")
+        queryset = super().get_queryset().select_related('user')
+        search = self.request.GET.get("search", "").strip()
         if search:
-            queryset = queryset.filter(
-                models.Q(case_code__icontains=search) |
-                models.Q(user__first_name__icontains=search) |
-                models.Q(user__last_name__icontains=search) |
-                models.Q(category__icontains=search)
-            )
+            # Full-text index (Postgres GIN / SQLite FTS5), best matches first
+            queryset = REQUEST_SEARCH.search(queryset, search)
         return queryset
 
+    def get_page(self):
+        # Search results are one ranked page - rank order has no keyset cursor
+        if self.request.GET.get("search", "").strip():
+            return KeysetPage(list(self.object_list), False, False, self.keyset_field)
+        return super().get_page()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.GET.get("search", "").strip():
+            context['total_count'] = len(context['page_obj'])
+        else:
+            # COUNT(*) scans the whole table - cache it instead of counting per page
+            timeout = getattr(settings, "REQUEST_TOTAL_CACHE_SECONDS", 60)
+            context['total_count'] = cache.get_or_set(REQUEST_TOTAL_CACHE_KEY, self.object_list.count, timeout)
+        return context
 
-class EmergencyCallListView(ListView):
+
+class EmergencyCallListView(KeysetPaginationMixin, ListView):
     model = EmergencyCall
     template_name = "emergency_call_list.html"
     context_object_name = "calls"
-    paginate_by = 25
-    ordering = ['-initiated_at']
+
+    # Keyset pagination, newest first - cursors on (initiated_at, id)
+    keyset_field = 'initiated_at'
+    page_size = 25
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('citizen_request', 'department')
         search = self.request.GET.get("search")
         if search:
             queryset = queryset.filter(
@@ -47,12 +66,15 @@ class EmergencyCallListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
 
-        # Add counts to context based on actual fields
-        context['dispatched_count'] = queryset.filter(status='dispatched').count()
-        context['in_progress_count'] = queryset.filter(status='in_progress').count()
-        context['completed_count'] = queryset.filter(status='completed').count()
-        context['answered_count'] = queryset.filter(status='answered').count()
+        # Add counts to context based on actual fields - one grouped query
+        status_counts = dict(
+            self.object_list.order_by().values_list('status').annotate(total=models.Count('id'))
+        )
+        context['dispatched_count'] = status_counts.get('dispatched', 0)
+        context['in_progress_count'] = status_counts.get('in_progress', 0)
+        context['completed_count'] = status_counts.get('completed', 0)
+        context['answered_count'] = status_counts.get('answered', 0)
+        context['total_count'] = sum(status_counts.values())
 
-        return context
\ No newline at end of file
+        return context
@@ -2,10 +2,7 @@ from celery import shared_task
 import logging
 
 from apps.hiring.models import Resume
-from apps.ai_agents.services.gpt_pdf_parser import GPTResumeParser
-from apps.ai_agents.services.job_fit_report_agent import JobFitReportAgent
 from apps.hiring.models import JobApplication
-from apps.ai_agents.services.job_description_parser_agent import JobDescriptionParserAgent
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +14,10 @@ def process_parsed_resume(self, resume_id):
         logger.error(f"Resume not found for {resume_id}")
         return
 
+    # Imported here - the parser pulls in agno, OpenAI and pdfplumber, which every
+    # process would otherwise pay for at startup (these tasks load via hiring signals)
+    from apps.ai_agents.services.gpt_pdf_parser import GPTResumeParser
+
     resume_file_path = resume.file.path
     parser = GPTResumeParser()
     parser.save_analysis_in_db(resume_file_path, resume)
@@ -60,6 +61,8 @@ def process_job_fit_scoring(self, application_id: int):
         return {"application_id": application_id, "status": "skipped", "report": application.job_fit_report}
 
     # Both available then generate fit report
+    from apps.ai_agents.services.job_fit_report_agent import JobFitReportAgent
+
     try:
         agent = JobFitReportAgent()
         report = agent.save_report_in_db(application)
@@ -1,4 +1,6 @@
+import httpx
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from twilio.base.exceptions import TwilioException
 import logging
 from . import constants
@@ -14,7 +16,12 @@ class TwilioSMSClient:
         if not all([self.account_sid, self.auth_token, self.from_number]):
             raise ValueError("Twilio credentials not properly configured")
 
-        self.client = Client(self.account_sid, self.auth_token)
+        # Pooled keep-alive connections, bounded so a slow API can't stall a worker
+        self.client = Client(
+            self.account_sid,
+            self.auth_token,
+            http_client=TwilioHttpClient(pool_connections=True, timeout=constants.HTTP_TIMEOUT_SECONDS)
+        )
 
     def send_sms(self, to_number, message_body, from_number=None):
         """Send SMS message using Twilio SDK"""
@@ -43,6 +50,36 @@ class TwilioSMSClient:
             logger.error(f"[Twilio] Unexpected error: {e}")
             return {"success": False, "error": str(e)}
 
+    async def send_sms_async(self, http, to_number, message_body, from_number=None):
+        """Send SMS through the REST API on a pooled httpx.AsyncClient - cancelling aborts the request"""
+        try:
+            response = await http.post(
+                constants.MESSAGES_URL,
+                auth=(self.account_sid, self.auth_token),
+                data={"To": to_number, "From": from_number or self.from_number, "Body": message_body},
+                timeout=constants.HTTP_TIMEOUT_SECONDS
+            )
+            message = response.json()
+            if response.is_error:
+                error = message.get("message") or f"HTTP {response.status_code}"
+                logger.error(f"[Twilio] SMS send failed: {error}")
+                return {"success": False, "error": error}
+
+            return {
+                "success": True,
+                "data": {
+                    "sid": message.get("sid"),
+                    "status": message.get("status"),
+                    "to": message.get("to"),
+                    "from": message.get("from"),
+                    "body": message.get("body"),
+                    "date_created": message.get("date_created")
+                }
+            }
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"[Twilio] SMS send failed: {e}")
+            return {"success": False, "error": str(e)}
+
     def get_message_status(self, message_sid):
         """Get status of a sent message"""
         try:
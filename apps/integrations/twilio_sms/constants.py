@@ -10,6 +10,9 @@ BASE_URL = f"https://api.twilio.com/2010-04-01/Accounts/{ACCOUNT_SID}"
 MESSAGES_URL = f"{BASE_URL}/Messages.json"
 SMS_URL = MESSAGES_URL
 
+# Per-request timeout for Twilio API calls (seconds)
+HTTP_TIMEOUT_SECONDS = 10
+
 # Message status options
 MESSAGE_STATUS_QUEUED = "queued"
 MESSAGE_STATUS_SENDING = "sending"
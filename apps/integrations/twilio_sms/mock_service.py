@@ -1,6 +1,7 @@
 """
 Mock SMS Service - For testing without real Twilio credentials
 """
+import asyncio
 import logging
 import time
 import random
@@ -15,10 +16,17 @@ class MockTwilioSMSService:
 
     def send_sms(self, to_number, message, from_number=None):
         """Mock SMS sending"""
-        try:
-            # Simulate some processing time
-            time.sleep(0.1)
+        # Simulate some processing time
+        time.sleep(0.1)
+        return self._record_sms(to_number, message, from_number)
+
+    async def send_sms_async(self, http, to_number, message, from_number=None):
+        """Mock SMS sending without blocking the event loop"""
+        await asyncio.sleep(0.1)
+        return self._record_sms(to_number, message, from_number)
 
+    def _record_sms(self, to_number, message, from_number=None):
+        try:
             # Generate fake message ID
             message_id = f"SM{random.randint(10000000, 99999999)}"
 
@@ -67,6 +75,14 @@ class MockTwilioSMSService:
 
     def send_alert_sms(self, to_number, alert_type, message, from_number=None):
         """Mock alert SMS with priority formatting"""
+        return self.send_sms(to_number, self._alert_message(alert_type, message), from_number)
+
+    async def send_alert_sms_async(self, http, to_number, alert_type, message, from_number=None):
+        """Mock alert SMS as an awaitable"""
+        return await self.send_sms_async(http, to_number, self._alert_message(alert_type, message), from_number)
+
+    @staticmethod
+    def _alert_message(alert_type, message):
         alert_emojis = {
             "emergency": "🚨",
             "warning": "⚠️",
@@ -74,9 +90,7 @@ class MockTwilioSMSService:
         }
 
         emoji = alert_emojis.get(alert_type, "📢")
-        formatted_message = f"{emoji} {alert_type.upper()}: {message}"
-
-        return self.send_sms(to_number, formatted_message, from_number)
+        return f"{emoji} {alert_type.upper()}: {message}"
 
     def check_message_status(self, message_id):
         """Mock message status check"""
@@ -7,15 +7,31 @@ class TwilioSMSService:
 
     def send_sms(self, to_number, message, from_number=None):
         """Send SMS to a phone number"""
+        error = self._validate_sms(to_number, message)
+        if error:
+            return {"success": False, "error": error}
+
+        return self.client.send_sms(to_number, message, from_number)
+
+    async def send_sms_async(self, http, to_number, message, from_number=None):
+        """send_sms as an awaitable on the caller's pooled httpx.AsyncClient"""
+        error = self._validate_sms(to_number, message)
+        if error:
+            return {"success": False, "error": error}
+
+        return await self.client.send_sms_async(http, to_number, message, from_number)
+
+    def _validate_sms(self, to_number, message):
+        """Error message for a send Twilio would reject, else None"""
         # Validate phone number format
         if not self._is_valid_phone_number(to_number):
-            return {"success": False, "error": "Invalid phone number format"}
+            return "Invalid phone number format"
 
         # Validate message length (SMS limit is 160 characters for single SMS)
         if len(message) > 1600:  # Allow up to 10 concatenated SMS
-            return {"success": False, "error": "Message too long (max 1600 characters)"}
+            return "Message too long (max 1600 characters)"
 
-        return self.client.send_sms(to_number, message, from_number)
+        return None
 
     def send_bulk_sms(self, phone_numbers, message, from_number=None):
         """Send SMS to multiple phone numbers"""
@@ -48,6 +64,14 @@ class TwilioSMSService:
 
     def send_alert_sms(self, to_number, alert_type, message, from_number=None):
         """Send alert SMS with priority formatting"""
+        return self.send_sms(to_number, self._alert_message(alert_type, message), from_number)
+
+    async def send_alert_sms_async(self, http, to_number, alert_type, message, from_number=None):
+        """send_alert_sms as an awaitable on the caller's pooled httpx.AsyncClient"""
+        return await self.send_sms_async(http, to_number, self._alert_message(alert_type, message), from_number)
+
+    @staticmethod
+    def _alert_message(alert_type, message):
         alert_emojis = {
             "emergency": "🚨",
             "warning": "⚠️",
@@ -56,9 +80,7 @@ class TwilioSMSService:
         }
 
         emoji = alert_emojis.get(alert_type.lower(), "📢")
-        formatted_message = f"{emoji} {alert_type.upper()}: {message}"
-
-        return self.send_sms(to_number, formatted_message, from_number)
+        return f"{emoji} {alert_type.upper()}: {message}"
 
     def check_message_status(self, message_sid):
         """Check the delivery status of a sent message"""
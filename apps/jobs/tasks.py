@@ -1,6 +1,5 @@
 from celery import shared_task
 import logging
-from apps.ai_agents.services.job_description_parser_agent import JobDescriptionParserAgent
 from apps.jobs.models import Job
 
 logger = logging.getLogger(__name__)
@@ -17,6 +16,8 @@ def process_job_description_parsing(job_id: int):
         logger.error(f"Job not found for id={job_id}")
         return
 
+    from apps.ai_agents.services.job_description_parser_agent import JobDescriptionParserAgent
+
     try:
         agent = JobDescriptionParserAgent()
         result = agent.save_parsed_in_db(job)
@@ -187,6 +187,61 @@ GOOGLE_CALENDAR_REDIRECT_URI = os.environ.get("GOOGLE_CALENDAR_REDIRECT_URI")
 # Google Maps
 GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
 
+# Redis (pipeline progress events, shared caches) - optional, features degrade without it
+REDIS_URL = os.environ.get("REDIS_URL")
+
+# Shared cache across gunicorn/Celery workers when Redis is available
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "cache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Dashboard KPI cards are recomputed at most this often
+DASHBOARD_METRICS_CACHE_SECONDS = int(os.environ.get("DASHBOARD_METRICS_CACHE_SECONDS", 30))
+
+# Citizen request list total is recounted at most this often
+REQUEST_TOTAL_CACHE_SECONDS = int(os.environ.get("REQUEST_TOTAL_CACHE_SECONDS", 60))
+
+# Periodic tasks (celery beat) - the hourly reconcile repairs request rollup drift
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-request-rollups": {
+        "task": "apps.depts.tasks.reconcile_request_rollups_task",
+        "schedule": int(os.environ.get("ROLLUP_RECONCILE_INTERVAL_SECONDS", 3600)),
+    },
+}
+
+# Share of pipeline runs whose per-stage metrics are saved on CitizenRequest.output_json
+PIPELINE_METRICS_SAMPLE_RATE = float(os.environ.get("PIPELINE_METRICS_SAMPLE_RATE", 0.1))
+
+# Prometheus scrapers send "Authorization: Bearer <token>" to /metrics/ (staff sessions need no token)
+METRICS_BEARER_TOKEN = os.environ.get("METRICS_BEARER_TOKEN", "")
+
+# Router classification cache (normalized request text -> RouterDecision)
+ROUTER_CACHE_TTL_SECONDS = int(os.environ.get("ROUTER_CACHE_TTL_SECONDS", 900))
+ROUTER_CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("ROUTER_CACHE_LOCAL_MAX_ENTRIES", 1024))
+ROUTER_CACHE_SEMANTIC_BUCKETS = os.environ.get("ROUTER_CACHE_SEMANTIC_BUCKETS", "False") == "True"
+
+# Router agent conversation history: "off" (stateless), "request" or "user"
+# Sessions are stored in Redis with a TTL and capped to the last N runs
+ROUTER_AGENT_HISTORY_MODE = os.environ.get("ROUTER_AGENT_HISTORY_MODE", "off")
+ROUTER_AGENT_HISTORY_RUNS = int(os.environ.get("ROUTER_AGENT_HISTORY_RUNS", 3))
+ROUTER_AGENT_SESSION_TTL_SECONDS = int(os.environ.get("ROUTER_AGENT_SESSION_TTL_SECONDS", 3600))
+
+# VAPI voice calls - point VAPI_BASE_URL at a local stand-in to test without dialing
+VAPI_BASE_URL = os.environ.get("VAPI_BASE_URL", "https://api.vapi.ai")
+# Resolve the shared emergency assistant when a Celery worker process starts
+VAPI_WARMUP_ON_WORKER_START = os.environ.get("VAPI_WARMUP_ON_WORKER_START", "True") == "True"
+
 # Twilio
 TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")